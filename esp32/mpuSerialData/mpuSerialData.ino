@@ -1,12 +1,49 @@
 #include <Wire.h>
 #include <MPU6050.h>
 
+// 1 = frames binários (sync, seq, timestamp, 12 x int16, CRC16), 0 = texto CSV
+// No modo binário use uma baudrate maior no host (ex.: --baudrate 921600)
+#define BINARY_PROTOCOL 0
+
+#if BINARY_PROTOCOL
+#define BAUDRATE 921600
+#define SAMPLE_PERIOD_US 2000  // 500 Hz
+#else
+#define BAUDRATE 115200
+#define SAMPLE_PERIOD_US 10000  // 100 Hz
+#endif
+
 MPU6050 mpu1(0x68);  // Primeiro MPU6050 (AD0 em GND)
 MPU6050 mpu2(0x69);  // Segundo MPU6050 (AD0 em VCC)
 
+// Frame binário, little-endian, 34 bytes (ver src/serial_protocol.py)
+struct __attribute__((packed)) Frame {
+    uint8_t sync[2];
+    uint16_t seq;
+    uint32_t timestamp_us;
+    int16_t values[12];
+    uint16_t crc;
+};
+
+uint16_t seq = 0;
+unsigned long proxima_amostra = 0;
+
+// CRC-16/CCITT-FALSE (polinômio 0x1021, valor inicial 0xFFFF)
+uint16_t crc16(const uint8_t *data, size_t len) {
+    uint16_t crc = 0xFFFF;
+    for (size_t i = 0; i < len; i++) {
+        crc ^= (uint16_t)data[i] << 8;
+        for (uint8_t b = 0; b < 8; b++) {
+            crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : crc << 1;
+        }
+    }
+    return crc;
+}
+
 void setup() {
-    Serial.begin(115200);
+    Serial.begin(BAUDRATE);
     Wire.begin(21, 22);  // Configura I2C no ESP32
+    Wire.setClock(400000);  // I2C rápido para ler os dois sensores a 500 Hz
 
     // Inicializa o primeiro MPU-6050
     mpu1.initialize();
@@ -26,20 +63,35 @@ void setup() {
 
     // Cabeçalho do CSV
     // Serial.println("timestamp,ax1,ay1,az1,gx1,gy1,gz1,ax2,ay2,az2,gx2,gy2,gz2");
+
+    proxima_amostra = micros();
 }
 
 void loop() {
+    // Aguarda o próximo período de amostragem (sem acumular atraso como delay())
+    while ((long)(micros() - proxima_amostra) < 0);
+    proxima_amostra += SAMPLE_PERIOD_US;
+
     int16_t ax1, ay1, az1, gx1, gy1, gz1;
     int16_t ax2, ay2, az2, gx2, gy2, gz2;
 
-    // Obtém dados do MPU6050 #1
-    mpu1.getAcceleration(&ax1, &ay1, &az1);
-    mpu1.getRotation(&gx1, &gy1, &gz1);
+    // Obtém dados do MPU6050 #1 e #2 (uma leitura I2C por sensor)
+    mpu1.getMotion6(&ax1, &ay1, &az1, &gx1, &gy1, &gz1);
+    mpu2.getMotion6(&ax2, &ay2, &az2, &gx2, &gy2, &gz2);
 
-    // Obtém dados do MPU6050 #2
-    mpu2.getAcceleration(&ax2, &ay2, &az2);
-    mpu2.getRotation(&gx2, &gy2, &gz2);
+#if BINARY_PROTOCOL
+    Frame frame;
+    frame.sync[0] = 0xA5;
+    frame.sync[1] = 0x5A;
+    frame.seq = seq++;
+    frame.timestamp_us = micros();
+    int16_t valores[12] = {ax1, ay1, az1, gx1, gy1, gz1, ax2, ay2, az2, gx2, gy2, gz2};
+    memcpy(frame.values, valores, sizeof(valores));
+    // CRC sobre seq, timestamp e valores
+    frame.crc = crc16((const uint8_t *)&frame.seq, offsetof(Frame, crc) - offsetof(Frame, seq));
 
+    Serial.write((const uint8_t *)&frame, sizeof(frame));
+#else
     // Converte os valores para unidades físicas
     float acel_x1 = ax1 / 16384.0;
     float acel_y1 = ay1 / 16384.0;
@@ -55,9 +107,6 @@ void loop() {
     float giro_y2 = gy2 / 131.0;
     float giro_z2 = gz2 / 131.0;
 
-    // Obtém o tempo atual (em milissegundos)
-    unsigned long timestamp = millis();
-
     // Print no formato CSV
     Serial.print(acel_x1, 2); Serial.print(",");
     Serial.print(acel_y1, 2); Serial.print(",");
@@ -71,6 +120,5 @@ void loop() {
     Serial.print(giro_x2, 2); Serial.print(",");
     Serial.print(giro_y2, 2); Serial.print(",");
     Serial.println(giro_z2, 2);
-
-    delay(10);  // Coleta dados a cada 500ms
+#endif
 }
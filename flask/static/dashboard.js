@@ -0,0 +1,159 @@
+// painel de sensores: quadros binários (float16) enviados pelo SensorBroadcaster
+
+// float16 -> float32 por tabela (todos os 65536 valores)
+const HALF_TO_FLOAT = (() => {
+  const tabela = new Float32Array(65536)
+  for (let h = 0; h < 65536; h++) {
+    const sinal = h & 0x8000 ? -1 : 1
+    const expoente = (h >> 10) & 0x1f
+    const fracao = h & 0x3ff
+    let valor
+    if (expoente === 0) valor = fracao * 2 ** -24
+    else if (expoente === 31) valor = fracao ? NaN : Infinity
+    else valor = (1 + fracao / 1024) * 2 ** (expoente - 15)
+    tabela[h] = sinal * valor
+  }
+  return tabela
+})()
+
+// mesma ordem e cores de src/visualizer.py
+const CHANNELS = [
+  { name: 'AX1', color: 'blue', dash: [] },
+  { name: 'AY1', color: 'green', dash: [] },
+  { name: 'AZ1', color: 'red', dash: [] },
+  { name: 'GX1', color: 'purple', dash: [] },
+  { name: 'GY1', color: 'orange', dash: [] },
+  { name: 'GZ1', color: 'cyan', dash: [] },
+  { name: 'AX2', color: 'navy', dash: [6, 4] },
+  { name: 'AY2', color: 'darkgreen', dash: [6, 4] },
+  { name: 'AZ2', color: 'darkred', dash: [6, 4] },
+  { name: 'GX2', color: 'indigo', dash: [6, 4] },
+  { name: 'GY2', color: 'darkorange', dash: [6, 4] },
+  { name: 'GZ2', color: 'teal', dash: [6, 4] },
+]
+const ACCEL = [0, 1, 2, 6, 7, 8]
+const GYRO = [3, 4, 5, 9, 10, 11]
+
+// últimos `windowSamples` amostras (índices do dispositivo) de alguns canais
+class SensorChart {
+  constructor(canvas, channels, range, windowSamples = 1000, capacity = 4096) {
+    this.canvas = canvas
+    this.ctx = canvas.getContext('2d')
+    this.channels = channels
+    this.range = range
+    this.windowSamples = windowSamples
+    this.capacity = capacity
+    this.index = new Float64Array(capacity)
+    this.values = channels.map(() => new Float32Array(capacity))
+    this.count = 0
+    this.dirty = false
+  }
+
+  push(start, decimation, samples, numChannels) {
+    const n = samples.length / numChannels
+    for (let i = 0; i < n; i++) {
+      const pos = this.count % this.capacity
+      this.index[pos] = start + i * decimation
+      this.channels.forEach((c, k) => {
+        const v = samples[i * numChannels + c]
+        this.values[k][pos] = v
+        // limites só crescem, como no gráfico do matplotlib
+        if (v < this.range[0]) this.range[0] = v * 1.1
+        if (v > this.range[1]) this.range[1] = v * 1.1
+      })
+      this.count++
+    }
+    this.dirty = n > 0
+  }
+
+  draw() {
+    if (!this.dirty) return
+    this.dirty = false
+
+    const { ctx, canvas } = this
+    const largura = canvas.width, altura = canvas.height
+    ctx.clearRect(0, 0, largura, altura)
+    ctx.strokeStyle = '#ddd'
+    ctx.beginPath()
+    ctx.moveTo(0, altura / 2)
+    ctx.lineTo(largura, altura / 2)
+    ctx.stroke()
+
+    const n = Math.min(this.count, this.capacity)
+    if (!n) return
+    const ultimo = this.index[(this.count - 1) % this.capacity]
+    const [baixo, alto] = this.range
+    const x = (i) => largura * (1 - (ultimo - i) / this.windowSamples)
+    const y = (v) => altura * (1 - (v - baixo) / (alto - baixo))
+
+    this.channels.forEach((c, k) => {
+      ctx.strokeStyle = CHANNELS[c].color
+      ctx.setLineDash(CHANNELS[c].dash)
+      ctx.beginPath()
+      let primeiro = true
+      for (let j = this.count - n; j < this.count; j++) {
+        const pos = j % this.capacity
+        if (ultimo - this.index[pos] > this.windowSamples) continue
+        const px = x(this.index[pos]), py = y(this.values[k][pos])
+        if (primeiro) ctx.moveTo(px, py)
+        else ctx.lineTo(px, py)
+        primeiro = false
+      }
+      ctx.stroke()
+    })
+    ctx.setLineDash([])
+  }
+}
+
+document.addEventListener('alpine:init', () => {
+
+  Alpine.store('dashboard', {
+    proba: [],
+    decimation: 1,
+    framesPerSecond: 0,
+
+    set(proba, decimation) {
+      if (proba) this.proba = proba
+      this.decimation = decimation
+    }
+  })
+
+})
+
+function startDashboard(socket) {
+  const charts = [
+    new SensorChart(document.getElementById('accel'), ACCEL, [-2.2, 2.2]),
+    new SensorChart(document.getElementById('gyro'), GYRO, [-260, 260]),
+  ]
+  let quadros = 0
+
+  socket.on('sensores', function(frame, ack) {
+    const bits = new Uint16Array(frame.samples)
+    const samples = new Float32Array(bits.length)
+    for (let i = 0; i < bits.length; i++) samples[i] = HALF_TO_FLOAT[bits[i]]
+    charts.forEach((chart) => chart.push(frame.start, frame.decimation, samples, frame.channels))
+    Alpine.store('dashboard').set(frame.proba, frame.decimation)
+    quadros++
+    // o ack libera o próximo quadro; a demora dele aumenta a decimação
+    ack()
+  })
+
+  // quadros de sensores do dispositivo: ?device=COM5 (padrão: o primeiro);
+  // só depois do handler acima, para que o primeiro quadro receba ack
+  const dispositivo = new URLSearchParams(location.search).get('device') || ''
+  const entrar = () => socket.emit('join_dashboard', dispositivo)
+  socket.on('connect', entrar)
+  if (socket.connected) entrar()
+
+  setInterval(() => {
+    Alpine.store('dashboard').framesPerSecond = quadros
+    quadros = 0
+  }, 1000)
+
+  // desenho desacoplado da chegada dos quadros
+  function desenhar() {
+    charts.forEach((chart) => chart.draw())
+    requestAnimationFrame(desenhar)
+  }
+  requestAnimationFrame(desenhar)
+}
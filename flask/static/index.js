@@ -28,6 +28,21 @@ document.addEventListener('alpine:init', () => {
         key: key,
         index: index,
       })
+    },
+
+    // substitui a lista pelo estado enviado pelo servidor ({key, name}, mais antigo primeiro)
+    set(movements) {
+      if (this.data.length && movements.length && this.data.at(-1).key === movements.at(-1).key) {
+        return
+      }
+
+      this.data = movements.map((movement, i) => ({
+        name: movement.name,
+        image: VALID_MOVEMENTS.includes(movement.name) ? `/static/images/${movement.name}.png` : '',
+        current: i === movements.length - 1,
+        key: movement.key,
+        index: i,
+      }))
     }
   })
 
@@ -1,63 +1,159 @@
 import typer
 from pathlib import Path
+from typing import Optional
 
 app = typer.Typer(context_settings={"help_option_names": ["-h", "--help"]})
+bench_app = typer.Typer(help="Benchmarks de desempenho")
+app.add_typer(bench_app, name="bench")
+dataset_app = typer.Typer(help="Gerencia o cache binário dos datasets")
+app.add_typer(dataset_app, name="dataset")
 
 @app.command()
-def train(model_name: str = "model"):
+def train(
+    model_name: str = "model",
+    stride: int = 0,
+    workers: int = 0,
+    profile: str = "fast",
+    epochs: int = 0,
+    batch_size: int = 0,
+    jit: Optional[bool] = typer.Option(None, "--jit/--no-jit"),
+    threads: int = 0,
+    arch: str = "",
+):
     """
-    Train model and save it into './models/{model_name}.h5'
+    Train model and save it into './models/{model_name}.keras'\n
+
+    --arch : lstm, tcn, sepcnn or gbt (features + gradient boosting, saved as .joblib; empty = value from config/params.yaml)\n
+    --stride : start a new window every N samples (0 = value from config/params.yaml)\n
+    --workers : threads preparing batches in parallel (0 = number of CPUs)\n
+    --profile : fast (large batches, XLA, early stopping), accurate or baseline (batch 16, 20 epochs)\n
+    --epochs / --batch-size : override the profile (0 = profile value)\n
+    --jit / --no-jit : override the profile's XLA compilation (unset = profile value)\n
+    --threads : TensorFlow intra-op threads, or OpenMP threads with gbt (0 = library default)
     """
-    from src.train_lib import train_model
+    from src.train_lib import (
+        TRAINING_PROFILES,
+        scaled_learning_rate,
+        train_model,
+    )
+
+    if profile not in TRAINING_PROFILES:
+        raise typer.BadParameter(f"Unknown profile {profile}. Use one of {list(TRAINING_PROFILES)}")
+    config = dict(TRAINING_PROFILES[profile])
+    config["epochs"] = epochs or config["epochs"]
+    config["batch_size"] = batch_size or config["batch_size"]
+    if jit is not None:
+        config["jit_compile"] = jit
 
-    train_model("train_data", model_name)
+    train_model(
+        "train_data",
+        model_name,
+        stride,
+        workers,
+        learning_rate=scaled_learning_rate(config["batch_size"]),
+        arch=arch or None,
+        threads=threads,
+        **config,
+    )
 
 
 @app.command()
-def metrics(model_name: str = "model", n_pred: int = 100):
+def sweep(
+    sweep_file: Path = Path("config/sweep.yaml"),
+    output: Path = Path("sweep_leaderboard.csv"),
+    processes: int = 0,
+):
+    """
+    Busca de hiperparâmetros com trials em paralelo\n
+
+    --sweep-file : espaço de busca (ver config/sweep.yaml)\n
+    --output : arquivo .csv com o resultado de cada trial\n
+    --processes : trials simultâneos (0 = valor do arquivo ou metade dos núcleos)
+    """
+    from src.sweep import run_sweep
+
+    leaderboard = run_sweep(str(sweep_file), str(output), processes)
+    print(f"\n🏆 Melhores trials ({output}):")
+    for linha in leaderboard[:10]:
+        if linha["status"] == "error":
+            continue
+        print(
+            f"trial {linha['trial']:>3}: acurácia {float(linha['test_accuracy']):.4f}"
+            f" | timesteps {linha['timesteps']} stride {linha['stride']}"
+            f" lstm {linha['lstm_units']} dense {linha['dense_units']}"
+            f" batch {linha['batch_size']} lr {linha['learning_rate']}"
+        )
+
+
+@app.command()
+def metrics(
+    model_name: str = "model",
+    n_pred: int = 100,
+    batch_size: int = 256,
+    compiled: bool = True,
+    plot: bool = True,
+    backend: str = "keras",
+    quantization: str = "float16",
+):
     """
     Load model and show a confusion matrix\n
 
-    --n-pred : number of predictions to construct the confusion matrix
+    --n-pred : number of predictions to construct the confusion matrix (0 = all)\n
+    --batch-size : number of windows classified per model call\n
+    --no-plot : only print the metrics, without opening the confusion matrix window\n
+    --backend : keras or tflite (model exported with `export`)\n
+    --quantization : TFLite variant: float32, float16 or int8
     """
-    from src.train_lib import load_classifier
+    from src.train_lib import load_batch_classifier
     import numpy as np
-    from sklearn.metrics import confusion_matrix, accuracy_score
+    from sklearn.metrics import (
+        confusion_matrix,
+        accuracy_score,
+        classification_report,
+    )
     from src.data_helpers import get_data
     import yaml
-    from tqdm import tqdm
+    import time
 
     with open("config/params.yaml", "r") as f:
         params = yaml.safe_load(f)
+    class_names = ["none"] + params["classes"]
+    labels = list(range(len(class_names)))
 
     data, classes = get_data("test_data")
 
-    classify_gesture = load_classifier(model_name)
+    classify_batch = load_batch_classifier(
+        model_name, batch_size, compiled, backend, quantization
+    )
 
     # Seleciona N elementos aleatórios de data e classes
     indices = np.random.choice(len(data), size=len(data) if n_pred <= 0 else min(n_pred, len(data)), replace=False)
-    X_test = [data[i] for i in indices]
-    y_test = [classes[i] for i in indices]
-
-    # Inicializa listas para armazenar as classes previstas e reais
-    y_pred = []
-    y_true = []
+    X_test = data[indices]
+    y_true = classes[indices].astype(int)
 
-    # Realiza a classificação e armazena os resultados com barra de progresso
-    for i in tqdm(range(len(X_test)), desc="Classifying"):
-        classe_predita = classify_gesture(np.expand_dims(X_test[i], axis=0))
-        y_pred.append(classe_predita)
-        y_true.append(y_test[i])
+    # Classifica todas as janelas selecionadas em lotes
+    inicio = time.perf_counter()
+    y_pred = classify_batch(X_test)
+    duracao = time.perf_counter() - inicio
 
     # Calcula a confusion matrix
-    cm = confusion_matrix(y_true, y_pred)
+    cm = confusion_matrix(y_true, y_pred, labels=labels)
     print("Acuracia: ", accuracy_score(y_true, y_pred))
+    print(f"Vazão: {len(X_test) / duracao:.1f} janelas/s ({len(X_test)} janelas em {duracao:.2f}s)")
+    print(
+        classification_report(
+            y_true, y_pred, labels=labels, target_names=class_names, zero_division=0
+        )
+    )
+
+    if not plot:
+        return
 
     from sklearn.metrics import ConfusionMatrixDisplay
     import matplotlib.pyplot as plt
 
     disp = ConfusionMatrixDisplay(
-        confusion_matrix=cm, display_labels=["none"] + params["classes"]
+        confusion_matrix=cm, display_labels=class_names
     )
     disp.plot(cmap="viridis", values_format="d")
     plt.title("Matriz de Confusão")
@@ -65,26 +161,61 @@ def metrics(model_name: str = "model", n_pred: int = 100):
 
 
 @app.command()
-def captura(classe: str, COM: str = "COM5", baudrate: int = 115200):
+def captura(
+    classe: str,
+    COM: str = "COM5",
+    baudrate: int = 115200,
+    protocol: str = "text",
+    extra: str = "none",
+    plot: bool = False,
+    fps: float = 30.0,
+    metrics_interval: float = 0,
+    speed: float = 1.0,
+):
     """
     Lê os dados da IMU enviados via serial, classifica-os utilizando uma interface web e os salva em um arquivo .csv na pasta ./dataset \n
 
     --classe : classe do movimento em captura\n
-    --COM : porta serial em que os dados serão recebidos\n
-    --baudrate : frequencia da porta serial
+    --COM : porta serial em que os dados serão recebidos; replay:<captura> ou pty:<captura> reproduzem uma gravação\n
+    --baudrate : frequencia da porta serial\n
+    --protocol : protocolo serial do ESP32, text ou binary\n
+    --extra : grava também uma cópia binária (bin) ou compactada (gz) do .csv\n
+    --plot : mostra os 12 canais em tempo real (redesenhados a --fps quadros por segundo)\n
+    --metrics-interval : segundos entre os resumos de métricas no console (0 = só em http://localhost:5000/metrics)\n
+    --speed : velocidade da reprodução: 1 = tempo real, N = N vezes mais rápido, 0 = velocidade máxima
     """
     import threading
     from src.mpu_read_serial import leitura_serial
     from src.mpu_read_serial import app as flask_app
 
+    if metrics_interval > 0:
+        from src.metrics import METRICS
+
+        threading.Thread(target=METRICS.log_loop, args=(metrics_interval,), daemon=True).start()
+
+    plotter = None
+    if plot:
+        from src.visualizer import RealtimePlotter
+
+        plotter = RealtimePlotter(fps=fps)
+
     try:
         # Inicia leitura da serial em thread separada
         thread = threading.Thread(
-            target=leitura_serial, args=(classe, COM, baudrate), daemon=True
+            target=leitura_serial,
+            args=(classe, COM, baudrate, protocol, extra, plotter, speed),
+            daemon=True,
         )
         thread.start()
 
-        flask_app.run(host="0.0.0.0", port=5000)
+        if plotter is None:
+            flask_app.run(host="0.0.0.0", port=5000)
+        else:
+            # a janela do matplotlib precisa da thread principal
+            threading.Thread(
+                target=flask_app.run, kwargs={"host": "0.0.0.0", "port": 5000}, daemon=True
+            ).start()
+            plotter.show()
     except KeyboardInterrupt:
         import os
         os._exit(1)
@@ -93,32 +224,476 @@ def captura(classe: str, COM: str = "COM5", baudrate: int = 115200):
 @app.command()
 def visualize(file: Path):
     """
-    Visualiza uma das capturas salvas em um arquivo .csv
+    Visualiza uma das capturas salvas em um arquivo .csv (ou .csv.gz / .bin)\n
+
+    A captura é convertida uma vez para o cache binário e mapeada em memória
     """
-    import pandas as pd
-    from src.visualizer import visualizar_dataframe
+    from src.data_helpers import load_cached_recording
+    from src.visualizer import visualizar_dados
 
-    df = pd.read_csv(file)
-    visualizar_dataframe(df)
+    visualizar_dados(load_cached_recording(str(file)))
 
 
 @app.command()
 def web(
-    COM: str = "COM5",
+    COM: list[str] = ["COM5"],
     baudrate: int = 115200,
     timesteps: int = 50,
     model_name: str = "model",
+    hop: int = 10,
+    votes: int = 3,
+    refractory: int = 100,
+    compiled: bool = True,
+    protocol: str = "text",
+    async_mode: str = "threading",
+    frame_rate: float = 30.0,
+    backend: str = "keras",
+    quantization: str = "float16",
+    preload: list[str] = [],
+    sensor_interval: float = 0.05,
+    metrics_interval: float = 0,
+    speed: float = 1.0,
+    loop: bool = False,
 ):
     """
     Hospeda uma página web para visualização das detecções do modelo em tempo real\n
 
     --timesteps : number of data elements to feed the model and once\n
-    --COM : porta serial em que os dados serão recebidos\n
-    --baudrate : frequencia da porta serial
+    --COM : porta serial em que os dados serão recebidos (repita para vários dispositivos); replay:<captura> ou pty:<captura> reproduzem uma gravação\n
+    --baudrate : frequencia da porta serial\n
+    --hop : classifica a janela a cada N novas amostras\n
+    --votes : número de janelas usadas na votação por maioria\n
+    --refractory : amostras antes de repetir a mesma detecção\n
+    --compiled : usa o caminho de inferência compilado (sem model.predict)\n
+    --protocol : protocolo serial do ESP32, text ou binary\n
+    --async-mode : servidor Socket.IO: threading, eventlet ou gevent (requer o pacote)\n
+    --frame-rate : envios por segundo do estado aos navegadores\n
+    --backend : keras ou tflite (modelo exportado com `export`)\n
+    --quantization : variante TFLite: float32, float16 ou int8\n
+    --preload : modelos carregados e aquecidos no início, para troca via POST /models/active (padrão: todos em models/)\n
+    --sensor-interval : segundos entre os quadros de sensores enviados ao painel /dashboard\n
+    --metrics-interval : segundos entre os resumos de métricas no console (0 = só em /metrics)\n
+    --speed : velocidade das reproduções: 1 = tempo real, N = N vezes mais rápido, 0 = velocidade máxima\n
+    --loop : recomeça as reproduções ao chegar ao fim
     """
     from src.webapp import run_webapp
 
-    run_webapp(COM, baudrate, timesteps, model_name)
+    run_webapp(
+        COM,
+        baudrate,
+        timesteps,
+        model_name,
+        hop,
+        votes,
+        refractory,
+        compiled,
+        protocol,
+        async_mode,
+        frame_rate,
+        backend,
+        quantization,
+        preload or None,
+        sensor_interval,
+        metrics_interval,
+        speed,
+        loop,
+    )
+
+
+@app.command()
+def replay(
+    file: Path,
+    model_name: str = "model",
+    timesteps: int = 50,
+    hop: int = 10,
+    votes: int = 3,
+    refractory: int = 100,
+    speed: float = 1.0,
+    compiled: bool = True,
+    backend: str = "keras",
+    quantization: str = "float16",
+    stateful: bool = False,
+    lanes: int = 0,
+    period: int = 0,
+):
+    """
+    Reproduz uma captura .csv pelo classificador em streaming e mede a latência\n
+
+    --speed : 1 = tempo real, N = N vezes mais rápido, 0 = velocidade máxima\n
+    --backend : keras ou tflite (modelo exportado com `export`)\n
+    --stateful : avança o estado da LSTM a cada amostra em vez de reprocessar a janela\n
+    --lanes / --period : estados reiniciados a cada `period` amostras (0 = equivalente às janelas)
+    """
+    import numpy as np
+    import yaml
+    from src.train_lib import load_classifier
+    from src.streaming import StreamingClassifier, replay_csv
+
+    with open("config/params.yaml", "r") as f:
+        params = yaml.safe_load(f)
+    classes = ["none"] + params["classes"]
+
+    if stateful:
+        from src.train_lib import load_model, load_preprocessor
+        from src.stateful import StatefulStreamingClassifier
+
+        engine = StatefulStreamingClassifier(
+            load_model(model_name),
+            load_preprocessor(model_name),
+            timesteps,
+            hop,
+            votes,
+            refractory,
+            period=period or None,
+            lanes=lanes or None,
+        )
+    else:
+        engine = StreamingClassifier(
+            load_classifier(model_name, compiled, backend, quantization),
+            timesteps,
+            hop=hop,
+            votes=votes,
+            refractory=refractory,
+        )
+    result = replay_csv(str(file), engine, speed)
+
+    for detection in result["detections"]:
+        print(f"amostra {detection.index}: {classes[detection.class_id]}")
+
+    print(f"Amostras: {result['samples']}  Janelas: {result['windows']}")
+    print(
+        f"Duração: {result['duration_s']:.2f}s para {result['recording_s']:.2f}s gravados"
+        f" ({result['realtime_factor']:.1f}x tempo real)"
+    )
+    print(
+        f"Inferência por janela: p50 {result['inference_p50_ms']:.2f} ms,"
+        f" p99 {result['inference_p99_ms']:.2f} ms"
+    )
+    print(
+        f"Movimentos detectados: {result['movements'] - result['missed']}/{result['movements']}"
+    )
+    if result["detection_latency_s"]:
+        print(
+            f"Latência de detecção: mediana {np.median(result['detection_latency_s']):.3f}s"
+        )
+
+
+@app.command()
+def export(model_name: str = "model", quantization: list[str] = ["float16", "int8"]):
+    """
+    Exporta o modelo (com o scaler embutido) para TFLite\n
+
+    --quantization : float32, float16 ou int8 (repita para exportar várias variantes)
+    """
+    from src.train_lib import load_model, load_preprocessor
+    from src.tflite_backend import export_tflite
+
+    model = load_model(model_name)
+    preprocessor = load_preprocessor(model_name)
+    for variante in quantization:
+        export_tflite(model, preprocessor, model_name, variante)
+
+
+@dataset_app.command("build-cache")
+def dataset_build_cache():
+    """
+    Converte todos os arquivos listados em config/params.yaml para o cache binário
+    """
+    import yaml
+    import time
+    from src.data_helpers import build_cache, dataset_files
+
+    with open("config/params.yaml", "r") as f:
+        params = yaml.safe_load(f)
+
+    files = dataset_files(params)
+    inicio = time.perf_counter()
+    build_cache(files)
+    print(f"{len(files)} arquivos em cache ({time.perf_counter() - inicio:.2f}s)")
+
+
+@dataset_app.command("clear-cache")
+def dataset_clear_cache():
+    """
+    Remove o cache binário dos datasets
+    """
+    from src.data_helpers import clear_cache
+
+    print(f"{clear_cache()} arquivos removidos")
+
+
+@bench_app.command("inference")
+def bench_inference(model_name: str = "model", n_windows: int = 200):
+    """
+    Compara a latência por janela de model.predict com o caminho compilado
+    """
+    from src import benchmarks
+
+    results = benchmarks.bench_inference(model_name, n_windows)
+    for label in ["predict", "compiled"]:
+        stats = results[label]
+        print(
+            f"{label:>10}: p50 {stats['p50_ms']:.3f} ms  p99 {stats['p99_ms']:.3f} ms"
+            f"  média {stats['mean_ms']:.3f} ms"
+        )
+    print(f"Diferença máxima entre as probabilidades: {results['max_abs_diff']:.2e}")
+
+
+@bench_app.command("multistream")
+def bench_multistream(
+    model_name: str = "model",
+    n_devices: int = 8,
+    rate: float = 100.0,
+    duration: float = 30.0,
+    hop: int = 10,
+    protocol: str = "binary",
+):
+    """
+    Teste de carga: N dispositivos simulados a partir das gravações de test_data
+    """
+    import yaml
+    from src import benchmarks
+    from src.data_helpers import dataset_files
+
+    with open("config/params.yaml", "r") as f:
+        params = yaml.safe_load(f)
+
+    results = benchmarks.bench_multistream(
+        dataset_files(params, ["test_data"]),
+        model_name,
+        n_devices,
+        rate,
+        duration,
+        hop,
+        protocol,
+    )
+    for nome, stats in results["devices"].items():
+        print(
+            f"{nome:>8}: {stats['received']} amostras, {stats['dropped']} descartadas,"
+            f" {stats['windows']} janelas, {stats['skipped_windows']} puladas"
+        )
+    print(
+        f"Total: {results['samples_per_s']:.0f} amostras/s, {results['windows_per_s']:.1f} janelas/s,"
+        f" lote médio {results['mean_batch']:.1f}, CPU {results['cpu_cores']:.2f} núcleos"
+    )
+    if results["tick"]:
+        print(
+            f"Inferência por lote: p50 {results['tick']['p50_ms']:.2f} ms,"
+            f" p99 {results['tick']['p99_ms']:.2f} ms"
+        )
+
+
+@bench_app.command("replay")
+def bench_replay(
+    files: list[Path] = typer.Argument(None),
+    model_name: str = "model",
+    speed: float = 0.0,
+    transport: str = "replay",
+    protocol: str = "binary",
+    timesteps: int = 50,
+    hop: int = 10,
+    votes: int = 3,
+    refractory: int = 100,
+    expect: str = "",
+):
+    """
+    Reproduz capturas pelo pipeline de aquisição completo (um dispositivo por arquivo, padrão: test_data)\n
+
+    --speed : 1 = tempo real, N = N vezes mais rápido, 0 = velocidade máxima\n
+    --transport : replay (em memória) ou pty (pseudo-terminal + pyserial)\n
+    --expect : digest esperado das detecções; falha se for diferente (regressão)
+    """
+    import yaml
+    from src import benchmarks
+    from src.data_helpers import dataset_files
+
+    if files:
+        arquivos = [str(f) for f in files]
+    else:
+        with open("config/params.yaml", "r") as f:
+            params = yaml.safe_load(f)
+        arquivos = dataset_files(params, ["test_data"])
+
+    results = benchmarks.bench_replay(
+        arquivos, model_name, speed, transport, protocol, timesteps, hop, votes, refractory
+    )
+    for nome, stats in results["devices"].items():
+        print(
+            f"{nome}: {stats['received']} amostras, {stats['dropped']} descartadas,"
+            f" {stats['windows']} janelas, {stats['skipped_windows']} puladas"
+        )
+    print(
+        f"Total: {results['recording_s']:.1f}s de gravação em {results['wall_s']:.2f}s,"
+        f" {results['samples_per_s']:.0f} amostras/s, {results['windows_per_s']:.1f} janelas/s,"
+        f" CPU {results['cpu_cores']:.2f} núcleos"
+    )
+    if results["tick"]:
+        print(
+            f"Inferência por lote: p50 {results['tick']['p50_ms']:.2f} ms,"
+            f" p99 {results['tick']['p99_ms']:.2f} ms"
+        )
+    if results["emit_delay"]:
+        print(
+            f"Atraso de emissão: p50 {results['emit_delay']['p50_ms']:.2f} ms,"
+            f" p99 {results['emit_delay']['p99_ms']:.2f} ms"
+        )
+    print(
+        f"{results['detections']} detecções, {results['movements'] - results['missed']}"
+        f"/{results['movements']} movimentos detectados"
+    )
+    if results["detection_latency"]:
+        print(
+            f"Latência de detecção (na gravação): p50 {results['detection_latency']['p50_ms']:.0f} ms,"
+            f" p99 {results['detection_latency']['p99_ms']:.0f} ms"
+        )
+    print(f"Digest das detecções: {results['digest']}")
+    if expect and expect != results["digest"]:
+        print(f"❌ Esperado {expect}")
+        raise typer.Exit(code=1)
+
+
+@bench_app.command("webapp")
+def bench_webapp(
+    n_clients: int = 200,
+    slow_fraction: float = 0.1,
+    rate: float = 20.0,
+    duration: float = 10.0,
+    frame_rate: float = 30.0,
+    async_mode: str = "threading",
+    processes: int = 4,
+):
+    """
+    Teste de carga do servidor web com navegadores simulados
+    """
+    from src import benchmarks
+
+    results = benchmarks.bench_webapp(
+        n_clients,
+        slow_fraction,
+        rate_hz=rate,
+        duration=duration,
+        frame_rate=frame_rate,
+        async_mode=async_mode,
+        processes=processes,
+    )
+    print(
+        f"{results['clients']} clientes ({results['slow_clients']} lentos):"
+        f" {results['published_per_s']:.1f} detecções/s, {results['emits_per_s']:.0f} envios/s,"
+        f" CPU do servidor {results['server_cpu_cores']:.2f} núcleos"
+    )
+    print(
+        f"Atualizações por cliente: {results['updates_per_client_s']:.1f}/s"
+        f" (lentos: {results['updates_per_slow_client_s']:.1f}/s)"
+    )
+    for tipo in ["fast", "slow"]:
+        stats = results[f"latency_{tipo}"]
+        if stats:
+            print(
+                f"Latência de envio ({tipo}): p50 {stats['p50_ms']:.1f} ms,"
+                f" p99 {stats['p99_ms']:.1f} ms"
+            )
+
+
+@bench_app.command("backends")
+def bench_backends(
+    model_name: str = "model",
+    quantization: list[str] = ["float32", "float16", "int8"],
+    n_windows: int = 200,
+):
+    """
+    Acurácia (test_data) e latência por janela: Keras x modelos TFLite exportados
+    """
+    from src import benchmarks
+
+    results = benchmarks.bench_backends(model_name, quantization, n_windows)
+    print(f"{'backend':>16} {'acurácia':>9} {'p50 ms':>8} {'p99 ms':>8} {'tamanho':>10}")
+    for label, stats in results.items():
+        print(
+            f"{label:>16} {stats['accuracy']:9.4f} {stats['p50_ms']:8.2f}"
+            f" {stats['p99_ms']:8.2f} {stats['size_kb']:8.0f}kB"
+        )
+
+
+@bench_app.command("architectures")
+def bench_architectures(
+    arch: list[str] = ["lstm", "tcn", "sepcnn", "gbt"],
+    profile: str = "fast",
+    epochs: int = 0,
+    n_windows: int = 200,
+    save: bool = False,
+):
+    """
+    Treina cada arquitetura e compara acurácia (test_data), parâmetros e latência por janela
+    """
+    from src import benchmarks
+
+    results = benchmarks.bench_architectures(arch, profile, epochs, n_windows, save)
+    print(f"{'arquitetura':>12} {'acurácia':>9} {'parâmetros':>11} {'p50 ms':>8} {'p99 ms':>8}")
+    for label, stats in results.items():
+        print(
+            f"{label:>12} {stats['accuracy']:9.4f} {stats['params']:11d}"
+            f" {stats['p50_ms']:8.2f} {stats['p99_ms']:8.2f}"
+        )
+
+
+@bench_app.command("stateful")
+def bench_stateful(file: Path, model_name: str = "model", timesteps: int = 50, hop: int = 10):
+    """
+    Custo por amostra: janelas x LSTM com estado, em uma captura gravada
+    """
+    from src import benchmarks
+
+    results = benchmarks.bench_stateful(str(file), model_name, timesteps, hop)
+    print(
+        f"{'engine':>22} {'us/amostra':>11} {'p50 ms':>8} {'p99 ms':>8}"
+        f" {'concordância':>13} {'detectados':>11}"
+    )
+    for label, stats in results.items():
+        print(
+            f"{label:>22} {stats['us_per_sample']:11.1f} {stats['update_p50_ms']:8.2f}"
+            f" {stats['update_p99_ms']:8.2f} {stats['agreement']:13.3f}"
+            f" {stats['detected']:>6}/{stats['movements']}"
+        )
+
+
+@bench_app.command("plotter")
+def bench_plotter(rate: list[float] = [100.0, 1000.0], seconds: float = 3.0, fps: float = 0.0):
+    """
+    Quadros/s do gráfico em tempo real (Agg, sem janela): blit x redesenho completo\n
+
+    --fps : limita os quadros por segundo (0 = sem limite, mede a capacidade)
+    """
+    from src import benchmarks
+
+    results = benchmarks.bench_plotter(rate, seconds, fps=fps)
+    print(f"{'modo':>14} {'quadros/s':>10} {'push p99 us':>12} {'blocos atrasados':>17} {'atraso máx':>11}")
+    for label, stats in results.items():
+        print(
+            f"{label:>14} {stats['fps']:10.1f} {stats['push_p99_us']:12.1f}"
+            f" {stats['late_blocks']:17.1%} {stats['max_late_ms']:9.1f}ms"
+        )
+
+
+@bench_app.command("startup")
+def bench_startup(scale: float = 1.0):
+    """
+    Tempo de import dos comandos (python -X importtime); falha se algum passar do orçamento\n
+
+    --scale : multiplica os orçamentos (máquinas mais lentas)
+    """
+    from src import benchmarks
+
+    results = benchmarks.bench_startup(scale=scale)
+    for label, stats in results.items():
+        marca = "✅" if stats["ok"] else "❌"
+        print(f"{marca} {label:>22}: {stats['import_s']:.3f}s (orçamento {stats['budget_s']:.1f}s)")
+        if stats["error"]:
+            print(f"      erro: {stats['error']}")
+        elif not stats["ok"]:
+            for tempo, modulo in stats["slowest"]:
+                print(f"      {tempo:.3f}s {modulo}")
+    if not all(stats["ok"] for stats in results.values()):
+        raise typer.Exit(code=1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,86 @@
+import keras
+from keras import layers
+
+
+def lstm(num_features: int, n_classes: int, lstm_units=(64, 32), dense_units: int = 32, **_):
+    """
+    Stacked LSTM: one LSTM layer per entry of `lstm_units`.
+
+    The LSTM layers keep the defaults required by the fused cuDNN kernel
+    (tanh/sigmoid, no recurrent dropout, not unrolled), so the same model
+    uses it when a GPU is available.
+    """
+    recorrentes = [
+        layers.LSTM(units, return_sequences=i < len(lstm_units) - 1)
+        for i, units in enumerate(lstm_units)
+    ]
+    return keras.Sequential(
+        [
+            keras.Input((None, num_features)),
+            *recorrentes,
+            layers.Dense(dense_units, activation="relu"),
+            layers.Dense(n_classes, activation="softmax"),
+        ]
+    )
+
+
+def tcn(
+    num_features: int,
+    n_classes: int,
+    filters: int = 32,
+    kernel_size: int = 3,
+    dilations=(1, 2, 4, 8, 16),
+    dense_units: int = 32,
+    **_,
+):
+    """
+    Temporal convolutional network: residual blocks of causal, dilated 1D
+    convolutions. Each block stacks two convolutions, so the receptive field
+    is 1 + 2 * (kernel_size - 1) * sum(dilations): 125 samples with the
+    defaults, longer than a 50-sample window.
+    """
+    entrada = keras.Input((None, num_features))
+    x = layers.Conv1D(filters, 1)(entrada)
+    for dilation in dilations:
+        y = layers.Conv1D(
+            filters, kernel_size, padding="causal", dilation_rate=dilation, activation="relu"
+        )(x)
+        y = layers.Conv1D(
+            filters, kernel_size, padding="causal", dilation_rate=dilation, activation="relu"
+        )(y)
+        x = layers.Add()([x, y])
+    x = layers.GlobalAveragePooling1D()(x)
+    x = layers.Dense(dense_units, activation="relu")(x)
+    return keras.Model(entrada, layers.Dense(n_classes, activation="softmax")(x))
+
+
+def sepcnn(
+    num_features: int,
+    n_classes: int,
+    filters=(32, 64),
+    kernel_size: int = 5,
+    dense_units: int = 32,
+    **_,
+):
+    """
+    Depthwise-separable 1D CNN: separable convolution blocks with pooling,
+    then global average pooling.
+    """
+    blocos = []
+    for f in filters:
+        blocos += [
+            layers.SeparableConv1D(f, kernel_size, padding="same", activation="relu"),
+            layers.MaxPooling1D(2, padding="same"),
+        ]
+    return keras.Sequential(
+        [
+            keras.Input((None, num_features)),
+            *blocos,
+            layers.GlobalAveragePooling1D(),
+            layers.Dense(dense_units, activation="relu"),
+            layers.Dense(n_classes, activation="softmax"),
+        ]
+    )
+
+
+ARCHITECTURES = {"lstm": lstm, "tcn": tcn, "sepcnn": sepcnn}
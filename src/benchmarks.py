@@ -0,0 +1,678 @@
+import time
+import numpy as np
+
+
+def latency_stats(times):
+    """
+    Summarize a list of durations (seconds) as p50/p99/mean in milliseconds.
+    """
+    times_ms = np.asarray(times) * 1e3
+    return {
+        "p50_ms": float(np.percentile(times_ms, 50)),
+        "p99_ms": float(np.percentile(times_ms, 99)),
+        "mean_ms": float(times_ms.mean()),
+    }
+
+
+def time_calls(fn, inputs, warmup: int = 5):
+    """
+    Call `fn` on every element of `inputs` and return the duration of each call.
+    """
+    for x in inputs[:warmup]:
+        fn(x)
+
+    times = []
+    for x in inputs:
+        inicio = time.perf_counter()
+        fn(x)
+        times.append(time.perf_counter() - inicio)
+    return times
+
+
+def random_windows(preprocessor, n_windows: int, seed: int = 0):
+    """
+    Generate `n_windows` raw windows distributed like the data the
+    preprocessor's scaler was fitted on.
+    """
+    scaler = preprocessor.named_steps["scaler"]
+    timesteps = preprocessor.named_steps["reshape3d"].timesteps
+    rng = np.random.default_rng(seed)
+    return rng.normal(
+        scaler.mean_, scaler.scale_, size=(n_windows, 1, timesteps, len(scaler.mean_))
+    ).astype(np.float32)
+
+
+def bench_inference(model_name: str = "model", n_windows: int = 200):
+    """
+    Per-window latency of the `model.predict` path against the compiled path.
+    """
+    from src.train_lib import load_model, load_preprocessor, build_predictor
+
+    model = load_model(model_name)
+    preprocessor = load_preprocessor(model_name)
+    windows = random_windows(preprocessor, n_windows)
+
+    results = {}
+    outputs = {}
+    for label, compiled in [("predict", False), ("compiled", True)]:
+        predict_proba = build_predictor(model, preprocessor, compiled)
+        results[label] = latency_stats(time_calls(predict_proba, windows))
+        outputs[label] = np.concatenate([predict_proba(x) for x in windows[:20]])
+
+    results["max_abs_diff"] = float(
+        np.abs(outputs["predict"] - outputs["compiled"]).max()
+    )
+    return results
+
+
+def fake_devices(files: list[str], n_devices: int, rate_hz: float, protocol: str):
+    """
+    Build `n_devices` FakeSerial ports replaying the given recordings in a
+    loop (device i replays files[i % len(files)]).
+    """
+    from src.data_helpers import load_cached_data
+    from src.serial_protocol import FakeSerial
+
+    recordings = [np.asarray(load_cached_data(f))[:, :12] for f in files]
+    return {
+        f"fake{i}": FakeSerial(
+            recordings[i % len(recordings)], protocol, rate_hz=rate_hz, loop=True
+        )
+        for i in range(n_devices)
+    }
+
+
+def bench_multistream(
+    files: list[str],
+    model_name: str = "model",
+    n_devices: int = 8,
+    rate_hz: float = 100.0,
+    duration: float = 30.0,
+    hop: int = 10,
+    protocol: str = "binary",
+):
+    """
+    Load test: N simulated devices feeding one shared, batched classifier.
+    Reports per-device throughput/drops and the shared inference load.
+    """
+    from src.train_lib import load_batch_classifier
+    from src.pipeline import build_pipeline
+
+    classify_batch = load_batch_classifier(model_name, compiled=True)
+    sources = fake_devices(files, n_devices, rate_hz, protocol)
+    pipeline = build_pipeline(sources, classify_batch, protocol, hop=hop)
+
+    cpu_inicio = time.process_time()
+    inicio = time.perf_counter()
+    pipeline.start()
+    time.sleep(duration)
+    pipeline.stop()
+    wall = time.perf_counter() - inicio
+    cpu = time.process_time() - cpu_inicio
+
+    devices = pipeline.stats()
+    windows = sum(d["windows"] for d in devices.values())
+    return {
+        "devices": devices,
+        "wall_s": wall,
+        "cpu_cores": cpu / wall,
+        "samples_per_s": sum(d["received"] for d in devices.values()) / wall,
+        "windows_per_s": windows / wall,
+        "mean_batch": float(np.mean(pipeline.batch_sizes)) if pipeline.batch_sizes else 0.0,
+        "tick": latency_stats(pipeline.inference_times) if pipeline.inference_times else None,
+        "detections": pipeline.results.qsize(),
+    }
+
+
+def bench_replay(
+    files: list[str],
+    model_name: str = "model",
+    speed: float = 0.0,
+    transport: str = "replay",
+    protocol: str = "binary",
+    timesteps: int = 50,
+    hop: int = 10,
+    votes: int = 3,
+    refractory: int = 100,
+):
+    """
+    Replay captures through the live AcquisitionPipeline, one device per
+    file, until every capture has been consumed (`transport` is `replay`,
+    in memory, or `pty`, through a pseudo-terminal).
+
+    The rings hold a whole capture and no window is skipped, so at any
+    `speed` every window is classified in order and the detections are the
+    same on every run; `digest` summarizes them for regression checks.
+    Detection latency is measured on the recorded timeline, from the onset
+    of each labeled movement.
+    """
+    import hashlib
+    import queue
+    from src.data_helpers import load_cached_recording
+    from src.pipeline import build_pipeline
+    from src.sources import open_source
+    from src.streaming import movement_latency
+    from src.train_lib import load_batch_classifier
+
+    classify_batch = load_batch_classifier(model_name, compiled=True)
+    recordings = {f: load_cached_recording(f) for f in files}
+    # timeout curto: as threads de leitura param logo depois do fim das capturas
+    sources = {
+        f: open_source(f"{transport}:{f}", protocol=protocol, speed=speed, timeout=0.1)
+        for f in files
+    }
+    capacity = max(len(r) for r in recordings.values()) + 1
+    pipeline = build_pipeline(
+        sources,
+        classify_batch,
+        protocol,
+        timesteps,
+        hop,
+        votes,
+        refractory,
+        capacity=capacity,
+        max_windows=None,
+    )
+
+    def consumido():
+        # contagem recebida por dispositivo quando tudo foi lido e drenado
+        if all(ser.exhausted for ser in sources.values()) and all(
+            len(stream.ring) == 0 for stream in pipeline.streams
+        ):
+            return [stream.ring.received for stream in pipeline.streams]
+        return None
+
+    detections = {f: [] for f in files}
+    atrasos = []
+    anterior = None
+    cpu_inicio = time.process_time()
+    inicio = time.perf_counter()
+    pipeline.start()
+    while pipeline.is_running():
+        try:
+            nome, deteccao = pipeline.results.get(timeout=0.05)
+        except queue.Empty:
+            # estável entre duas verificações: a última leitura já chegou ao ring
+            atual = consumido()
+            if atual is not None and atual == anterior:
+                break
+            anterior = atual
+            continue
+        detections[nome].append(deteccao)
+        if speed > 0:
+            # instante em que a amostra que gerou a detecção chegou pela "serial"
+            tempos = recordings[nome][:, 0]
+            chegada = (tempos[deteccao.index - 1] - tempos[0]) / speed
+            atrasos.append(time.perf_counter() - inicio - chegada)
+    # o último lote pode ser grande em velocidade máxima
+    pipeline.stop(timeout=30.0)
+    wall = time.perf_counter() - inicio
+    cpu = time.process_time() - cpu_inicio
+    while not pipeline.results.empty():
+        nome, deteccao = pipeline.results.get()
+        detections[nome].append(deteccao)
+    for ser in sources.values():
+        ser.close()
+
+    latencies = []
+    movements = missed = 0
+    for f, recording in recordings.items():
+        onsets, perdidos, atraso = movement_latency(
+            recording[:, 0] - recording[0, 0], recording[:, 13].astype(int), detections[f]
+        )
+        movements += len(onsets)
+        missed += perdidos
+        latencies += atraso
+
+    devices = pipeline.stats()
+    samples = sum(d["received"] for d in devices.values())
+    resumo = repr([(f, [(d.index, d.class_id) for d in detections[f]]) for f in files])
+    return {
+        "devices": devices,
+        "wall_s": wall,
+        "cpu_cores": cpu / wall,
+        "samples_per_s": samples / wall,
+        "windows_per_s": sum(d["windows"] for d in devices.values()) / wall,
+        "recording_s": sum(float(r[-1, 0] - r[0, 0]) for r in recordings.values()),
+        "detections": sum(len(d) for d in detections.values()),
+        "digest": hashlib.sha1(resumo.encode()).hexdigest()[:12],
+        "movements": movements,
+        "missed": missed,
+        "detection_latency": latency_stats(latencies) if latencies else None,
+        "emit_delay": latency_stats(atrasos) if atrasos else None,
+        "tick": latency_stats(pipeline.inference_times) if pipeline.inference_times else None,
+    }
+
+
+def _webapp_clients(url, n_clients, n_slow, slow_delay, ready, start, stop, results):
+    """
+    Worker process of `bench_webapp`: `n_clients` Socket.IO clients, the
+    first `n_slow` of them slow.
+    """
+    import socketio as sio
+
+    latencias = {"fast": [], "slow": []}
+    contagens = []
+    clientes = []
+    for i in range(n_clients):
+        client = sio.Client()
+        lento = i < n_slow
+        contagem = [0]
+
+        def estado(payload, lento=lento, contagem=contagem):
+            if start.is_set() and not stop.is_set():
+                latencias["slow" if lento else "fast"].append(time.time() - payload["time"])
+                contagem[0] += 1
+            if lento:
+                time.sleep(slow_delay)
+            return True
+
+        client.on("estado", estado)
+        client.connect(url, transports=["polling"])
+        client.emit("join", "fake0")
+        clientes.append(client)
+        contagens.append((lento, contagem))
+    ready.put(n_clients)
+
+    stop.wait()
+    results.put(
+        (
+            latencias,
+            [c[0] for lento, c in contagens if not lento],
+            [c[0] for lento, c in contagens if lento],
+        )
+    )
+    for client in clientes:
+        client.disconnect()
+
+
+def bench_webapp(
+    n_clients: int = 200,
+    slow_fraction: float = 0.1,
+    slow_delay: float = 0.5,
+    rate_hz: float = 20.0,
+    duration: float = 10.0,
+    frame_rate: float = 30.0,
+    async_mode: str = "threading",
+    processes: int = 4,
+    port: int = 5055,
+):
+    """
+    Load test of the web server: `n_clients` simulated browsers (Socket.IO
+    clients over long-polling, spread over `processes` worker processes)
+    subscribed to one device that publishes `rate_hz` detections per second.
+    A `slow_fraction` of the clients takes `slow_delay` seconds to handle
+    each update.
+
+    Emit latency is measured from `publish` to the client receiving the state
+    that contains it.
+    """
+    import logging
+    import multiprocessing
+    import threading
+    from src import webapp
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    webapp.DEVICES[:] = ["fake0"]
+    webapp.start_server(async_mode, frame_rate)
+    threading.Thread(
+        target=webapp.socketio.run,
+        args=(webapp.app,),
+        kwargs=dict(port=port, log_output=False, allow_unsafe_werkzeug=True),
+        daemon=True,
+    ).start()
+    time.sleep(1)
+
+    # spawn: os processos clientes não herdam o estado do TensorFlow
+    ctx = multiprocessing.get_context("spawn")
+    ready, results = ctx.Queue(), ctx.Queue()
+    start, stop = ctx.Event(), ctx.Event()
+    n_lentos = int(n_clients * slow_fraction)
+    workers = []
+    for k in range(processes):
+        n = n_clients // processes + (k < n_clients % processes)
+        lentos = n_lentos // processes + (k < n_lentos % processes)
+        workers.append(
+            ctx.Process(
+                target=_webapp_clients,
+                args=(f"http://127.0.0.1:{port}", n, lentos, slow_delay, ready, start, stop, results),
+                daemon=True,
+            )
+        )
+    for worker in workers:
+        worker.start()
+    for _ in workers:
+        ready.get()
+    time.sleep(1)
+
+    publicados = webapp.broadcaster.published
+    emitidos = webapp.broadcaster.emitted
+    adiados = webapp.broadcaster.deferred
+    start.set()
+    cpu_inicio = time.process_time()
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < duration:
+        webapp.broadcaster.publish("fake0", "Ippon")
+        time.sleep(1 / rate_hz)
+    wall = time.perf_counter() - inicio
+    cpu = time.process_time() - cpu_inicio
+    stop.set()
+
+    latencias = {"fast": [], "slow": []}
+    rapidos, lentos = [], []
+    for _ in workers:
+        parcial, r, l = results.get()
+        latencias["fast"] += parcial["fast"]
+        latencias["slow"] += parcial["slow"]
+        rapidos += r
+        lentos += l
+    for worker in workers:
+        worker.join(10)
+    webapp.RUNNING = False
+
+    return {
+        "clients": n_clients,
+        "slow_clients": n_lentos,
+        "published_per_s": (webapp.broadcaster.published - publicados) / wall,
+        "emits_per_s": (webapp.broadcaster.emitted - emitidos) / wall,
+        "deferred_per_s": (webapp.broadcaster.deferred - adiados) / wall,
+        "updates_per_client_s": float(np.mean(rapidos)) / wall if rapidos else 0.0,
+        "updates_per_slow_client_s": float(np.mean(lentos)) / wall if lentos else 0.0,
+        "latency_fast": latency_stats(latencias["fast"]) if latencias["fast"] else None,
+        "latency_slow": latency_stats(latencias["slow"]) if latencias["slow"] else None,
+        "server_cpu_cores": cpu / wall,
+    }
+
+
+def bench_backends(
+    model_name: str = "model",
+    quantizations: list[str] = ["float32", "float16", "int8"],
+    n_windows: int = 200,
+):
+    """
+    Accuracy on all of `test_data` and per-window latency (first `n_windows`
+    windows, one at a time) of the Keras model against its TFLite exports.
+    """
+    from src.data_helpers import get_data
+    from src.train_lib import MODEL_FOLDER, build_predictor, load_model, load_preprocessor
+    from src.tflite_backend import build_tflite_predictor, tflite_path
+
+    data, classes = get_data("test_data")
+    y_true = classes.astype(int)
+    windows = data[:n_windows, np.newaxis]
+
+    predictors = {}
+    model = load_model(model_name)
+    preprocessor = load_preprocessor(model_name)
+    predictors["keras"] = (
+        build_predictor(model, preprocessor, compiled=True),
+        MODEL_FOLDER / f"{model_name}.keras",
+    )
+    for quantization in quantizations:
+        filepath = tflite_path(model_name, quantization)
+        if not filepath.is_file():
+            print(f"⚠️ {filepath} não encontrado (rode `export`), ignorando")
+            continue
+        predictors[f"tflite-{quantization}"] = (build_tflite_predictor(filepath), filepath)
+
+    results = {}
+    for label, (predict_proba, filepath) in predictors.items():
+        y_pred = np.argmax(predict_proba(data), axis=1)
+        results[label] = {
+            "accuracy": float((y_pred == y_true).mean()),
+            **latency_stats(time_calls(predict_proba, windows)),
+            "size_kb": filepath.stat().st_size / 1024,
+        }
+    return results
+
+
+def bench_architectures(
+    archs: list[str] = ["lstm", "tcn", "sepcnn", "gbt"],
+    profile: str = "fast",
+    epochs: int = 0,
+    n_windows: int = 200,
+    save: bool = False,
+):
+    """
+    Train every architecture in `archs` with the same training profile and
+    report accuracy on all of `test_data`, parameter count and per-window
+    latency (first `n_windows` windows, one at a time, compiled predictor).
+    With `save`, each model is kept as `arch_<arch>`. For `gbt` the
+    parameter count is the number of trees.
+    """
+    from src.data_helpers import get_data
+    from src.features import build_feature_predictor
+    from src.train_lib import TRAINING_PROFILES, build_predictor, scaled_learning_rate, train_model
+
+    config = dict(TRAINING_PROFILES[profile])
+    if epochs:
+        config["epochs"] = epochs
+
+    data, classes = get_data("test_data")
+    y_true = classes.astype(int)
+    windows = data[:n_windows, np.newaxis]
+
+    results = {}
+    for arch in archs:
+        print(f"🧠 Treinando {arch}...")
+        model, pipe, _ = train_model(
+            "train_data",
+            f"arch_{arch}",
+            learning_rate=scaled_learning_rate(config["batch_size"]),
+            save=save,
+            verbose=0,
+            report=False,
+            arch=arch,
+            **config,
+        )
+        if arch == "gbt":
+            clf = model.named_steps["clf"]
+            predict_proba = build_feature_predictor(model)
+            # "parâmetros" de um modelo de árvores: total de árvores (API pública)
+            n_params = clf.n_iter_ * clf.n_trees_per_iteration_
+        else:
+            predict_proba = build_predictor(model, pipe, compiled=True)
+            n_params = model.count_params()
+        y_pred = np.argmax(predict_proba(data), axis=1)
+        results[arch] = {
+            "accuracy": float((y_pred == y_true).mean()),
+            "params": n_params,
+            **latency_stats(time_calls(predict_proba, windows)),
+        }
+    return results
+
+
+def bench_stateful(
+    file: str,
+    model_name: str = "model",
+    timesteps: int = 50,
+    hop: int = 10,
+    configs=((None, None), (2, 100), (1, None)),
+):
+    """
+    Replay a recording (as fast as possible) through the windowed engine and
+    through StatefulStreamingClassifier for each `(lanes, period)` in
+    `configs`, reporting the cost per sample and the agreement of the
+    stateful predictions with the windowed model.
+    """
+    from numpy.lib.stride_tricks import sliding_window_view
+    from src.data_helpers import load_csv_recording
+    from src.stateful import StatefulStreamingClassifier
+    from src.streaming import StreamingClassifier, replay_csv
+    from src.train_lib import build_classifier, build_predictor, load_model, load_preprocessor
+
+    model = load_model(model_name)
+    preprocessor = load_preprocessor(model_name)
+
+    samples = load_csv_recording(file)[:, 1:13].astype(np.float32)
+    windows = sliding_window_view(samples, (timesteps, samples.shape[1]))[::hop, 0]
+    reference = build_predictor(model, preprocessor, compiled=True)(windows)
+
+    engines = {
+        "windowed": StreamingClassifier(
+            build_classifier(model, preprocessor, compiled=True), timesteps, hop=hop
+        )
+    }
+    agreement = {"windowed": 1.0}
+    for lanes, period in configs:
+        engine = StatefulStreamingClassifier(
+            model, preprocessor, timesteps, hop, lanes=lanes, period=period
+        )
+        label = f"stateful L={engine.lstm.lanes} P={engine.period}"
+        _, probas = engine.advance(samples)
+        agreement[label] = float(
+            (np.argmax(probas, axis=1) == np.argmax(reference, axis=1)).mean()
+        )
+        engines[label] = engine
+
+    results = {}
+    for label, engine in engines.items():
+        result = replay_csv(file, engine, speed=0)
+        results[label] = {
+            "us_per_sample": result["duration_s"] / result["samples"] * 1e6,
+            "update_p50_ms": result["inference_p50_ms"],
+            "update_p99_ms": result["inference_p99_ms"],
+            "agreement": agreement[label],
+            "detected": result["movements"] - result["missed"],
+            "movements": result["movements"],
+        }
+    return results
+
+
+def bench_plotter(
+    rates: list[float] = [100.0, 1000.0],
+    seconds: float = 3.0,
+    janela_tempo: float = 2.0,
+    block_s: float = 0.01,
+    fps: float = 0.0,
+):
+    """
+    Headless (Agg) RealtimePlotter benchmark. For each input rate, a thread
+    pushes synthetic samples in blocks of `block_s` seconds (like the serial
+    thread) while frames are drawn for `seconds` (back to back, or at most
+    `fps` per second), with blitting and with a full redraw per frame.
+    Reports frames/s and how late the pushes were against their schedule.
+    """
+    import threading
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from src.visualizer import RealtimePlotter
+
+    results = {}
+    for rate in rates:
+        for blit in (True, False):
+            fig = Figure(figsize=(16, 10))
+            FigureCanvasAgg(fig)
+            plotter = RealtimePlotter(janela_tempo, rate, blit=blit, fig=fig)
+            fig.canvas.draw()
+
+            stop = threading.Event()
+            atrasos = []
+            push_times = []
+
+            def produtor():
+                n = max(1, int(rate * block_s))
+                inicio = time.perf_counter()
+                k = 0
+                while not stop.is_set():
+                    t = k * n / rate + np.arange(n) / rate
+                    amostras = np.sin(t[:, np.newaxis] * (1 + np.arange(12)))
+                    amostras[:, 3:6] *= 200
+                    amostras[:, 9:12] *= 200
+                    t0 = time.perf_counter()
+                    plotter.push(t, amostras, int(t[0] % 1.0 > 0.6))
+                    push_times.append(time.perf_counter() - t0)
+                    k += 1
+                    proximo = inicio + k * block_s
+                    espera = proximo - time.perf_counter()
+                    if espera > 0:
+                        time.sleep(espera)
+                    else:
+                        atrasos.append(-espera)
+
+            thread = threading.Thread(target=produtor, daemon=True)
+            thread.start()
+            time.sleep(janela_tempo / 4)
+
+            inicio = time.perf_counter()
+            plotter.frames = 0
+            while time.perf_counter() - inicio < seconds:
+                quadro = time.perf_counter()
+                plotter.draw_frame()
+                if fps:
+                    time.sleep(max(0.0, 1.0 / fps - (time.perf_counter() - quadro)))
+            duracao = time.perf_counter() - inicio
+            stop.set()
+            thread.join()
+
+            results[f"{rate:g} Hz {'blit' if blit else 'full'}"] = {
+                "fps": plotter.frames / duracao,
+                "push_p99_us": float(np.percentile(push_times, 99)) * 1e6,
+                "late_blocks": len(atrasos) / max(1, len(push_times)),
+                "max_late_ms": max(atrasos, default=0.0) * 1e3,
+            }
+    return results
+
+
+# (argumentos do python, orçamento de tempo de import em segundos)
+STARTUP_BUDGETS = {
+    "main.py --help": (["main.py", "--help"], 1.0),
+    "web --help": (["main.py", "web", "--help"], 1.0),
+    "visualize --help": (["main.py", "visualize", "--help"], 1.0),
+    "web (imports)": (["-c", "import src.webapp"], 1.5),
+    "visualize (imports)": (["-c", "import src.visualizer"], 1.5),
+    "captura (imports)": (["-c", "import src.mpu_read_serial"], 1.5),
+    "replay (imports)": (["-c", "import src.streaming, src.stateful, src.pipeline"], 1.0),
+}
+
+
+def import_time(args: list[str]):
+    """
+    Run `python -X importtime <args>` and return the total import time in
+    seconds (sum of the cumulative time of the top-level imports), the
+    slowest top-level modules and, when the command fails, the last line of
+    its error output (else None).
+    """
+    import subprocess
+    import sys
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+    )
+    modulos = []
+    erros = []
+    for linha in proc.stderr.splitlines():
+        if not linha.startswith("import time:"):
+            erros.append(linha)
+            continue
+        _, cumulativo, nome = linha[len("import time:") :].split("|")
+        # imports aninhados são indentados; só os do nível superior somam
+        if nome.startswith("  ") or not cumulativo.strip().isdigit():
+            continue
+        modulos.append((int(cumulativo) / 1e6, nome.strip()))
+    modulos.sort(reverse=True)
+    erro = None
+    if proc.returncode != 0:
+        erro = erros[-1] if erros else f"exit code {proc.returncode}"
+    return sum(t for t, _ in modulos), modulos[:5], erro
+
+
+def bench_startup(budgets: dict = STARTUP_BUDGETS, scale: float = 1.0):
+    """
+    Check the import time of each entry of `budgets` against its budget
+    (multiplied by `scale`, for slower machines). A command that exits with
+    an error fails regardless of its time.
+    """
+    results = {}
+    for label, (args, budget) in budgets.items():
+        total, slowest, error = import_time(args)
+        results[label] = {
+            "import_s": total,
+            "budget_s": budget * scale,
+            "ok": error is None and total <= budget * scale,
+            "slowest": slowest,
+            "error": error,
+        }
+    return results
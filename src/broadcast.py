@@ -0,0 +1,318 @@
+from collections import deque
+import threading
+import time
+import numpy as np
+from src.metrics import METRICS
+from src.pipeline import SampleRing
+
+
+class StateBroadcaster:
+    """
+    Coalesce detections into per-device state and push it to clients at a
+    fixed frame rate.
+
+    The inference side only calls `publish`, which never blocks on the
+    network. Every `interval` seconds `flush` sends each client the latest
+    state of its device (the last `history` movements), at most once per
+    frame and only when it changed. A client gets a new state only after
+    acknowledging the previous one, so a slow client skips intermediate
+    states and receives the latest instead of accumulating a backlog.
+    """
+
+    def __init__(self, emit, interval: float = 1 / 30, history: int = 10, ack_timeout: float = 5.0):
+        # emit(payload, sid, callback): envia o estado a um cliente
+        self.emit = emit
+        self.interval = interval
+        self.history = history
+        self.ack_timeout = ack_timeout
+
+        self._lock = threading.Lock()
+        self._states = {}
+        # sid -> [dispositivo, versão enviada, instante do envio pendente ou None]
+        self._clients = {}
+
+        self.published = 0
+        self.emitted = 0
+        # estados não enviados a um cliente por ainda aguardar o ack anterior
+        self.deferred = 0
+
+        # instante (monotônico) do último `publish` de cada dispositivo,
+        # fora do payload enviado
+        self._published_at = {}
+        stage = "Latency of each processing stage"
+        self._emit_time = METRICS.histogram("stage_seconds", stage, stage="emit")
+        self._publish_to_emit = METRICS.histogram("stage_seconds", stage, stage="publish_to_emit")
+        METRICS.callback("emits_total", lambda: self.emitted, "States sent to clients", "counter")
+        METRICS.callback(
+            "deferred_total",
+            lambda: self.deferred,
+            "States held back while a client had not acknowledged the previous one",
+            "counter",
+        )
+
+    def _state(self, device):
+        if device not in self._states:
+            self._states[device] = {
+                "device": device,
+                "version": 0,
+                "movements": deque(maxlen=self.history),
+                "time": 0.0,
+            }
+        return self._states[device]
+
+    def publish(self, device: str, movement: str):
+        with self._lock:
+            state = self._state(device)
+            state["version"] += 1
+            state["movements"].append({"key": state["version"], "name": movement})
+            state["time"] = time.time()
+            self._published_at[device] = time.monotonic()
+            self.published += 1
+
+    def subscribe(self, sid, device: str):
+        with self._lock:
+            self._state(device)
+            self._clients[sid] = [device, 0, None]
+
+    def unsubscribe(self, sid):
+        with self._lock:
+            self._clients.pop(sid, None)
+
+    def _ack(self, sid, version):
+        with self._lock:
+            client = self._clients.get(sid)
+            if client is not None:
+                client[1] = max(client[1], version)
+                client[2] = None
+
+    def flush(self):
+        """
+        Send the current state to every client that is behind and not
+        waiting for an ack. Returns the number of emits.
+        """
+        agora = time.monotonic()
+        envios = []
+        with self._lock:
+            for sid, client in self._clients.items():
+                device, enviada, pendente = client
+                state = self._states[device]
+                if state["version"] <= enviada:
+                    continue
+                if pendente is not None and agora - pendente < self.ack_timeout:
+                    self.deferred += 1
+                    continue
+                client[2] = agora
+                payload = dict(state, movements=list(state["movements"]))
+                envios.append((sid, payload, self._published_at.get(device, agora)))
+
+        for sid, payload, publicado in envios:
+            versao = payload["version"]
+            inicio = time.monotonic()
+            self._publish_to_emit.record(inicio - publicado)
+            self.emit(payload, sid, lambda *_, sid=sid, versao=versao: self._ack(sid, versao))
+            self._emit_time.record(time.monotonic() - inicio)
+        self.emitted += len(envios)
+        return len(envios)
+
+    def run(self, running, sleep=time.sleep):
+        """
+        Flush every `interval` seconds while `running()` is true. `sleep` is
+        the server's sleep (e.g. `socketio.sleep`) so the loop cooperates
+        with eventlet/gevent.
+        """
+        while running():
+            inicio = time.monotonic()
+            self.flush()
+            sleep(max(0.0, self.interval - (time.monotonic() - inicio)))
+
+
+class SensorBroadcaster:
+    """
+    Stream decimated raw samples and class probabilities of each device to
+    dashboard clients as binary frames.
+
+    The inference side calls `samples` and `probabilities`, which only copy
+    into a per-device SampleRing and never block. Every `interval` seconds
+    `flush` drains the rings and sends each client the new samples of its
+    device, keeping one of every `decimation` samples, packed as float16
+    `(n, num_features)` bytes.
+
+    The decimation is adapted per client from its acks: a client that has
+    not acknowledged the previous frame when the next one is due skips it
+    and has its decimation doubled (up to `max_decimation`); after
+    `recover_after` frames acknowledged within the interval, it is halved.
+    An ack missing for more than `ack_timeout` seconds is treated as lost.
+    """
+
+    def __init__(
+        self,
+        emit,
+        interval: float = 0.05,
+        capacity: int = 4096,
+        num_features: int = 12,
+        max_decimation: int = 64,
+        recover_after: int = 20,
+        ack_timeout: float = 5.0,
+    ):
+        # emit(payload, sid, callback): envia um quadro a um cliente
+        self.emit = emit
+        self.interval = interval
+        self.capacity = capacity
+        self.num_features = num_features
+        self.max_decimation = max_decimation
+        self.recover_after = recover_after
+        self.ack_timeout = ack_timeout
+
+        self._lock = threading.Lock()
+        # dispositivo -> {"ring", "received", "proba"}
+        self._devices = {}
+        # sid -> estado do cliente (ver `subscribe`)
+        self._clients = {}
+
+        self.frames = 0
+        self.bytes_sent = 0
+        self.skipped = 0
+
+        self._emit_time = METRICS.histogram(
+            "stage_seconds", "Latency of each processing stage", stage="sensor_emit"
+        )
+        METRICS.callback(
+            "sensor_frames_total", lambda: self.frames, "Dashboard frames sent", "counter"
+        )
+        METRICS.callback(
+            "sensor_bytes_total",
+            lambda: self.bytes_sent,
+            "Sample bytes sent to the dashboard",
+            "counter",
+        )
+        METRICS.callback(
+            "sensor_skipped_frames_total",
+            lambda: self.skipped,
+            "Dashboard frames skipped for clients that had not acknowledged the previous one",
+            "counter",
+        )
+
+    def _device(self, device):
+        # chamado pela thread de inferência e pelos handlers do Socket.IO
+        with self._lock:
+            if device not in self._devices:
+                self._devices[device] = {
+                    "ring": SampleRing(self.capacity, self.num_features),
+                    "received": 0,
+                    "proba": None,
+                }
+            return self._devices[device]
+
+    def samples(self, device: str, samples):
+        """
+        New raw samples `(n, num_features)` of `device`.
+        """
+        if len(samples):
+            self._device(device)["ring"].put(samples)
+
+    def probabilities(self, device: str, proba):
+        """
+        Latest class probabilities of `device`.
+        """
+        state = self._device(device)
+        with self._lock:
+            state["proba"] = proba
+
+    def subscribe(self, sid, device: str):
+        self._device(device)
+        with self._lock:
+            self._clients[sid] = {
+                "device": device,
+                "decimation": 1,
+                # amostras a pular antes da próxima enviada
+                "offset": 0,
+                "pending": None,
+                "good": 0,
+            }
+
+    def unsubscribe(self, sid):
+        with self._lock:
+            self._clients.pop(sid, None)
+
+    def _ack(self, sid, sent_at):
+        with self._lock:
+            client = self._clients.get(sid)
+            if client is None or client["pending"] != sent_at:
+                return
+            client["pending"] = None
+            if time.monotonic() - sent_at <= self.interval:
+                client["good"] += 1
+                if client["good"] >= self.recover_after and client["decimation"] > 1:
+                    client["decimation"] //= 2
+                    client["good"] = 0
+            else:
+                client["good"] = 0
+
+    def flush(self):
+        """
+        Drain the device rings and send one frame to every client that
+        acknowledged the previous one and whose device has new samples.
+        Returns the number of frames sent.
+        """
+        agora = time.monotonic()
+        novos = {}
+        with self._lock:
+            dispositivos = list(self._devices.items())
+        for device, state in dispositivos:
+            amostras = state["ring"].get(timeout=0)
+            novos[device] = (state["received"], amostras)
+            state["received"] += len(amostras)
+
+        envios = []
+        with self._lock:
+            for sid, client in self._clients.items():
+                inicio, amostras = novos.get(client["device"], (0, None))
+                if amostras is None or len(amostras) == 0:
+                    # dispositivo ocioso: nada a enviar nem ack a esperar
+                    continue
+                k = client["decimation"]
+                if client["pending"] is not None and agora - client["pending"] > self.ack_timeout:
+                    # ack perdido: libera o cliente, mantendo a decimação atual
+                    client["pending"] = None
+                if client["pending"] is not None:
+                    # quadro anterior sem ack: pula este e reduz a taxa
+                    client["decimation"] = min(self.max_decimation, 2 * k)
+                    client["good"] = 0
+                    client["offset"] = (client["offset"] - len(amostras)) % k
+                    self.skipped += 1
+                    continue
+                escolhidas = np.arange(client["offset"], len(amostras), k)
+                client["offset"] = (client["offset"] - len(amostras)) % k
+                proba = self._devices[client["device"]]["proba"]
+                client["pending"] = agora
+                envios.append(
+                    (
+                        sid,
+                        {
+                            "device": client["device"],
+                            # índice (desde o início) da primeira amostra do quadro
+                            "start": inicio + (int(escolhidas[0]) if len(escolhidas) else 0),
+                            "decimation": k,
+                            "channels": self.num_features,
+                            "samples": amostras[escolhidas].astype("<f2").tobytes(),
+                            "proba": None if proba is None else [float(p) for p in proba],
+                        },
+                    )
+                )
+
+        for sid, payload in envios:
+            inicio = time.monotonic()
+            self.emit(payload, sid, lambda *_, sid=sid, t=agora: self._ack(sid, t))
+            self._emit_time.record(time.monotonic() - inicio)
+            self.bytes_sent += len(payload["samples"])
+        self.frames += len(envios)
+        return len(envios)
+
+    def run(self, running, sleep=time.sleep):
+        """
+        Flush every `interval` seconds while `running()` is true.
+        """
+        while running():
+            inicio = time.monotonic()
+            self.flush()
+            sleep(max(0.0, self.interval - (time.monotonic() - inicio)))
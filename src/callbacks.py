@@ -0,0 +1,35 @@
+import time
+import keras
+
+
+class ThroughputReport(keras.callbacks.Callback):
+    """
+    Print the wall time and training throughput (windows/s) of every epoch,
+    and a summary at the end of `fit`. `n_samples` is the number of training
+    windows per epoch.
+    """
+
+    def __init__(self, n_samples: int):
+        super().__init__()
+        self.n_samples = n_samples
+        self.epoch_times = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._inicio = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        duracao = time.perf_counter() - self._inicio
+        self.epoch_times.append(duracao)
+        print(
+            f"\n⏱️ época {epoch + 1}: {duracao:.1f}s, {self.n_samples / duracao:.0f} janelas/s"
+        )
+
+    def on_train_end(self, logs=None):
+        if not self.epoch_times:
+            return
+        total = sum(self.epoch_times)
+        print(
+            f"⏱️ treino: {len(self.epoch_times)} épocas em {total:.1f}s,"
+            f" média {total / len(self.epoch_times):.1f}s/época,"
+            f" {self.n_samples * len(self.epoch_times) / total:.0f} janelas/s"
+        )
@@ -1,8 +1,16 @@
-from scipy import io
+from pathlib import Path
+from numpy.lib.stride_tricks import sliding_window_view
 import numpy as np
+import hashlib
+import io
+import json
+import zlib
+import os
 import os.path
 import yaml
 
+CACHE_FOLDER = Path("dataset") / ".cache"
+
 
 def load_matlab_data(file: str):
     """
@@ -10,52 +18,296 @@ def load_matlab_data(file: str):
     which is composed of N matrices which columns are organized in:
     accel.X, accel.Y, accel.Z, gyro.X, gyro.Y, gyro.Z
     """
-    data = io.loadmat(file)
+    from scipy import io as sio
+
+    data = sio.loadmat(file)
 
     return data["dataset"][0], data["continuous_dataset"]
 
 
-def load_csv_data(file: str):
+def load_csv_recording(file: str):
+    """
+    Load a capture .csv keeping the timestamp column.
+    """
     # timestamp,ax1,ay1,az1,gx1,gy1,gz1,ax2,ay2,az2,gx2,gy2,gz2,em_movimento
     # shape = (:, 14)
-    data = np.genfromtxt(file, delimiter=",", skip_header=1)
+    if file.endswith(".gz"):
+        # tolera .csv.gz sem o final do stream (captura interrompida)
+        with open(file, "rb") as f:
+            texto = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(f.read())
+        file = io.BytesIO(texto[: texto.rfind(b"\n") + 1])
+    return np.genfromtxt(file, delimiter=",", skip_header=1)
+
+
+def load_csv_data(file: str):
+    data = load_csv_recording(file)
 
     # ignore timestamp
     return data[:, 1:]
 
 
-def chunk_data(data, chunk_size):
+def load_source_data(file: str):
+    """
+    Load a recording (.mat, .csv, .csv.gz or .bin) as a `(n_samples, 13)` array of
+    sensor readings plus the `em_movimento` label.
+    """
+    ext = os.path.splitext(file)[1]
+    if ext == ".mat":
+        return load_matlab_data(file)[1]
+    elif ext in (".csv", ".gz"):
+        # .csv.gz é descompactado em load_csv_recording
+        return load_csv_data(file)
+    elif ext == ".bin":
+        from src.recorder import load_binary_recording
+
+        return load_binary_recording(file)[:, 1:]
+    raise Exception(f"Unknown file extension: {file}")
+
+
+def file_hash(file: str) -> str:
+    digest = hashlib.sha1()
+    with open(file, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_cache_index(cache_folder: Path) -> dict:
+    try:
+        with open(cache_folder / "index.json", "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_cache_index(cache_folder: Path, index: dict):
+    tmp = cache_folder / "index.json.tmp"
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp, cache_folder / "index.json")
+
+
+def load_source_recording(file: str):
+    """
+    Load a capture (.csv, .csv.gz or .bin) as a `(n_samples, 14)` array:
+    timestamp, the 12 sensor readings and `em_movimento`.
+    """
+    ext = os.path.splitext(file)[1]
+    if ext in (".csv", ".gz"):
+        return load_csv_recording(file)
+    elif ext == ".bin":
+        from src.recorder import load_binary_recording
+
+        return load_binary_recording(file)
+    raise Exception(f"Unknown capture extension: {file}")
+
+
+def _cached_array(file: str, cache_folder: Path, suffix: str, load, dtype):
+    os.makedirs(cache_folder, exist_ok=True)
+    index = _read_cache_index(cache_folder)
+
+    stat = os.stat(file)
+    key = os.path.abspath(file)
+    entry = index.get(key)
+    if (
+        entry is None
+        or entry["mtime_ns"] != stat.st_mtime_ns
+        or entry["size"] != stat.st_size
+    ):
+        entry = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": file_hash(file),
+        }
+        index[key] = entry
+        _write_cache_index(cache_folder, index)
+
+    cache_file = cache_folder / f"{entry['hash']}{suffix}.npy"
+    if not cache_file.is_file():
+        data = np.ascontiguousarray(load(file), dtype=dtype)
+        tmp = cache_folder / f"{entry['hash']}{suffix}.npy.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, data)
+        os.replace(tmp, cache_file)
+
+    return np.load(cache_file, mmap_mode="r")
+
+
+def load_cached_data(file: str, cache_folder: Path = CACHE_FOLDER):
+    """
+    Load a recording through the binary cache.
+
+    Each source file is parsed once and stored as a float32 `.npy` named
+    after the SHA-1 of its contents, which is then memory-mapped on load.
+    The hash is only recomputed when the file's mtime or size changes, so a
+    modified source file is re-parsed automatically.
+    """
+    return _cached_array(file, cache_folder, "", load_source_data, np.float32)
+
+
+def load_cached_recording(file: str, cache_folder: Path = CACHE_FOLDER):
+    """
+    Memory-mapped `(n_samples, 14)` capture, timestamps included (float64).
+    `.bin` captures are mapped directly; .csv files go through the same
+    cache as `load_cached_data`, parsed once.
+    """
+    if file.endswith(".bin"):
+        from src.recorder import CSV_HEADER
+
+        data = np.memmap(file, dtype="<f8", mode="r")
+        return data[: len(data) - len(data) % len(CSV_HEADER)].reshape(-1, len(CSV_HEADER))
+    return _cached_array(file, cache_folder, "_rec", load_source_recording, np.float64)
+
+
+def dataset_files(params: dict, fields=("train_data", "test_data")) -> list[str]:
+    """
+    List every source file referenced by the given dataset fields.
+    """
+    files = []
+    for field in fields:
+        for class_files in params.get(field, {}).values():
+            files.extend(f for f in class_files if f not in files)
+    return files
+
+
+def build_cache(files: list[str], cache_folder: Path = CACHE_FOLDER):
+    for file in files:
+        load_cached_data(file, cache_folder)
+
+
+def clear_cache(cache_folder: Path = CACHE_FOLDER) -> int:
     """
-    Chunk data into smaller pieces of size chunk_size.
+    Remove every cached array, fitted scaler and the cache index. Returns the
+    number of removed files.
+    """
+    if not cache_folder.is_dir():
+        return 0
+    removed = 0
+    for file in cache_folder.iterdir():
+        if file.suffix in (".npy", ".json", ".tmp", ".pkl"):
+            file.unlink()
+            removed += 1
+    return removed
+
+
+def chunk_data(data, chunk_size, stride=None):
+    """
+    Chunk data into smaller pieces of size chunk_size, starting a new piece
+    every `stride` samples (default: chunk_size, no overlap).
+
+    Overlapping windows are returned as a strided view of `data`, so no
+    sample is copied.
     """
     length = data.shape[0]
     num_features = data.shape[1]
-    return data[: length - length % chunk_size, :].reshape(-1, chunk_size, num_features)
+    if stride is None or stride == chunk_size:
+        return data[: length - length % chunk_size, :].reshape(-1, chunk_size, num_features)
+
+    if length < chunk_size:
+        return np.empty((0, chunk_size, num_features), dtype=data.dtype)
+    # sliding_window_view -> (n, num_features, chunk_size)
+    return sliding_window_view(data, chunk_size, axis=0)[::stride].transpose(0, 2, 1)
+
+
+LABEL_POLICIES = ("majority", "any", "center", "threshold")
+
+
+def label_windows(labels, policy: str = "majority", threshold: float = 0.5):
+    """
+    Decide which windows contain movement from their binary `em_movimento`
+    labels `(n_windows, timesteps)`, all at once:
+
+    majority  - more than half of the samples are in movement
+    any       - at least one sample is in movement
+    center    - the sample in the middle of the window is in movement
+    threshold - at least `threshold` (fraction) of the samples are in movement
+    """
+    moving = np.asarray(labels) > 0.5
+    timesteps = moving.shape[1]
+
+    if policy == "majority":
+        return np.count_nonzero(moving, axis=1) * 2 > timesteps
+    elif policy == "any":
+        return moving.any(axis=1)
+    elif policy == "center":
+        return moving[:, timesteps // 2]
+    elif policy == "threshold":
+        return np.count_nonzero(moving, axis=1) >= threshold * timesteps
+    raise Exception(f"Unknown label policy: {policy}. Use one of {LABEL_POLICIES}")
 
 
-def extract_classes(data, class_id: int):
+def extract_classes(
+    data, class_id: int, policy: str = "majority", threshold: float = 0.5
+):
     """
-    Process data by extracting the most frequent class
-    and removing the last column from the data.
+    Label every window with `class_id` (or 0 when there is no movement,
+    according to `policy`) and remove the last column from the data.
     """
-    classes = np.zeros(len(data))
-    for i, item in enumerate(data):
-        classes[i] = (
-            0 if np.bincount(item[:, -1].astype(int)).argmax() == 0 else class_id
-        )
+    moving = label_windows(data[:, :, -1], policy, threshold)
+    classes = np.where(moving, float(class_id), 0.0)
     data = data[:, :, :-1]
     return data, classes
 
 
-def get_data(field: str):
+class WindowedDataset:
+    """
+    Windows of several recordings, kept as per-recording (possibly strided)
+    views instead of one concatenated array. Windows are only copied when a
+    batch is requested through `take`.
+    """
+
+    def __init__(self, windows: list, classes: list):
+        self.windows = windows
+        self.classes = np.concatenate(classes, axis=0)
+        self.offsets = np.cumsum([0] + [len(w) for w in windows])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    @property
+    def window_shape(self):
+        return self.windows[0].shape[1:]
+
+    def take(self, indices):
+        """
+        Copy the windows at `indices` into a new `(len(indices), timesteps,
+        num_features)` float32 array.
+        """
+        indices = np.asarray(indices)
+        out = np.empty((len(indices),) + self.window_shape, dtype=np.float32)
+        recording = np.searchsorted(self.offsets, indices, side="right") - 1
+        for r in np.unique(recording):
+            mask = recording == r
+            out[mask] = self.windows[r][indices[mask] - self.offsets[r]]
+        return out
+
+    def split(self, test_size: float = 0.2, gap: int = 0):
+        """
+        Hold out the last `test_size` fraction of every recording for testing,
+        dropping `gap` windows before it so that train and test windows never
+        overlap. Returns `(train_indices, test_indices)`.
+        """
+        train, test = [], []
+        for start, end in zip(self.offsets[:-1], self.offsets[1:]):
+            cut = end - int(round((end - start) * test_size))
+            train.append(np.arange(start, max(start, cut - gap)))
+            test.append(np.arange(cut, end))
+        return np.concatenate(train), np.concatenate(test)
+
+
+def get_windows(field: str, stride=None, use_cache: bool = True, timesteps=None):
     """
-    Load and process data from a list of .mat files.
+    Load the recordings listed in `field` as a WindowedDataset of
+    `timesteps`-long windows (default: params.yaml) starting every `stride`
+    samples.
     """
     with open("config/params.yaml", "r") as f:
         params = yaml.safe_load(f)
 
     available_classes: list[str] = params["classes"]
-    chunk_size = params["timesteps"]
+    chunk_size = timesteps or params["timesteps"]
+    label_policy = params.get("label_policy", "majority")
+    label_threshold = params.get("label_threshold", 0.5)
     dataset_description: dict[str, list[str]] = params[field]
 
     all_data = []
@@ -63,15 +315,12 @@ def get_data(field: str):
     for curr_class, files in dataset_description.items():
 
         for file in files:
-            ext = os.path.splitext(file)[1]
-            if ext == ".mat":
-                data = load_matlab_data(file)[1]
-            elif ext == ".csv":
-                data = load_csv_data(file)
+            if use_cache:
+                data = load_cached_data(file)
             else:
-                raise Exception(f"Unknown file extension: {file}")
+                data = load_source_data(file)
 
-            data = chunk_data(data, chunk_size)
+            data = chunk_data(data, chunk_size, stride)
 
             class_id = available_classes.index(curr_class)
             if class_id == -1:
@@ -80,9 +329,18 @@ def get_data(field: str):
                 )
             class_id += 1
 
-            data, classes = extract_classes(data, class_id)
+            data, classes = extract_classes(
+                data, class_id, label_policy, label_threshold
+            )
             all_data.append(data)
             all_classes.append(classes)
-    all_data = np.concatenate(all_data, axis=0)
-    all_classes = np.concatenate(all_classes, axis=0)
-    return all_data, all_classes
+    return WindowedDataset(all_data, all_classes)
+
+
+def get_data(field: str, use_cache: bool = True, stride=None, timesteps=None):
+    """
+    Load and process data from a list of .mat/.csv files.
+    """
+    dataset = get_windows(field, stride, use_cache, timesteps)
+    all_data = np.concatenate(dataset.windows, axis=0)
+    return all_data, dataset.classes
@@ -0,0 +1,281 @@
+import os
+import time
+import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin
+from src.metrics import METRICS
+
+# só numpy e sklearn: modelos deste módulo não importam o TensorFlow
+
+# mesmo diretório de src/train_lib.py
+MODEL_FOLDER = "models"
+
+# bandas do espectro, em fração da taxa de amostragem (0 a 0.5)
+FFT_BANDS = ((0.0, 0.05), (0.05, 0.1), (0.1, 0.2), (0.2, 0.3), (0.3, 0.5))
+
+
+def window_features(windows, bands=FFT_BANDS):
+    """
+    Feature bank of every window at once, `(n, timesteps, num_features)` ->
+    `(n, n_window_features)`:
+
+    - per axis: mean, std, min, max and energy (mean square)
+    - per axis: mean absolute and std of the jerk (first difference)
+    - correlation between each axis of MPU1 and the same axis of MPU2
+    - per axis: power of the detrended signal in each FFT band of `bands`
+    """
+    x = np.asarray(windows, dtype=np.float32)
+    timesteps, num_features = x.shape[1], x.shape[2]
+
+    media = x.mean(axis=1)
+    centrado = x - media[:, np.newaxis]
+    desvio = x.std(axis=1)
+    estatisticas = [media, desvio, x.min(axis=1), x.max(axis=1), (x * x).mean(axis=1)]
+
+    jerk = np.diff(x, axis=1)
+    estatisticas += [np.abs(jerk).mean(axis=1), jerk.std(axis=1)]
+
+    # colunas: ax1, ay1, az1, gx1, gy1, gz1 (MPU1), ax2, ..., gz2 (MPU2)
+    metade = num_features // 2
+    a, b = centrado[:, :, :metade], centrado[:, :, metade : 2 * metade]
+    cov = (a * b).sum(axis=1)
+    norma = np.sqrt((a * a).sum(axis=1) * (b * b).sum(axis=1))
+    estatisticas.append(cov / np.maximum(norma, 1e-8))
+
+    potencia = np.abs(np.fft.rfft(centrado, axis=1)) ** 2 / timesteps
+    freqs = np.fft.rfftfreq(timesteps)
+    for inicio, fim in bands:
+        banda = (freqs >= inicio) & (freqs < fim) if fim < 0.5 else freqs >= inicio
+        estatisticas.append(potencia[:, banda].sum(axis=1))
+
+    return np.concatenate(estatisticas, axis=1)
+
+
+class WindowFeatures(BaseEstimator, TransformerMixin):
+    """
+    Pipeline step that turns raw windows into `window_features`.
+    """
+
+    def __init__(self, num_features: int = 12, bands=FFT_BANDS):
+        self.num_features = num_features
+        self.bands = bands
+
+    def fit(self, X, y=None):
+        return self
+
+    def __sklearn_is_fitted__(self):
+        return True
+
+    def transform(self, X):
+        return window_features(X, self.bands)
+
+
+def feature_model_path(name: str):
+    return os.path.join(MODEL_FOLDER, f"{name}.joblib")
+
+
+def is_feature_model(name: str):
+    return os.path.isfile(feature_model_path(name))
+
+
+def save_feature_model(pipeline, name: str):
+    import joblib
+
+    filepath = feature_model_path(name)
+    os.makedirs(MODEL_FOLDER, exist_ok=True)
+    joblib.dump(pipeline, filepath, compress=3)
+    print(f"Model saved to {filepath}")
+
+
+def load_feature_model(name: str):
+    import joblib
+
+    filepath = feature_model_path(name)
+    if not os.path.isfile(filepath):
+        raise FileNotFoundError(f"No model file found at {filepath}")
+    pipeline = joblib.load(filepath)
+    print(f"Model loaded from {filepath}")
+    return pipeline
+
+
+def _compile_trees(clf):
+    """
+    Flatten the trees of a fitted HistGradientBoostingClassifier into padded
+    `(n_trees, max_nodes)` arrays and return a `predict_proba(X)` that walks
+    all trees at once, one level per step, instead of one Cython call per
+    tree (which dominates the cost for a single window).
+
+    Relies on private sklearn attributes (`_predictors`, `_baseline_prediction`,
+    `_loss`); `_tree_predictor` checks the result against the public
+    `predict_proba` before using it, so other sklearn versions fall back.
+    """
+    arvores = [(k, p.nodes) for it in clf._predictors for k, p in enumerate(it)]
+    n_trees, n_nodes = len(arvores), max(nodes.size for _, nodes in arvores)
+    feature = np.zeros((n_trees, n_nodes), np.intp)
+    threshold = np.zeros((n_trees, n_nodes), np.float64)
+    missing_left = np.zeros((n_trees, n_nodes), bool)
+    left = np.zeros((n_trees, n_nodes), np.intp)
+    right = np.zeros((n_trees, n_nodes), np.intp)
+    value = np.zeros((n_trees, n_nodes), np.float64)
+    # árvore -> coluna da predição (uma árvore por classe a cada iteração)
+    contribuicao = np.zeros((n_trees, clf.n_trees_per_iteration_), np.float64)
+    profundidade = 0
+
+    for t, (k, nodes) in enumerate(arvores):
+        n = nodes.size
+        folha = nodes["is_leaf"].astype(bool)
+        feature[t, :n] = nodes["feature_idx"]
+        threshold[t, :n] = nodes["num_threshold"]
+        missing_left[t, :n] = nodes["missing_go_to_left"]
+        # folhas apontam para si mesmas: descer mais não muda o nó
+        left[t, :n] = np.where(folha, np.arange(n), nodes["left"])
+        right[t, :n] = np.where(folha, np.arange(n), nodes["right"])
+        value[t, :n] = nodes["value"]
+        contribuicao[t, k] = 1.0
+        profundidade = max(profundidade, int(nodes["depth"].max()))
+
+    baseline = np.asarray(clf._baseline_prediction, np.float64).reshape(1, -1)
+    arvore = np.arange(n_trees)
+
+    def raw_predict(X):
+        X = np.asarray(X, np.float64)
+        amostra = np.arange(len(X))[:, np.newaxis]
+        no = np.zeros((len(X), n_trees), np.intp)
+        for _ in range(profundidade):
+            x = X[amostra, feature[arvore, no]]
+            esquerda = (x <= threshold[arvore, no]) | (np.isnan(x) & missing_left[arvore, no])
+            no = np.where(esquerda, left[arvore, no], right[arvore, no])
+        return baseline + value[arvore, no] @ contribuicao
+
+    def predict_proba(X):
+        raw = raw_predict(X)
+        if raw.shape[1] == 1:
+            raw = raw.ravel()
+        return clf._loss.predict_proba(raw)
+
+    return predict_proba
+
+
+def _tree_predictor(clf, features, timesteps: int = 50, atol: float = 1e-6):
+    """
+    `_compile_trees(clf)` when it matches `clf.predict_proba` on random
+    windows, else the public `clf.predict_proba` (slower for one window).
+    """
+    rng = np.random.default_rng(0)
+    X = features.transform(rng.normal(0, 1, (64, timesteps, features.num_features)))
+    try:
+        compilado = _compile_trees(clf)
+        if np.allclose(compilado(X), clf.predict_proba(X), atol=atol):
+            return compilado
+        motivo = "resultados diferentes"
+    except Exception as e:
+        # atributos privados mudam entre versões do sklearn
+        motivo = repr(e)
+    print(f"⚠️ Árvores compiladas indisponíveis ({motivo}); usando predict_proba do sklearn")
+    return clf.predict_proba
+
+
+def build_feature_predictor(pipeline):
+    """
+    Build a `predict_proba(raw (n, timesteps, num_features)) -> (n, n_classes)`
+    function for a feature model, calling the steps directly instead of
+    going through `Pipeline.predict_proba` and evaluating the trees with
+    `_compile_trees` (see `_tree_predictor`). Columns follow the class ids
+    of the configured classes (`n_classes_`, saved by `train_feature_model`,
+    as in the Keras models), so classes missing from the training data get
+    probability 0.
+    """
+    features = pipeline.named_steps["features"]
+    clf = pipeline.named_steps["clf"]
+    colunas = clf.classes_.astype(int)
+    # modelos salvos antes de n_classes_: até o maior id treinado
+    n_classes = getattr(pipeline, "n_classes_", int(colunas.max()) + 1)
+    if colunas.min() < 0 or colunas.max() >= n_classes:
+        raise Exception(f"Class ids {colunas.tolist()} out of range for {n_classes} classes")
+    tree_proba = _tree_predictor(clf, features)
+
+    stage = "Latency of each processing stage"
+    preprocess_time = METRICS.histogram("stage_seconds", stage, stage="preprocess", backend="gbt")
+    model_time = METRICS.histogram("stage_seconds", stage, stage="model", backend="gbt")
+
+    def predict_proba(raw_data):
+        inicio = time.perf_counter()
+        X = features.transform(raw_data)
+        meio = time.perf_counter()
+        proba = tree_proba(X)
+        preprocess_time.record(meio - inicio)
+        model_time.record(time.perf_counter() - meio)
+        out = np.zeros((len(proba), n_classes), dtype=np.float32)
+        out[:, colunas] = proba
+        return out
+
+    return predict_proba
+
+
+def train_feature_model(
+    dataset_name: str,
+    name: str,
+    stride=None,
+    timesteps=None,
+    save: bool = True,
+    max_iter: int = 300,
+    learning_rate: float = 0.1,
+    threads: int = 0,
+):
+    """
+    Train a HistGradientBoostingClassifier on `window_features` with the
+    same windows and train/test split as `train_model`, and save it as
+    `models/{name}.joblib`. Returns `(pipeline, None, scores)`, where
+    `scores` has the train and test accuracy. `threads` > 0 limits the
+    OpenMP threads used to fit the trees.
+    """
+    import yaml
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    from sklearn.pipeline import Pipeline
+    from threadpoolctl import threadpool_limits
+    from src.train_lib import prepare_training
+
+    with open("config/params.yaml", "r") as f:
+        params = yaml.safe_load(f)
+
+    timesteps = timesteps or params["timesteps"]
+    if not stride:
+        stride = params.get("stride", timesteps)
+
+    dataset, train_idx, test_idx, _ = prepare_training(dataset_name, timesteps, stride)
+    num_features = dataset.window_shape[1]
+    n_classes = len(params["classes"]) + 1
+
+    pipeline = Pipeline(
+        [
+            ("features", WindowFeatures(num_features)),
+            (
+                "clf",
+                HistGradientBoostingClassifier(
+                    max_iter=max_iter,
+                    learning_rate=learning_rate,
+                    early_stopping=True,
+                    random_state=42,
+                ),
+            ),
+        ]
+    )
+    X_train, X_test = dataset.take(train_idx), dataset.take(test_idx)
+    y_train, y_test = dataset.classes[train_idx], dataset.classes[test_idx]
+    # threadpool_limits(None) não altera nada
+    with threadpool_limits(limits=threads or None, user_api="openmp"):
+        pipeline.fit(X_train, y_train.astype(int))
+    # largura da saída do preditor (ids de todas as classes, como no Keras)
+    pipeline.n_classes_ = n_classes
+
+    scores = {
+        "accuracy": pipeline.score(X_train, y_train.astype(int)),
+        "val_accuracy": pipeline.score(X_test, y_test.astype(int)),
+    }
+    print(
+        f"🌲 {pipeline.named_steps['clf'].n_iter_} iterações,"
+        f" acurácia {scores['accuracy']:.4f} (treino) / {scores['val_accuracy']:.4f} (validação)"
+    )
+
+    if save:
+        save_feature_model(pipeline, name)
+    return pipeline, None, scores
@@ -0,0 +1,225 @@
+import math
+import threading
+import time
+
+# instrumentação sempre ligada: registrar um valor custa ~2 µs e não aloca
+
+
+class Histogram:
+    """
+    Latency histogram with HDR-style log-linear buckets: `sub_buckets`
+    linear buckets per power of two between `lowest` and `highest` seconds,
+    so any recorded value is kept within a relative error of
+    `1 / sub_buckets`, in constant memory and O(1) per record.
+    """
+
+    def __init__(self, lowest: float = 1e-6, highest: float = 100.0, sub_buckets: int = 16):
+        self.lowest = lowest
+        self.sub_buckets = sub_buckets
+        self._exp_min = math.frexp(lowest)[1]
+        potencias = math.frexp(highest)[1] - self._exp_min + 1
+        self._counts = [0] * (potencias * sub_buckets)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def _index(self, value: float):
+        if value < self.lowest:
+            return 0
+        # value = m * 2**e, com m em [0.5, 1)
+        m, e = math.frexp(value)
+        i = (e - self._exp_min) * self.sub_buckets + int((m - 0.5) * 2 * self.sub_buckets)
+        return min(i, len(self._counts) - 1)
+
+    def _value(self, i: int):
+        e, sub = divmod(i, self.sub_buckets)
+        return (0.5 + (sub + 0.5) / (2 * self.sub_buckets)) * 2.0 ** (e + self._exp_min)
+
+    def record(self, value: float):
+        i = self._index(value)
+        with self._lock:
+            self._counts[i] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def snapshot(self):
+        """
+        `(counts, count, sum, max)` copied under the lock.
+        """
+        with self._lock:
+            return list(self._counts), self.count, self.sum, self.max
+
+    def quantiles(self, qs, counts=None, maximum=None):
+        """
+        Values at the quantiles `qs` (0 to 1), from the bucket midpoints
+        (capped at the largest recorded value).
+        """
+        if counts is None:
+            counts, _, _, maximum = self.snapshot()
+        total = sum(counts)
+        if not total:
+            return [0.0 for _ in qs]
+        alvos = sorted((q * total, k) for k, q in enumerate(qs))
+        out = [0.0] * len(qs)
+        acumulado = 0
+        j = 0
+        for i, c in enumerate(counts):
+            acumulado += c
+            while j < len(alvos) and acumulado >= max(alvos[j][0], 1):
+                out[alvos[j][1]] = self._value(i)
+                j += 1
+            if j == len(alvos):
+                break
+        if maximum is not None:
+            out = [min(v, maximum) for v in out]
+        return out
+
+
+class Counter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, n=1):
+        with self._lock:
+            self.value += n
+
+
+class MetricsRegistry:
+    """
+    Named metrics with labels, rendered in the Prometheus text format
+    (`render`) or as a console summary (`summary`, `log_loop`).
+
+    `histogram` and `counter` return the existing metric for the same name
+    and labels, so instrumented code can just ask for them. `callback`
+    registers a function read only at render time (queue depths, counters
+    already kept by other objects); registering the same name and labels
+    again replaces it.
+    """
+
+    QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+    def __init__(self, prefix: str = "judo"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        # nome -> {"type", "help", "series": {labels: métrica ou função}}
+        self._families = {}
+        self._anterior = {}
+
+    def _series(self, name, kind, help, labels, factory):
+        chave = tuple(sorted(labels.items()))
+        with self._lock:
+            familia = self._families.setdefault(name, {"type": kind, "help": help, "series": {}})
+            if chave not in familia["series"] or kind.startswith("callback"):
+                familia["series"][chave] = factory()
+            return familia["series"][chave]
+
+    def histogram(self, name: str, help: str = "", **labels) -> Histogram:
+        return self._series(name, "summary", help, labels, Histogram)
+
+    def counter(self, name: str, help: str = "", **labels) -> Counter:
+        return self._series(name, "counter", help, labels, Counter)
+
+    def callback(self, name: str, fn, help: str = "", kind: str = "gauge", **labels):
+        """
+        `fn()` is read at render time; `kind` is `gauge` or `counter`.
+        """
+        self._series(name, f"callback_{kind}", help, labels, lambda: fn)
+
+    def clear(self):
+        with self._lock:
+            self._families.clear()
+            self._anterior.clear()
+
+    def _items(self):
+        with self._lock:
+            return [(n, dict(f, series=dict(f["series"]))) for n, f in self._families.items()]
+
+    @staticmethod
+    def _labels(chave, **extra):
+        pares = list(chave) + list(extra.items())
+        if not pares:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in pares) + "}"
+
+    @staticmethod
+    def _read(fn):
+        try:
+            return float(fn())
+        except Exception:
+            return float("nan")
+
+    def render(self):
+        """
+        All metrics in the Prometheus text exposition format (0.0.4).
+        Histograms are exported as summaries (quantiles, sum and count).
+        """
+        linhas = []
+        for name, familia in self._items():
+            nome = f"{self.prefix}_{name}"
+            tipo = familia["type"].replace("callback_", "")
+            if familia["help"]:
+                linhas.append(f"# HELP {nome} {familia['help']}")
+            linhas.append(f"# TYPE {nome} {tipo}")
+            for chave, metrica in familia["series"].items():
+                if isinstance(metrica, Histogram):
+                    counts, count, soma, maximo = metrica.snapshot()
+                    quantis = metrica.quantiles(self.QUANTILES, counts, maximo)
+                    for q, v in zip(self.QUANTILES, quantis):
+                        linhas.append(f"{nome}{self._labels(chave, quantile=q)} {v:.9g}")
+                    linhas.append(f"{nome}_sum{self._labels(chave)} {soma:.9g}")
+                    linhas.append(f"{nome}_count{self._labels(chave)} {count}")
+                elif isinstance(metrica, Counter):
+                    linhas.append(f"{nome}{self._labels(chave)} {metrica.value}")
+                else:
+                    linhas.append(f"{nome}{self._labels(chave)} {self._read(metrica):.9g}")
+        return "\n".join(linhas) + "\n"
+
+    def summary(self):
+        """
+        One line per series: latency quantiles of histograms, rate of
+        counters since the previous summary, current value of gauges.
+        """
+        agora = time.monotonic()
+        linhas = []
+        for name, familia in self._items():
+            for chave, metrica in familia["series"].items():
+                rotulo = name + ("[" + ",".join(str(v) for _, v in chave) + "]" if chave else "")
+                if isinstance(metrica, Histogram):
+                    counts, count, _, maximo = metrica.snapshot()
+                    if not count:
+                        continue
+                    p50, p99 = metrica.quantiles((0.5, 0.99), counts, maximo)
+                    linhas.append(
+                        f"   {rotulo:<36} p50 {p50 * 1e3:8.3f}ms p99 {p99 * 1e3:8.3f}ms"
+                        f" máx {maximo * 1e3:8.3f}ms n={count}"
+                    )
+                    continue
+                valor = metrica.value if isinstance(metrica, Counter) else self._read(metrica)
+                if familia["type"] in ("counter", "callback_counter"):
+                    anterior = self._anterior.get((name, chave))
+                    self._anterior[(name, chave)] = (agora, valor)
+                    taxa = ""
+                    if anterior is not None and agora > anterior[0]:
+                        taxa = f" ({(valor - anterior[1]) / (agora - anterior[0]):.1f}/s)"
+                    linhas.append(f"   {rotulo:<36} {valor:g}{taxa}")
+                else:
+                    linhas.append(f"   {rotulo:<36} {valor:g}")
+        return "\n".join(linhas)
+
+    def log_loop(self, interval: float, running=lambda: True, sleep=time.sleep):
+        """
+        Print `summary` every `interval` seconds while `running()` is true.
+        """
+        while running():
+            sleep(interval)
+            texto = self.summary()
+            if texto:
+                print(f"\n📈 Métricas:\n{texto}", flush=True)
+
+
+# registro global, usado pelos módulos instrumentados
+METRICS = MetricsRegistry()
@@ -1,12 +1,20 @@
-from flask import Flask, render_template_string, request, redirect, url_for, jsonify
+from flask import Flask, Response, render_template_string, request, redirect, url_for, jsonify
 from datetime import datetime
 import threading
-import csv
 import os
 import serial
 import time
 import sys
-from src.visualizer import visualizar_realtime
+import numpy as np
+from src.serial_protocol import (
+    make_parser,
+    read_available,
+    host_timestamps,
+    register_parser_metrics,
+)
+from src.metrics import METRICS
+from src.recorder import Recorder, StatusLine
+from src.sources import is_replay, open_source
 
 app = Flask(__name__)
 MOVIMENTO_ATIVO = False
@@ -15,7 +23,15 @@ TITULO = ""
 
 
 # ========= THREAD: LEITURA SERIAL =========
-def leitura_serial(titulo: str, porta_serial: str, baudrate: int):
+def leitura_serial(
+    titulo: str,
+    porta_serial: str,
+    baudrate: int,
+    protocol: str = "text",
+    extra: str = "none",
+    plotter=None,
+    speed: float = 1.0,
+):
     global MOVIMENTO_ATIVO
     global TITULO
 
@@ -31,66 +47,72 @@ def leitura_serial(titulo: str, porta_serial: str, baudrate: int):
     print(f"📁 Salvando em: {csv_path}")
 
     try:
-        ser = serial.Serial(porta_serial, baudrate, timeout=1)
-        time.sleep(2)
+        ser = open_source(porta_serial, baudrate, protocol, speed)
+        if not is_replay(porta_serial):
+            time.sleep(2)
         print(f"📡 Conectado à {porta_serial}")
     except serial.SerialException:
         print("⚠️ Erro ao abrir a porta serial!")
         return
+    except FileNotFoundError as e:
+        print(f"⚠️ {e}")
+        return
 
-    # atualizar_visualizacao, parada_visualizacao = visualizar_realtime()
-
-    with open(csv_path, mode="w", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerow(
-            [
-                "timestamp",
-                "ax1",
-                "ay1",
-                "az1",
-                "gx1",
-                "gy1",
-                "gz1",
-                "ax2",
-                "ay2",
-                "az2",
-                "gx2",
-                "gy2",
-                "gz2",
-                "em_movimento",
-            ]
-        )
-
-        try:
-            print("🔄 Iniciando leitura serial...")
-            # while not parada_visualizacao["sair"]:
-            while True:
-                linha = ser.readline().decode("utf-8").strip()
-
-                if not linha:
-                    continue
-
-                dados = linha.split(",")
-                try:
-                    dados_float = [float(valor) for valor in dados]
-                    if len(dados_float) != 12:
-                        continue
-
-                    timestamp = datetime.now().timestamp()
-                    linha_completa = [timestamp] + dados_float + [int(MOVIMENTO_ATIVO)]
-
-                    writer.writerow(linha_completa)
-                    print(",".join([str(l) for l in linha_completa]) + f" COUNT: {COUNTER}")
-
-                    # atualizar_visualizacao(*linha_completa)
-
-                except ValueError:
-                    print("⚠️ Dado inválido! Encerrando leitura.")
-                    continue
-        except KeyboardInterrupt:
-            pass
-
-    print("🛑 Leitura serial encerrada.")
+    recorder = Recorder(csv_path, extra)
+    status = StatusLine()
+    parser = make_parser(protocol)
+
+    stage = "Latency of each processing stage"
+    parse_time = METRICS.histogram("stage_seconds", stage, stage="parse", device=porta_serial)
+    record_time = METRICS.histogram("stage_seconds", stage, stage="record", device=porta_serial)
+    amostras_total = METRICS.counter("samples_total", "Decoded samples", device=porta_serial)
+    register_parser_metrics(parser, porta_serial)
+    METRICS.callback(
+        "recorder_queue_depth",
+        lambda: recorder.queue_depth,
+        "Sample blocks waiting to be written to disk",
+    )
+    METRICS.callback(
+        "recorder_dropped_rows_total",
+        lambda: recorder.dropped_rows,
+        "Rows dropped because the disk writer fell behind",
+        "counter",
+    )
+    try:
+        print("🔄 Iniciando leitura serial...")
+        while not getattr(ser, "exhausted", False):
+            dados = read_available(ser)
+            inicio = time.perf_counter()
+            timestamps_us, amostras = parser.feed(dados)
+            if dados:
+                parse_time.record(time.perf_counter() - inicio)
+
+            if len(amostras):
+                amostras_total.inc(len(amostras))
+                inicio = time.perf_counter()
+                timestamps = host_timestamps(
+                    datetime.now().timestamp(), timestamps_us, len(amostras)
+                )
+                # float32 -> float64 arredondado para não gravar ruído de conversão
+                valores = np.round(amostras.astype(np.float64), 5)
+                recorder.write(timestamps, valores, int(MOVIMENTO_ATIVO))
+                record_time.record(time.perf_counter() - inicio)
+
+                if plotter is not None:
+                    # só copia para o buffer; o desenho roda na thread principal
+                    plotter.push(timestamps, amostras, int(MOVIMENTO_ATIVO))
+
+            descartados = parser.dropped + recorder.dropped_rows
+            status.update(
+                len(amostras),
+                f"| {recorder.rows} gravadas | movimento {COUNTER}"
+                f"{' 🟢' if MOVIMENTO_ATIVO else ''} | descartados {descartados}",
+            )
+    except KeyboardInterrupt:
+        pass
+
+    recorder.close()
+    print("\n🛑 Leitura serial encerrada.")
     ser.close()
 
 
@@ -161,11 +183,16 @@ def set_movimento():
     if MOVIMENTO_ATIVO:
         COUNTER += 1
     print(
-        f"{'🟢 Iniciou' if MOVIMENTO_ATIVO else '🔴 Parou'} o movimento número {COUNTER}"
+        f"\n{'🟢 Iniciou' if MOVIMENTO_ATIVO else '🔴 Parou'} o movimento número {COUNTER}"
     )
     return jsonify(success=True)
 
 
+@app.route("/metrics")
+def metrics():
+    return Response(METRICS.render(), mimetype="text/plain; version=0.0.4")
+
+
 # ========= EXECUÇÃO =========
 
 if __name__ == "__main__":
@@ -0,0 +1,307 @@
+from collections import deque
+import queue
+import threading
+import time
+import numpy as np
+from src.metrics import METRICS
+from src.serial_protocol import read_available, register_parser_metrics
+
+
+class SampleRing:
+    """
+    Bounded, preallocated FIFO of samples shared by one producer and one
+    consumer thread.
+
+    The producer never blocks: when the consumer falls more than `capacity`
+    samples behind, the oldest samples are overwritten and counted in
+    `dropped`. The consumer takes everything pending at once.
+    """
+
+    def __init__(self, capacity: int = 4096, num_features: int = 12, ready=None):
+        self.capacity = capacity
+        # evento opcional sinalizado a cada `put` (consumidor de vários anéis)
+        self.ready = ready
+        self._data = np.zeros((capacity, num_features), dtype=np.float32)
+        self._read = 0
+        self._write = 0
+        self._cond = threading.Condition()
+        self.dropped = 0
+        self.max_depth = 0
+        # instante (perf_counter) em que a amostra pendente mais antiga chegou,
+        # e quanto ela esperou até o último `get`
+        self._pending_since = None
+        self.last_wait = 0.0
+
+    def __len__(self):
+        return self._write - self._read
+
+    @property
+    def received(self):
+        return self._write
+
+    def put(self, samples):
+        samples = np.asarray(samples, dtype=np.float32)
+        if len(samples) == 0:
+            return
+        with self._cond:
+            if self._write == self._read:
+                self._pending_since = time.perf_counter()
+            if len(samples) > self.capacity:
+                # só a cauda cabe; o início é contado no overflow abaixo
+                self._write += len(samples) - self.capacity
+                samples = samples[-self.capacity :]
+            idx = (self._write + np.arange(len(samples))) % self.capacity
+            self._data[idx] = samples
+            self._write += len(samples)
+
+            overflow = self._write - self._read - self.capacity
+            if overflow > 0:
+                self.dropped += overflow
+                self._read += overflow
+            self.max_depth = max(self.max_depth, self._write - self._read)
+            self._cond.notify()
+        if self.ready is not None:
+            self.ready.set()
+
+    def get(self, timeout=None):
+        """
+        Return all pending samples as a new `(n, num_features)` array,
+        waiting up to `timeout` seconds when there is none.
+        """
+        with self._cond:
+            if self._write == self._read:
+                self._cond.wait(timeout)
+            n = self._write - self._read
+            if n:
+                self.last_wait = time.perf_counter() - self._pending_since
+            idx = (self._read + np.arange(n)) % self.capacity
+            self._read += n
+            return self._data[idx]
+
+
+class DeviceStream:
+    """
+    Acquisition side of one device: its port, parser, sample ring and
+    streaming window state. `name` identifies the device in the results.
+    """
+
+    def __init__(self, name: str, ser, parser, engine, capacity: int = 4096):
+        self.name = name
+        self.ser = ser
+        self.parser = parser
+        self.engine = engine
+        self.ring = SampleRing(capacity, engine.buffer.num_features)
+        self.thread = None
+
+        self._parse_time = METRICS.histogram(
+            "stage_seconds", "Latency of each processing stage", stage="parse", device=name
+        )
+        self._samples = METRICS.counter("samples_total", "Decoded samples", device=name)
+        register_parser_metrics(parser, name)
+        METRICS.callback(
+            "dropped_samples_total",
+            lambda: self.ring.dropped,
+            "Samples overwritten because inference fell behind",
+            "counter",
+            device=name,
+        )
+        METRICS.callback(
+            "queue_depth", lambda: len(self.ring), "Samples waiting for inference", device=name
+        )
+
+    def acquisition_loop(self, stop: threading.Event):
+        while not stop.is_set():
+            dados = read_available(self.ser)
+            if not dados:
+                continue
+            inicio = time.perf_counter()
+            _, amostras = self.parser.feed(dados)
+            self._parse_time.record(time.perf_counter() - inicio)
+            self._samples.inc(len(amostras))
+            self.ring.put(amostras)
+
+    def stats(self):
+        return {
+            "received": self.ring.received,
+            "dropped": self.ring.dropped,
+            "queue_depth": len(self.ring),
+            "max_queue_depth": self.ring.max_depth,
+            "windows": self.engine.windows,
+            "skipped_windows": self.engine.skipped_windows,
+        }
+
+
+class AcquisitionPipeline:
+    """
+    Serial acquisition decoupled from inference, for one or more devices.
+
+    Each device has an acquisition thread that only reads its port and
+    decodes samples into its SampleRing. A single inference thread drains
+    every ring, stacks all windows that are ready at that tick (across all
+    devices) into one batch for `classify_batch`, and puts `(device name,
+    Detection)` pairs in `results`, to be emitted by whoever consumes that
+    queue. When inference falls behind, stale windows are skipped
+    (`max_windows` per device per tick) rather than samples being lost.
+
+    `classify_batch` may return class ids `(n,)` or class probabilities
+    `(n, n_classes)`. An optional `monitor` (see SensorBroadcaster) receives
+    every device's new samples and its latest probabilities; it must not
+    block.
+    """
+
+    def __init__(self, streams: list, classify_batch, max_windows: int = 4, monitor=None):
+        self.streams = streams
+        self.classify_batch = classify_batch
+        self.max_windows = max_windows
+        self.monitor = monitor
+        self.results = queue.Queue()
+
+        self._ready = threading.Event()
+        for stream in streams:
+            stream.ring.ready = self._ready
+        self._stop = threading.Event()
+        self._threads = []
+
+        stage = "Latency of each processing stage"
+        self._queue_wait = METRICS.histogram("stage_seconds", stage, stage="queue_wait")
+        self._windowing = METRICS.histogram("stage_seconds", stage, stage="windowing")
+        self._inference = METRICS.histogram("stage_seconds", stage, stage="inference")
+        self._to_result = METRICS.histogram(
+            "stage_seconds", stage, stage="acquisition_to_result"
+        )
+        self._windows = METRICS.counter("windows_total", "Classified windows")
+        self._detections = METRICS.counter("detections_total", "Emitted detections")
+        METRICS.callback(
+            "skipped_windows_total",
+            lambda: sum(stream.engine.skipped_windows for stream in self.streams),
+            "Stale windows skipped when inference fell behind",
+            "counter",
+        )
+        METRICS.callback(
+            "batch_size",
+            lambda: self.batch_sizes[-1] if self.batch_sizes else 0,
+            "Windows in the last inference batch",
+        )
+
+        # tamanho dos lotes e tempo (s) das últimas inferências
+        self.batch_sizes = deque(maxlen=10_000)
+        self.inference_times = deque(maxlen=10_000)
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(
+                target=stream.acquisition_loop, args=(self._stop,), daemon=True
+            )
+            for stream in self.streams
+        ]
+        self._threads.append(
+            threading.Thread(target=self._inference_loop, daemon=True)
+        )
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        self._ready.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def is_running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def _inference_loop(self):
+        while not self._stop.is_set():
+            self._ready.wait(0.1)
+            self._ready.clear()
+            self.step()
+
+    def step(self):
+        """
+        Run one inference tick over every device and return the number of
+        classified windows.
+        """
+        prontas = []
+        tick = time.perf_counter()
+        # chegada da amostra mais antiga deste tick
+        chegada = tick
+        for stream in self.streams:
+            amostras = stream.ring.get(timeout=0)
+            if len(amostras) == 0:
+                continue
+            self._queue_wait.record(stream.ring.last_wait)
+            chegada = min(chegada, tick - stream.ring.last_wait)
+            if self.monitor is not None:
+                self.monitor.samples(stream.name, amostras)
+            indices, windows = stream.engine.push(amostras, self.max_windows)
+            if len(windows):
+                prontas.append((stream, indices, windows))
+        if not prontas:
+            return 0
+
+        batch = np.concatenate([windows for _, _, windows in prontas])
+        inicio = time.perf_counter()
+        self._windowing.record(inicio - tick)
+        predictions = self.classify_batch(batch)
+        duracao = time.perf_counter() - inicio
+        self._inference.record(duracao)
+        self.inference_times.append(duracao)
+        self.batch_sizes.append(len(batch))
+        self._windows.inc(len(batch))
+
+        probas = None
+        if np.ndim(predictions) == 2:
+            probas = predictions
+            predictions = np.argmax(probas, axis=1)
+
+        offset = 0
+        for stream, indices, _ in prontas:
+            if probas is not None and self.monitor is not None:
+                # probabilidades da janela mais recente do dispositivo
+                self.monitor.probabilities(stream.name, probas[offset + len(indices) - 1])
+            for index in indices:
+                deteccao = stream.engine.update(index, predictions[offset])
+                offset += 1
+                if deteccao is not None:
+                    self.results.put((stream.name, deteccao))
+                    self._detections.inc()
+        self._to_result.record(time.perf_counter() - chegada)
+        return len(batch)
+
+    def stats(self):
+        return {stream.name: stream.stats() for stream in self.streams}
+
+
+def build_pipeline(
+    sources: dict,
+    classify_batch,
+    protocol: str = "text",
+    timesteps: int = 50,
+    hop: int = 10,
+    votes: int = 3,
+    refractory: int = 100,
+    capacity: int = 4096,
+    max_windows: int = 4,
+    monitor=None,
+):
+    """
+    Build an AcquisitionPipeline for `sources` (device name -> open port),
+    with one streaming window state per device and a shared classifier.
+    """
+    from src.serial_protocol import make_parser
+    from src.streaming import StreamingClassifier
+
+    streams = [
+        DeviceStream(
+            name,
+            ser,
+            make_parser(protocol),
+            StreamingClassifier(
+                None, timesteps, hop=hop, votes=votes, refractory=refractory
+            ),
+            capacity,
+        )
+        for name, ser in sources.items()
+    ]
+    return AcquisitionPipeline(streams, classify_batch, max_windows, monitor)
@@ -0,0 +1,28 @@
+from sklearn.base import BaseEstimator, TransformerMixin
+
+
+# Transformers personalizados para redimensionamento
+class ReshapeTo2D(BaseEstimator, TransformerMixin):
+    def fit(self, X, y=None):
+        return self
+
+    def __sklearn_is_fitted__(self):
+        return True
+
+    def transform(self, X):
+        return X.reshape(-1, X.shape[2])
+
+
+class ReshapeTo3D(BaseEstimator, TransformerMixin):
+    def __init__(self, timesteps, num_features):
+        self.timesteps = timesteps
+        self.num_features = num_features
+
+    def fit(self, X, y=None):
+        return self
+
+    def __sklearn_is_fitted__(self):
+        return True
+
+    def transform(self, X):
+        return X.reshape(-1, self.timesteps, self.num_features)
@@ -0,0 +1,202 @@
+import csv
+import gzip
+import os
+import queue
+import threading
+import time
+import zlib
+import numpy as np
+
+CSV_HEADER = [
+    "timestamp",
+    "ax1",
+    "ay1",
+    "az1",
+    "gx1",
+    "gy1",
+    "gz1",
+    "ax2",
+    "ay2",
+    "az2",
+    "gx2",
+    "gy2",
+    "gz2",
+    "em_movimento",
+]
+EXTRA_FORMATS = ("none", "bin", "gz")
+
+
+def load_binary_recording(file: str):
+    """
+    Load a `.bin` recording: raw little-endian float64 rows with the same 14
+    columns as the .csv. A partially written last row is ignored.
+    """
+    data = np.fromfile(file, dtype="<f8")
+    return data[: len(data) - len(data) % len(CSV_HEADER)].reshape(-1, len(CSV_HEADER))
+
+
+class Recorder:
+    """
+    Write capture rows to disk from a background thread.
+
+    `write` only enqueues a block of rows, so the serial thread never waits
+    on the disk. The writer thread writes whatever is queued in one go and
+    flushes + fsyncs the files every `flush_interval` seconds. Optionally
+    the same rows also go to a compact binary (`bin`) or gzip-compressed
+    (`gz`) file next to the .csv.
+    """
+
+    def __init__(
+        self,
+        csv_path: str,
+        extra: str = "none",
+        flush_interval: float = 1.0,
+        max_blocks: int = 1024,
+    ):
+        if extra not in EXTRA_FORMATS:
+            raise Exception(f"Unknown recording format: {extra}. Use one of {EXTRA_FORMATS}")
+
+        self.csv_path = csv_path
+        self.extra_path = None
+        if extra == "bin":
+            self.extra_path = os.path.splitext(csv_path)[0] + ".bin"
+        elif extra == "gz":
+            self.extra_path = csv_path + ".gz"
+        self.flush_interval = flush_interval
+
+        self._queue = queue.Queue(maxsize=max_blocks)
+        self.rows = 0
+        self.dropped_rows = 0
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+
+    def write(self, timestamps, values, em_movimento):
+        """
+        Enqueue `n` rows: timestamps `(n,)`, sensor values `(n, 12)` and the
+        movement flag (scalar or `(n,)`).
+        """
+        n = len(timestamps)
+        block = np.empty((n, len(CSV_HEADER)), dtype=np.float64)
+        block[:, 0] = timestamps
+        block[:, 1:13] = values
+        block[:, 13] = em_movimento
+        try:
+            self._queue.put_nowait(block)
+        except queue.Full:
+            self.dropped_rows += n
+
+    @property
+    def queue_depth(self):
+        """
+        Blocks waiting to be written to disk.
+        """
+        return self._queue.qsize()
+
+    def close(self, timeout: float = 5.0):
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _open_extra(self):
+        if self.extra_path is None:
+            return None, None
+        if self.extra_path.endswith(".gz"):
+            raw = open(self.extra_path, "wb")
+            text = gzip.open(raw, "wt", newline="")
+            csv.writer(text).writerow(CSV_HEADER)
+            return raw, text
+        raw = open(self.extra_path, "wb")
+        return raw, None
+
+    def _writer_loop(self):
+        extra_raw, extra_text = self._open_extra()
+        extra_writer = csv.writer(extra_text) if extra_text is not None else None
+
+        with open(self.csv_path, mode="w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(CSV_HEADER)
+
+            proximo_flush = time.monotonic() + self.flush_interval
+            fim = False
+            while not fim:
+                try:
+                    blocos = [self._queue.get(timeout=self.flush_interval)]
+                except queue.Empty:
+                    blocos = []
+                # junta tudo que já está na fila em uma única escrita
+                while True:
+                    try:
+                        blocos.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                # None (enviado por `close`) encerra a gravação
+                for i, bloco in enumerate(blocos):
+                    if bloco is None:
+                        fim = True
+                        blocos = blocos[:i]
+                        break
+
+                if blocos:
+                    bloco = np.concatenate(blocos)
+                    linhas = [
+                        [t, *valores, int(mov)]
+                        for t, valores, mov in zip(
+                            bloco[:, 0].tolist(),
+                            bloco[:, 1:13].tolist(),
+                            bloco[:, 13].tolist(),
+                        )
+                    ]
+                    writer.writerows(linhas)
+                    if extra_writer is not None:
+                        extra_writer.writerows(linhas)
+                    elif extra_raw is not None:
+                        extra_raw.write(bloco.astype("<f8").tobytes())
+                    self.rows += len(bloco)
+
+                if fim or time.monotonic() >= proximo_flush:
+                    self._sync(file, extra_raw, extra_text)
+                    proximo_flush = time.monotonic() + self.flush_interval
+
+        if extra_text is not None:
+            extra_text.close()
+        if extra_raw is not None:
+            extra_raw.close()
+
+    @staticmethod
+    def _sync(file, extra_raw, extra_text):
+        file.flush()
+        os.fsync(file.fileno())
+        if extra_text is not None:
+            # Z_SYNC_FLUSH: tudo que já foi escrito pode ser descompactado
+            extra_text.flush()
+            extra_text.buffer.flush(zlib.Z_SYNC_FLUSH)
+        if extra_raw is not None:
+            extra_raw.flush()
+            os.fsync(extra_raw.fileno())
+
+
+class StatusLine:
+    """
+    Console status line refreshed at most `refresh_hz` times per second.
+    """
+
+    def __init__(self, refresh_hz: float = 4.0):
+        self.interval = 1.0 / refresh_hz
+        self._ultimo = time.monotonic()
+        self._linhas = 0
+
+    def update(self, rows: int, texto_extra: str = ""):
+        """
+        Report `rows` new rows; redraws the line when the interval has passed.
+        """
+        self._linhas += rows
+        agora = time.monotonic()
+        decorrido = agora - self._ultimo
+        if decorrido < self.interval:
+            return
+        print(
+            f"\r📊 {self._linhas / decorrido:7.1f} linhas/s {texto_extra}\033[K",
+            end="",
+            flush=True,
+        )
+        self._ultimo = agora
+        self._linhas = 0
@@ -0,0 +1,136 @@
+import threading
+import time
+import numpy as np
+from src.train_lib import MODEL_FOLDER, load_predictor, model_num_features
+
+
+def available_models():
+    """
+    Names of the models in `models/`: Keras models that have a matching
+    preprocessor and feature models.
+    """
+    keras_models = {
+        f.stem
+        for f in MODEL_FOLDER.glob("*.keras")
+        if (MODEL_FOLDER / f"preprocessing_pipe_{f.stem}.pkl").is_file()
+    }
+    return sorted(keras_models | {f.stem for f in MODEL_FOLDER.glob("*.joblib")})
+
+
+class ModelRegistry:
+    """
+    Models loaded and warmed up ahead of time, one of them active.
+
+    `classify_batch` always runs the active model, so a pipeline built with
+    it keeps running while `activate` swaps the model underneath. Warm-up
+    runs dummy batches of `warmup_batches` windows of `timesteps` samples,
+    so graph tracing and buffer allocation happen before the first real
+    window. Models whose input does not match `num_features` are rejected.
+    """
+
+    def __init__(
+        self,
+        timesteps: int = 50,
+        num_features: int = 12,
+        batch_size: int = 256,
+        compiled: bool = True,
+        backend: str = "keras",
+        quantization: str = "float16",
+        warmup_batches=(1, 4, 16),
+    ):
+        self.timesteps = timesteps
+        self.num_features = num_features
+        self.batch_size = batch_size
+        self.compiled = compiled
+        self.backend = backend
+        self.quantization = quantization
+        self.warmup_batches = warmup_batches
+
+        self._lock = threading.Lock()
+        self._models = {}
+        self.stats = {}
+        self.active = None
+
+    def load(self, name: str):
+        """
+        Load and warm up `name` (no-op when already loaded). Returns its stats.
+        """
+        with self._lock:
+            if name in self._models:
+                return self.stats[name]
+
+            inicio = time.perf_counter()
+            num_features = model_num_features(name)
+            if num_features != self.num_features:
+                raise Exception(
+                    f"Model {name} expects {num_features} features, the stream has {self.num_features}"
+                )
+            predict_proba = load_predictor(
+                name, self.batch_size, self.compiled, self.backend, self.quantization
+            )
+            load_s = time.perf_counter() - inicio
+
+            # primeira chamada de cada tamanho de lote: tracing e alocação
+            inicio = time.perf_counter()
+            for n in self.warmup_batches:
+                predict_proba(np.zeros((n, self.timesteps, num_features), np.float32))
+            warmup_s = time.perf_counter() - inicio
+
+            # latência já aquecida, com uma janela
+            janela = np.zeros((1, self.timesteps, num_features), np.float32)
+            tempos = []
+            for _ in range(10):
+                t = time.perf_counter()
+                predict_proba(janela)
+                tempos.append(time.perf_counter() - t)
+
+            self._models[name] = predict_proba
+            self.stats[name] = {
+                "load_s": load_s,
+                "warmup_s": warmup_s,
+                "latency_ms": float(np.median(tempos)) * 1e3,
+            }
+            print(
+                f"🧠 {name}: carregado em {load_s:.2f}s, aquecido em {warmup_s:.2f}s,"
+                f" {self.stats[name]['latency_ms']:.2f} ms por janela"
+            )
+            return self.stats[name]
+
+    def preload(self, names):
+        """
+        Load every model in `names`, skipping (and reporting) the ones that
+        fail. Meant to run in a background thread.
+        """
+        for name in names:
+            try:
+                self.load(name)
+            except Exception as e:
+                print(f"⚠️ Modelo {name} não carregado: {e}")
+                self.stats[name] = {"error": str(e)}
+
+    def activate(self, name: str):
+        self.load(name)
+        self.active = name
+        print(f"🔁 Modelo ativo: {name}")
+
+    def predict_batch(self, raw_data):
+        """
+        Class probabilities `(n, n_classes)` of the active model.
+        """
+        return self._models[self.active](raw_data)
+
+    def classify_batch(self, raw_data):
+        """
+        Classify `(n, timesteps, num_features)` windows with the active model
+        and return the `n` predicted class ids.
+        """
+        return np.argmax(self._models[self.active](raw_data), axis=1)
+
+    def describe(self):
+        return {
+            "active": self.active,
+            "models": {
+                name: dict(stats, active=name == self.active)
+                for name, stats in self.stats.items()
+            },
+        }
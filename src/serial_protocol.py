@@ -0,0 +1,408 @@
+import time
+import numpy as np
+
+# Protocolo binário enviado pelo ESP32 (little-endian, 34 bytes por frame):
+# sync (A5 5A) | seq u16 | timestamp_us u32 | 12 x int16 brutos | crc16
+# O CRC-16/CCITT-FALSE cobre seq, timestamp e valores (bytes 2..31).
+SYNC = b"\xa5\x5a"
+FRAME_DTYPE = np.dtype(
+    [
+        ("sync", "u1", (2,)),
+        ("seq", "<u2"),
+        ("timestamp_us", "<u4"),
+        ("values", "<i2", (12,)),
+        ("crc", "<u2"),
+    ]
+)
+FRAME_SIZE = FRAME_DTYPE.itemsize
+PROTOCOLS = ("text", "binary")
+# período nominal do firmware no modo texto (SAMPLE_PERIOD_US, 100 Hz)
+TEXT_SAMPLE_PERIOD = 0.01
+
+# MPU6050 com fundo de escala padrão: ±2 g e ±250 °/s
+ACCEL_SCALE = 16384.0
+GYRO_SCALE = 131.0
+RAW_SCALE = np.array(
+    [ACCEL_SCALE] * 3 + [GYRO_SCALE] * 3 + [ACCEL_SCALE] * 3 + [GYRO_SCALE] * 3,
+    dtype=np.float32,
+)
+
+
+def _crc16_table():
+    table = np.zeros(256, dtype=np.uint16)
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else crc << 1
+        table[i] = crc & 0xFFFF
+    return table
+
+
+CRC16_TABLE = _crc16_table()
+
+
+def crc16(data):
+    """
+    CRC-16/CCITT-FALSE of every row of a `(n_frames, n_bytes)` uint8 array,
+    computed for all rows at once.
+    """
+    data = np.asarray(data, dtype=np.uint8)
+    crc = np.full(len(data), 0xFFFF, dtype=np.uint16)
+    for j in range(data.shape[1]):
+        crc = (crc << 8) ^ CRC16_TABLE[(crc >> 8) ^ data[:, j]]
+    return crc
+
+
+def encode_frames(samples, start_seq: int = 0, timestamps_us=None):
+    """
+    Encode `(n, 12)` samples in physical units (g, °/s) as binary frames,
+    the same way the firmware does.
+    """
+    samples = np.asarray(samples, dtype=np.float32).reshape(-1, 12)
+    n = len(samples)
+    if timestamps_us is None:
+        timestamps_us = np.arange(n, dtype=np.int64) * 10_000
+
+    frames = np.zeros(n, dtype=FRAME_DTYPE)
+    frames["sync"] = np.frombuffer(SYNC, np.uint8)
+    frames["seq"] = (start_seq + np.arange(n)) % 65536
+    frames["timestamp_us"] = np.asarray(timestamps_us, dtype=np.int64) % (1 << 32)
+    frames["values"] = np.clip(np.round(samples * RAW_SCALE), -32768, 32767)
+    raw = frames.view(np.uint8).reshape(n, FRAME_SIZE)
+    frames["crc"] = crc16(raw[:, 2:32])
+    return frames.tobytes()
+
+
+def encode_text(samples):
+    """
+    Encode `(n, 12)` samples as the comma-separated text lines of the
+    original firmware (2 decimals).
+    """
+    samples = np.asarray(samples).reshape(-1, 12)
+    return b"".join(
+        (",".join(f"{v:.2f}" for v in row) + "\r\n").encode() for row in samples
+    )
+
+
+class BinaryParser:
+    """
+    Incremental parser for the binary frame protocol.
+
+    Bytes can be fed in arbitrary chunks; all complete frames in the buffer
+    are located and validated at once (sync + CRC) and decoded with a
+    structured dtype. Corrupted or partial data is skipped, and parsing
+    resynchronizes on the next valid frame.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._last_seq = None
+        self.frames = 0
+        self.crc_errors = 0
+        self.lost_frames = 0
+        self.discarded_bytes = 0
+
+    def feed(self, data: bytes):
+        """
+        Return `(timestamps_us, samples)` for every complete frame, with
+        `samples` as `(n, 12)` float32 in physical units.
+        """
+        self._buffer += data
+        buf = np.frombuffer(self._buffer, np.uint8)
+        n = len(buf)
+        if n < FRAME_SIZE:
+            return np.empty(0, np.uint32), np.empty((0, 12), np.float32)
+
+        starts = np.flatnonzero((buf[:-1] == SYNC[0]) & (buf[1:] == SYNC[1]))
+        starts = starts[starts <= n - FRAME_SIZE]
+        raw = buf[starts[:, np.newaxis] + np.arange(FRAME_SIZE)]
+
+        crc = raw[:, 32].astype(np.uint16) | (raw[:, 33].astype(np.uint16) << 8)
+        valid = crc16(raw[:, 2:32]) == crc
+        candidates = starts
+        starts, raw = starts[valid], raw[valid]
+        if len(starts) > 1 and (np.diff(starts) < FRAME_SIZE).any():
+            # descarta sincronismos falsos dentro de um frame já aceito
+            # (raro: só então percorre os inícios, comparando com o último aceito)
+            keep = np.zeros(len(starts), dtype=bool)
+            fim = -1
+            for i, start in enumerate(starts.tolist()):
+                if start >= fim:
+                    keep[i] = True
+                    fim = start + FRAME_SIZE
+            starts, raw = starts[keep], raw[keep]
+
+        consumed = n - (FRAME_SIZE - 1)
+        if len(starts):
+            consumed = max(consumed, int(starts[-1]) + FRAME_SIZE)
+        self.crc_errors += self._count_crc_errors(candidates[~valid], starts)
+        self.discarded_bytes += consumed - FRAME_SIZE * len(starts)
+
+        del buf
+        del self._buffer[:consumed]
+
+        frames = np.ascontiguousarray(raw).view(FRAME_DTYPE).reshape(-1)
+        self._count_lost(frames["seq"])
+        self.frames += len(frames)
+        samples = frames["values"].astype(np.float32) / RAW_SCALE
+        return frames["timestamp_us"], samples
+
+    @property
+    def dropped(self):
+        """
+        Frames missing from the stream (sequence number gaps).
+        """
+        return self.lost_frames
+
+    @staticmethod
+    def _count_crc_errors(invalid, starts):
+        """
+        Count sync candidates that failed the CRC, ignoring the ones that
+        are just sync-like bytes inside a valid frame.
+        """
+        if len(invalid) == 0:
+            return 0
+        if len(starts) == 0:
+            return len(invalid)
+        frame = np.searchsorted(starts, invalid, side="right") - 1
+        inside = (frame >= 0) & (invalid < starts[np.maximum(frame, 0)] + FRAME_SIZE)
+        return int(np.count_nonzero(~inside))
+
+    def _count_lost(self, seq):
+        if len(seq) == 0:
+            return
+        seq = seq.astype(np.int64)
+        if self._last_seq is not None:
+            seq = np.concatenate([[self._last_seq], seq])
+        gaps = (np.diff(seq) - 1) % 65536
+        self.lost_frames += int(gaps.sum())
+        self._last_seq = int(seq[-1])
+
+
+class TextParser:
+    """
+    Incremental parser for the comma-separated text protocol. Complete
+    lines are converted to floats in a single NumPy call; lines without
+    exactly 12 numeric values are counted in `parse_errors` and skipped.
+    """
+
+    def __init__(self, num_values: int = 12):
+        self.num_values = num_values
+        self._buffer = b""
+        self.frames = 0
+        self.parse_errors = 0
+
+    def feed(self, data: bytes):
+        """
+        Return `(None, samples)` for every complete line, with `samples` as
+        `(n, 12)` float32. The text protocol carries no device timestamp.
+        """
+        *linhas, self._buffer = (self._buffer + data).split(b"\n")
+        linhas = [linha.strip() for linha in linhas]
+        validas = [
+            linha for linha in linhas if linha.count(b",") == self.num_values - 1
+        ]
+        self.parse_errors += sum(1 for linha in linhas if linha) - len(validas)
+        if not validas:
+            return None, np.empty((0, self.num_values), np.float32)
+
+        try:
+            campos = np.array(b",".join(validas).split(b","))
+            samples = campos.astype(np.float32).reshape(-1, self.num_values)
+        except ValueError:
+            # alguma linha inválida: converte linha a linha
+            rows = []
+            for linha in validas:
+                try:
+                    rows.append([float(v) for v in linha.split(b",")])
+                except ValueError:
+                    self.parse_errors += 1
+            samples = np.array(rows, np.float32).reshape(-1, self.num_values)
+
+        self.frames += len(samples)
+        return None, samples
+
+    @property
+    def dropped(self):
+        return self.parse_errors
+
+
+# contadores exportados por `register_parser_metrics`: (métrica, atributo, descrição)
+PARSER_METRICS = (
+    ("parse_errors_total", "parse_errors", "Malformed text lines skipped by the parser"),
+    ("crc_errors_total", "crc_errors", "Binary frames that failed the CRC"),
+    ("lost_frames_total", "lost_frames", "Binary frames missing from the stream (sequence gaps)"),
+    ("discarded_bytes_total", "discarded_bytes", "Bytes skipped while resynchronizing"),
+)
+
+
+def register_parser_metrics(parser, device: str):
+    """
+    Export the error counters that `parser` keeps (see PARSER_METRICS).
+    """
+    from src.metrics import METRICS
+
+    for nome, atributo, descricao in PARSER_METRICS:
+        if hasattr(parser, atributo):
+            METRICS.callback(
+                nome,
+                lambda atributo=atributo: getattr(parser, atributo),
+                descricao,
+                "counter",
+                device=device,
+            )
+
+
+def make_parser(protocol: str = "text"):
+    if protocol == "binary":
+        return BinaryParser()
+    elif protocol == "text":
+        return TextParser()
+    raise Exception(f"Unknown serial protocol: {protocol}. Use one of {PROTOCOLS}")
+
+
+def host_timestamps(now: float, timestamps_us, n: int, period: float = TEXT_SAMPLE_PERIOD):
+    """
+    Assign host timestamps to `n` samples read at `now`, the last sample
+    getting `now`. With device timestamps (binary protocol) the original
+    spacing between samples is kept; otherwise (text protocol) the samples
+    are spaced by the nominal `period`.
+    """
+    if timestamps_us is None:
+        return now - (n - 1 - np.arange(n)) * period
+    timestamps_us = np.asarray(timestamps_us, dtype=np.int64)
+    atraso_us = (timestamps_us[-1] - timestamps_us) % (1 << 32)
+    return now - atraso_us / 1e6
+
+
+def read_available(ser, max_bytes: int = 1 << 16):
+    """
+    Read everything already waiting in the port (at least one byte, so the
+    call still blocks up to the port timeout when there is nothing to read).
+    """
+    return ser.read(min(max(1, ser.in_waiting), max_bytes))
+
+
+class FakeSerial:
+    """
+    Stand-in for `serial.Serial` that streams a recording as if it came
+    from the ESP32, using either protocol.
+
+    Samples become available at `rate_hz` (0 = everything at once), or at
+    the recorded `timestamps` (seconds) divided by `speed` when given, and
+    `read` blocks up to `timeout` like a real port. `corrupt_every` flips
+    one byte every N samples to exercise resynchronization.
+    """
+
+    def __init__(
+        self,
+        samples,
+        protocol: str = "binary",
+        rate_hz: float = 100.0,
+        timeout: float = 1.0,
+        loop: bool = False,
+        corrupt_every: int = 0,
+        seed: int = 0,
+        timestamps=None,
+        speed: float = 1.0,
+    ):
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1, 12)
+        if timestamps is not None:
+            # relógio do host pode repetir ou voltar: força ordem não decrescente
+            chegadas = np.maximum.accumulate(np.asarray(timestamps, dtype=np.float64))
+            chegadas = chegadas - chegadas[0]
+        else:
+            chegadas = np.arange(len(samples)) / rate_hz if rate_hz > 0 else None
+        if protocol == "binary":
+            if timestamps is not None:
+                timestamps_us = np.round(chegadas * 1e6).astype(np.int64)
+            else:
+                period_us = int(1e6 / rate_hz) if rate_hz > 0 else 0
+                timestamps_us = np.arange(len(samples)) * period_us
+            payload = encode_frames(samples, timestamps_us=timestamps_us)
+            ends = np.arange(1, len(samples) + 1) * FRAME_SIZE
+        elif protocol == "text":
+            linhas = [encode_text(row) for row in samples]
+            payload = b"".join(linhas)
+            ends = np.cumsum([len(linha) for linha in linhas])
+        else:
+            raise Exception(f"Unknown serial protocol: {protocol}")
+
+        if corrupt_every > 0:
+            rng = np.random.default_rng(seed)
+            payload = bytearray(payload)
+            starts = np.concatenate([[0], ends[:-1]])
+            for i in range(0, len(samples), corrupt_every):
+                payload[rng.integers(starts[i], ends[i])] ^= 0xFF
+            payload = bytes(payload)
+
+        self._payload = payload
+        self._ends = ends
+        # instante (s, desde o início) em que cada amostra chega; None = tudo de uma vez
+        if chegadas is not None and timestamps is not None:
+            chegadas = chegadas / speed if speed > 0 else None
+        self._arrivals = chegadas
+        self._poll = 0.001
+        if chegadas is not None and len(chegadas) > 1:
+            self._poll = min(0.01, max(1e-4, float(chegadas[-1]) / (len(chegadas) - 1)))
+        self.rate_hz = rate_hz
+        self.timeout = timeout
+        self.loop = loop
+        self.is_open = True
+        self._pos = 0
+        self._start = None
+
+    @property
+    def exhausted(self):
+        """
+        Whether every byte was read (never true with `loop`).
+        """
+        return not self.loop and self._pos >= len(self._payload)
+
+    def _available_end(self):
+        if self._start is None:
+            self._start = time.perf_counter()
+        if self.loop and self._pos >= len(self._payload):
+            # recomeça a gravação
+            self._start = time.perf_counter()
+            self._pos = 0
+        if self._arrivals is None:
+            return len(self._payload)
+        n = int(np.searchsorted(self._arrivals, time.perf_counter() - self._start, "right"))
+        return int(self._ends[n - 1]) if n else 0
+
+    @property
+    def in_waiting(self):
+        return self._available_end() - self._pos
+
+    def read(self, size: int = 1):
+        limite = time.perf_counter() + self.timeout
+        while self.is_open:
+            end = self._available_end()
+            if end > self._pos:
+                data = self._payload[self._pos : min(end, self._pos + size)]
+                self._pos += len(data)
+                return data
+            if self.exhausted:
+                # como uma porta ociosa: espera o timeout em vez de girar
+                time.sleep(max(0.0, limite - time.perf_counter()))
+                return b""
+            if time.perf_counter() >= limite:
+                return b""
+            time.sleep(self._poll)
+        return b""
+
+    def readline(self):
+        linha = b""
+        while not linha.endswith(b"\n"):
+            data = self.read(1)
+            if not data:
+                break
+            linha += data
+        return linha
+
+    def write(self, data: bytes):
+        return len(data)
+
+    def close(self):
+        self.is_open = False
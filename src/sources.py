@@ -0,0 +1,137 @@
+import os
+import threading
+import serial
+
+# Fontes de amostras com a mesma interface de `serial.Serial` (read,
+# in_waiting, close), para rodar `web` e `captura` sem o ESP32:
+#   COM5, /dev/ttyUSB0      porta serial real
+#   replay:<captura>        reproduz a captura (.csv, .csv.gz ou .bin) em memória
+#   pty:<captura>           reproduz a captura por um pseudo-terminal (só POSIX)
+SOURCE_PREFIXES = ("replay:", "pty:")
+
+
+def replay_source(
+    file: str,
+    protocol: str = "text",
+    speed: float = 1.0,
+    loop: bool = False,
+    timeout: float = 1.0,
+):
+    """
+    FakeSerial streaming a capture with its recorded timestamps, encoded in
+    `protocol`. `speed` = 1 replays in real time, N replays N times faster
+    and 0 makes everything available at once.
+    """
+    from src.data_helpers import load_cached_recording
+    from src.serial_protocol import FakeSerial
+
+    recording = load_cached_recording(file)
+    return FakeSerial(
+        recording[:, 1:13],
+        protocol,
+        timeout=timeout,
+        loop=loop,
+        timestamps=recording[:, 0],
+        speed=speed,
+    )
+
+
+class PtyLoopback:
+    """
+    Pseudo-terminal fed by `source` (e.g. a `replay_source`) from a thread.
+    Reads go through a real `serial.Serial` opened on the terminal device,
+    so pyserial and the OS tty layer are exercised as with the ESP32; other
+    programs can also open `name` while it runs.
+
+    A full terminal buffer blocks the feeding thread, so a slow reader
+    slows the replay instead of losing bytes.
+    """
+
+    def __init__(self, source, baudrate: int = 115200, timeout: float = 1.0):
+        try:
+            import pty
+            import tty
+        except ImportError:
+            raise Exception("pty sources require a POSIX system (use replay: instead)")
+
+        self.source = source
+        self._master, slave = pty.openpty()
+        # sem eco nem conversão de fim de linha
+        tty.setraw(slave)
+        self.name = os.ttyname(slave)
+        self.port = serial.Serial(self.name, baudrate, timeout=timeout)
+        os.close(slave)
+
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._feed_loop, daemon=True)
+        self._thread.start()
+
+    def _feed_loop(self):
+        try:
+            while self.port.is_open:
+                data = self.source.read(4096)
+                if data:
+                    os.write(self._master, data)
+                elif self.source.exhausted:
+                    break
+        except OSError:
+            # o outro lado foi fechado
+            pass
+        self._done.set()
+
+    @property
+    def is_open(self):
+        return self.port.is_open
+
+    @property
+    def in_waiting(self):
+        return self.port.in_waiting
+
+    @property
+    def exhausted(self):
+        return self._done.is_set() and self.port.in_waiting == 0
+
+    def read(self, size: int = 1):
+        return self.port.read(size)
+
+    def readline(self):
+        return self.port.readline()
+
+    def write(self, data: bytes):
+        return self.port.write(data)
+
+    def close(self):
+        self.port.close()
+        self.source.close()
+        self._thread.join(1.0)
+        os.close(self._master)
+
+
+def is_replay(spec: str):
+    return spec.startswith(SOURCE_PREFIXES)
+
+
+def open_source(
+    spec: str,
+    baudrate: int = 115200,
+    protocol: str = "text",
+    speed: float = 1.0,
+    loop: bool = False,
+    timeout: float = 1.0,
+):
+    """
+    Open the sample source described by `spec` (see SOURCE_PREFIXES).
+    `speed` and `loop` only apply to replays. Raises
+    `serial.SerialException` when the port cannot be opened and
+    `FileNotFoundError` when the capture does not exist.
+    """
+    for prefix in SOURCE_PREFIXES:
+        if spec.startswith(prefix):
+            file = spec[len(prefix) :]
+            if not os.path.isfile(file):
+                raise FileNotFoundError(f"No capture found at {file}")
+            source = replay_source(file, protocol, speed, loop, timeout)
+            if prefix == "pty:":
+                return PtyLoopback(source, baudrate, timeout)
+            return source
+    return serial.Serial(spec, baudrate, timeout=timeout)
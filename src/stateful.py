@@ -0,0 +1,215 @@
+import math
+import time
+import numpy as np
+from src.streaming import StreamingClassifier, as_samples
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "tanh": np.tanh,
+    "sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+}
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS["softmax"] = _softmax
+
+
+def _activation(layer, key: str = "activation"):
+    nome = layer.get_config()[key]
+    if nome not in ACTIVATIONS:
+        raise Exception(f"Unsupported activation in {layer.name}: {nome}")
+    return ACTIVATIONS[nome]
+
+
+class StatefulLSTM:
+    """
+    NumPy re-implementation of a `LSTM -> ... -> LSTM -> Dense...` model
+    that keeps the hidden and cell states between calls, so each new sample
+    costs one recurrent step instead of re-running the whole window.
+
+    The state is kept for `lanes` independent sequences at once (see
+    StatefulStreamingClassifier); every lane receives the same samples and
+    can be reset on its own.
+    """
+
+    def __init__(self, model, preprocessor, lanes: int = 1):
+        from src.train_lib import scaler_affine
+
+        self.inv_scale, self.offset = scaler_affine(preprocessor)
+        self.cells = []
+        self.head = []
+        for layer in model.layers:
+            tipo = layer.__class__.__name__
+            if tipo == "LSTM" and not self.head:
+                kernel, recurrent, bias = layer.get_weights()
+                self.cells.append(
+                    (
+                        kernel.astype(np.float32),
+                        recurrent.astype(np.float32),
+                        bias.astype(np.float32),
+                        _activation(layer),
+                        _activation(layer, "recurrent_activation"),
+                    )
+                )
+            elif tipo == "Dense" and self.cells:
+                kernel, bias = layer.get_weights()
+                self.head.append((kernel, bias, _activation(layer)))
+            else:
+                raise Exception(
+                    f"Stateful inference supports LSTM layers followed by Dense layers, got {tipo}"
+                )
+
+        self.lanes = lanes
+        self.h = [np.zeros((lanes, len(r)), np.float32) for _, r, _, _, _ in self.cells]
+        self.c = [np.zeros((lanes, len(r)), np.float32) for _, r, _, _, _ in self.cells]
+
+    def reset(self, lanes=None):
+        """
+        Zero the state of the given lanes (all when None).
+        """
+        sel = slice(None) if lanes is None else lanes
+        for h, c in zip(self.h, self.c):
+            h[sel] = 0
+            c[sel] = 0
+
+    def step(self, x_proj):
+        """
+        Advance every lane by one sample, given the projection of the
+        normalized sample through the first kernel (see `project`).
+        """
+        entrada = None
+        for k, (kernel, recurrent, bias, act, rec_act) in enumerate(self.cells):
+            h, c = self.h[k], self.c[k]
+            if k == 0:
+                z = x_proj + h @ recurrent
+            else:
+                z = entrada @ kernel + h @ recurrent + bias
+            # ordem das portas no keras: entrada, esquecimento, célula, saída
+            i, f, g, o = np.split(z, 4, axis=1)
+            c[:] = rec_act(f) * c + rec_act(i) * act(g)
+            h[:] = rec_act(o) * act(c)
+            entrada = h
+
+    def project(self, samples):
+        """
+        Normalize raw samples `(n, num_features)` and project them through
+        the first kernel in one product (the input term is the same for
+        every lane).
+        """
+        kernel, _, bias, _, _ = self.cells[0]
+        return (samples * self.inv_scale + self.offset) @ kernel + bias
+
+    def predict_proba(self, lane: int):
+        """
+        Class probabilities from the current state of `lane`.
+        """
+        x = self.h[-1][lane]
+        for kernel, bias, act in self.head:
+            x = act(x @ kernel + bias)
+        return x
+
+
+class StatefulStreamingClassifier(StreamingClassifier):
+    """
+    StreamingClassifier that advances the LSTM state sample by sample
+    instead of re-running each window.
+
+    `lanes` copies of the state are kept, reset every `period` samples with
+    their resets staggered by `period / lanes`. A prediction uses the lane
+    with the longest history, so it sees between `period - period / lanes`
+    and `period` samples from a zero state, like a training window. With
+    `period = timesteps` and `lanes = period / gcd(period, hop)` (the
+    defaults) a lane is reset exactly `period` samples before every
+    classification point, so the predictions are the same as the windowed
+    model; fewer lanes trade that equivalence for less work per sample (one
+    recurrent step per lane).
+
+    Used by `replay --stateful` and `bench stateful` only: the web pipeline
+    classifies batches of windows from several devices and keeps no
+    per-device recurrent state.
+    """
+
+    def __init__(
+        self,
+        model,
+        preprocessor,
+        timesteps: int = 50,
+        hop: int = 10,
+        votes: int = 3,
+        refractory: int = 100,
+        period=None,
+        lanes=None,
+    ):
+        num_features = preprocessor.named_steps["scaler"].n_features_in_
+        super().__init__(None, timesteps, num_features, hop, votes, refractory)
+
+        self.period = period or timesteps
+        lanes = lanes or self.period // math.gcd(self.period, hop)
+        if self.period % lanes:
+            raise ValueError(f"period ({self.period}) must be a multiple of lanes ({lanes})")
+        self.lstm = StatefulLSTM(model, preprocessor, lanes)
+        # a lane j reinicia nas amostras j * stagger + k * period
+        self._stagger = self.period // lanes
+        self._count = 0
+        self._last_reset = np.zeros(lanes, dtype=int)
+
+    def reset(self):
+        super().reset()
+        self.lstm.reset()
+        self._count = 0
+        self._last_reset[:] = 0
+
+    def advance(self, samples):
+        """
+        Run one sample or a block of samples through the recurrent state and
+        return `(indices, probabilities)` for each classification point
+        (every `hop` samples once `timesteps` samples were seen).
+        """
+        samples = as_samples(samples, self.buffer.num_features)
+        indices = []
+        probas = []
+        for x_proj in self.lstm.project(samples):
+            # reinicia a lane cujo período começa nesta amostra
+            fase = self._count % self.period
+            if fase % self._stagger == 0:
+                lane = fase // self._stagger
+                self.lstm.reset(lane)
+                self._last_reset[lane] = self._count
+
+            self.lstm.step(x_proj)
+            self._count += 1
+            self._since_hop += 1
+            if self._since_hop < self.hop:
+                continue
+            self._since_hop = 0
+            if self._count < self.timesteps:
+                continue
+
+            lane = int(np.argmin(self._last_reset))
+            indices.append(self._count)
+            probas.append(self.lstm.predict_proba(lane))
+        return indices, probas
+
+    def feed(self, samples, max_windows=None):
+        """
+        Same contract as StreamingClassifier.feed. `max_windows` is ignored:
+        every sample has to go through the state, and the cost per sample is
+        constant, so there are no stale windows to skip.
+        """
+        inicio = time.perf_counter()
+        indices, probas = self.advance(samples)
+        if indices:
+            # custo da chamada que fechou ao menos uma classificação
+            self.inference_times.append(time.perf_counter() - inicio)
+
+        detections = []
+        for index, proba in zip(indices, probas):
+            detection = self.update(index, int(np.argmax(proba)))
+            if detection is not None:
+                detections.append(detection)
+        return detections
@@ -0,0 +1,301 @@
+from collections import Counter, deque
+from typing import NamedTuple
+import time
+import numpy as np
+
+
+class Detection(NamedTuple):
+    # índice (contagem total de amostras) da amostra que fechou a janela
+    index: int
+    class_id: int
+
+
+def as_samples(samples, num_features: int, dtype=np.float32):
+    """
+    Return one sample `(num_features,)` or a block `(n, num_features)` as a
+    2-D array. Raises ValueError when the last axis is not `num_features`
+    (e.g. 12-column captures fed to a 6-feature model).
+    """
+    samples = np.asarray(samples, dtype=dtype)
+    if samples.ndim not in (1, 2) or samples.shape[-1] != num_features:
+        raise ValueError(
+            f"expected samples with {num_features} features, got shape {samples.shape}"
+        )
+    return samples.reshape(-1, num_features)
+
+
+class RingBuffer:
+    """
+    Fixed-size buffer holding the last `capacity` samples.
+
+    Every sample is written twice (at `pos` and `pos + capacity`), so the most
+    recent `capacity` samples are always available as one contiguous view,
+    without copying or `np.roll`.
+    """
+
+    def __init__(self, capacity: int, num_features: int, dtype=np.float32):
+        self.capacity = capacity
+        self.num_features = num_features
+        self._data = np.zeros((2 * capacity, num_features), dtype=dtype)
+        self._pos = 0
+        # total de amostras já escritas
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def is_full(self):
+        return self.count >= self.capacity
+
+    def append(self, sample):
+        self._data[self._pos] = sample
+        self._data[self._pos + self.capacity] = sample
+        self._pos = (self._pos + 1) % self.capacity
+        self.count += 1
+
+    def extend(self, samples):
+        samples = as_samples(samples, self.num_features, self._data.dtype)
+        n = len(samples)
+        if n == 0:
+            return
+        self.count += n
+        if n >= self.capacity:
+            tail = samples[-self.capacity :]
+            self._data[: self.capacity] = tail
+            self._data[self.capacity :] = tail
+            self._pos = 0
+            return
+        idx = (self._pos + np.arange(n)) % self.capacity
+        self._data[idx] = samples
+        self._data[idx + self.capacity] = samples
+        self._pos = (self._pos + n) % self.capacity
+
+    def window(self):
+        """
+        Return a view of the last `capacity` samples, oldest first.
+        """
+        return self._data[self._pos : self._pos + self.capacity]
+
+    def clear(self):
+        self._pos = 0
+        self.count = 0
+
+
+class StreamingClassifier:
+    """
+    Sliding-window classifier for a continuous sample stream.
+
+    The last `timesteps` samples are classified every `hop` new samples.
+    Raw predictions are smoothed by a majority vote over the last `votes`
+    windows, and a detected class is emitted once per event: it is not
+    repeated until the smoothed prediction goes back to 0 ("none") or
+    `refractory` samples have passed.
+
+    `feed` classifies each window with `classify_gesture`. Callers that
+    classify windows themselves (e.g. batched across devices) use `push`
+    and `update` instead and may leave `classify_gesture` as None.
+    """
+
+    def __init__(
+        self,
+        classify_gesture=None,
+        timesteps: int = 50,
+        num_features: int = 12,
+        hop: int = 10,
+        votes: int = 3,
+        refractory: int = 100,
+    ):
+        if hop < 1:
+            raise ValueError(f"hop must be >= 1, got {hop}")
+
+        self.classify_gesture = classify_gesture
+        self.timesteps = timesteps
+        self.hop = hop
+        self.votes = max(1, votes)
+        self.refractory = refractory
+
+        self.buffer = RingBuffer(timesteps, num_features)
+        self._recent = deque(maxlen=self.votes)
+        self._since_hop = 0
+        self._last_class = 0
+        self._last_emit = None
+
+        # tempo (s) gasto nas últimas classificações, para diagnóstico
+        self.inference_times = deque(maxlen=10_000)
+        self.windows = 0
+        # janelas não classificadas para recuperar o atraso (ver `feed`)
+        self.skipped_windows = 0
+
+    def reset(self):
+        self.buffer.clear()
+        self._recent.clear()
+        self._since_hop = 0
+        self._last_class = 0
+        self._last_emit = None
+
+    def push(self, samples, max_windows=None):
+        """
+        Push one sample (shape `(num_features,)`) or a block of samples
+        (shape `(n, num_features)`) and return the windows that became ready
+        for classification, as `(indices, windows)` with `windows` shaped
+        `(n_windows, timesteps, num_features)`.
+
+        When the block spans more than `max_windows` classification points
+        (the caller is lagging behind the stream), only the last
+        `max_windows` windows are returned; every sample still goes into
+        the buffer.
+        """
+        samples = as_samples(samples, self.buffer.num_features)
+        indices = []
+        windows = []
+
+        if max_windows is not None:
+            n_windows = (self._since_hop + len(samples)) // self.hop
+            if n_windows > max_windows:
+                # avança sem classificar até restarem `max_windows` janelas
+                pular = (n_windows - max_windows) * self.hop - self._since_hop
+                self.buffer.extend(samples[:pular])
+                self._since_hop = 0
+                self.skipped_windows += n_windows - max_windows
+                samples = samples[pular:]
+
+        start = 0
+        while start < len(samples):
+            # avança somente até o próximo ponto de classificação
+            step = min(self.hop - self._since_hop, len(samples) - start)
+            self.buffer.extend(samples[start : start + step])
+            self._since_hop += step
+            start += step
+
+            if self._since_hop < self.hop:
+                continue
+            self._since_hop = 0
+
+            if not self.buffer.is_full():
+                continue
+
+            indices.append(self.buffer.count)
+            windows.append(self.buffer.window().copy())
+
+        if not windows:
+            return indices, np.empty((0, self.timesteps, self.buffer.num_features), np.float32)
+        return indices, np.stack(windows)
+
+    def feed(self, samples, max_windows=None):
+        """
+        Push samples (see `push`), classify every ready window with
+        `classify_gesture` and return the list of new detections.
+        """
+        detections = []
+        indices, windows = self.push(samples, max_windows)
+        for index, window in zip(indices, windows):
+            inicio = time.perf_counter()
+            prediction = int(self.classify_gesture(window[np.newaxis]))
+            self.inference_times.append(time.perf_counter() - inicio)
+
+            detection = self.update(index, prediction)
+            if detection is not None:
+                detections.append(detection)
+
+        return detections
+
+    def update(self, index: int, prediction: int):
+        """
+        Smooth the prediction of the window closed at sample `index` and
+        return a Detection when a new event starts.
+        """
+        self.windows += 1
+        self._recent.append(int(prediction))
+        smoothed, n_votes = Counter(self._recent).most_common(1)[0]
+        if n_votes * 2 <= len(self._recent):
+            # sem maioria: mantém o estado atual
+            return None
+
+        if smoothed == 0:
+            self._last_class = 0
+            return None
+
+        if smoothed == self._last_class and (
+            self._last_emit is not None and index - self._last_emit < self.refractory
+        ):
+            return None
+
+        self._last_class = smoothed
+        self._last_emit = index
+        return Detection(index, smoothed)
+
+
+def movement_latency(timestamps, movimento, detections):
+    """
+    Match detections to the labeled movements (`em_movimento` onsets) of a
+    recording. Returns `(onsets, missed, latencies)`, where each latency is
+    the recorded time from a movement's onset to the first non-idle
+    detection before the next onset.
+    """
+    onsets = np.flatnonzero(np.diff(movimento, prepend=0) == 1)
+    indices = np.array([d.index - 1 for d in detections if d.class_id > 0], dtype=int)
+    latencies = []
+    missed = 0
+    for k, onset in enumerate(onsets):
+        fim = onsets[k + 1] if k + 1 < len(onsets) else len(timestamps)
+        depois = indices[(indices >= onset) & (indices < fim)]
+        if len(depois) == 0:
+            missed += 1
+            continue
+        latencies.append(timestamps[depois[0]] - timestamps[onset])
+    return onsets, missed, latencies
+
+
+def replay_csv(file: str, engine: StreamingClassifier, speed: float = 1.0):
+    """
+    Feed a recorded capture through `engine` using the recorded timestamps.
+
+    `speed` = 1 replays in real time, N replays N times faster and 0 replays
+    as fast as possible. Returns a dict with the detections and latency
+    statistics, where detection latency is measured from the start of each
+    labeled movement (`em_movimento`) to the first detection after it.
+    """
+    from src.data_helpers import load_csv_recording
+
+    recording = load_csv_recording(file)
+    timestamps = recording[:, 0] - recording[0, 0]
+    samples = recording[:, 1:13].astype(np.float32)
+    movimento = recording[:, 13].astype(int)
+
+    engine.reset()
+    engine.inference_times.clear()
+    engine.windows = 0
+
+    detections = []
+    atrasos = []
+    inicio = time.perf_counter()
+    for i in range(len(samples)):
+        if speed > 0:
+            # espera até o instante em que a amostra teria chegado pela serial
+            espera = timestamps[i] / speed - (time.perf_counter() - inicio)
+            if espera > 0:
+                time.sleep(espera)
+        chegada = time.perf_counter()
+
+        for detection in engine.feed(samples[i]):
+            detections.append(detection)
+            atrasos.append(time.perf_counter() - chegada)
+    duracao = time.perf_counter() - inicio
+
+    onsets, missed, detection_latency = movement_latency(timestamps, movimento, detections)
+
+    inference = np.array(engine.inference_times) * 1e3
+    return {
+        "samples": len(samples),
+        "windows": engine.windows,
+        "detections": detections,
+        "duration_s": duracao,
+        "recording_s": float(timestamps[-1]),
+        "realtime_factor": float(timestamps[-1]) / duracao if duracao > 0 else np.inf,
+        "inference_p50_ms": float(np.percentile(inference, 50)) if len(inference) else np.nan,
+        "inference_p99_ms": float(np.percentile(inference, 99)) if len(inference) else np.nan,
+        "emit_delay_p50_ms": float(np.percentile(atrasos, 50)) * 1e3 if atrasos else np.nan,
+        "movements": len(onsets),
+        "missed": missed,
+        "detection_latency_s": detection_latency,
+    }
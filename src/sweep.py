@@ -0,0 +1,248 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import csv
+import itertools
+import multiprocessing
+import os
+import random
+import time
+import numpy as np
+import yaml
+
+SPACE_KEYS = ("timesteps", "stride", "lstm_units", "dense_units", "batch_size", "learning_rate")
+LEADERBOARD_COLUMNS = [
+    "trial",
+    "status",
+    *SPACE_KEYS,
+    "epochs",
+    "val_accuracy",
+    "test_accuracy",
+    "train_s",
+    "latency_ms",
+    "error",
+]
+SWEEP_DEFAULTS = {
+    "trials": 0,
+    "seed": 0,
+    "epochs": 20,
+    "patience": 3,
+    "prune_after": 3,
+    "min_trials_to_prune": 3,
+    "processes": 0,
+}
+SPACE_DEFAULTS = {
+    "timesteps": [50],
+    "stride": [50],
+    "lstm_units": [[64, 32]],
+    "dense_units": [32],
+    "batch_size": [16],
+    "learning_rate": [0.001],
+}
+
+# curvas de val_accuracy por trial, compartilhadas entre os processos (poda)
+_curves = None
+
+
+def load_sweep(file: str):
+    """
+    Read a sweep description (see config/sweep.yaml), filling in defaults.
+    """
+    with open(file, "r") as f:
+        config = yaml.safe_load(f) or {}
+    space = dict(SPACE_DEFAULTS, **config.get("space", {}))
+    desconhecidas = set(space) - set(SPACE_KEYS)
+    if desconhecidas:
+        raise Exception(f"Unknown sweep parameters: {sorted(desconhecidas)}. Use {SPACE_KEYS}")
+    return dict(SWEEP_DEFAULTS, **{k: v for k, v in config.items() if k != "space"}), space
+
+
+def expand_trials(space: dict, n_trials: int = 0, seed: int = 0):
+    """
+    Every combination of the search space (or `n_trials` of them drawn at
+    random), ordered by window size so trials that share the preprocessing
+    run close to each other.
+    """
+    grid = [dict(zip(SPACE_KEYS, valores)) for valores in itertools.product(*(space[k] for k in SPACE_KEYS))]
+    # stride maior que a janela deixaria amostras de fora
+    grid = [t for t in grid if t["stride"] <= t["timesteps"]]
+    if 0 < n_trials < len(grid):
+        grid = random.Random(seed).sample(grid, n_trials)
+    grid.sort(key=lambda t: (t["timesteps"], t["stride"]))
+    return [dict(t, trial=i) for i, t in enumerate(grid)]
+
+
+def _init_worker(threads: int, curves):
+    """
+    Limit the threads of each trial process so `processes` trials running
+    at once do not oversubscribe the CPU. Runs before TensorFlow is imported.
+    """
+    global _curves
+
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "TF_NUM_INTRAOP_THREADS"):
+        os.environ[var] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    _curves = curves
+
+
+def _pruning_callback(trial: int, prune_after: int, min_trials: int):
+    """
+    Median stopping rule: from epoch `prune_after` on, stop the trial when
+    its best val_accuracy so far is below the median of the other trials'
+    best at the same epoch (once at least `min_trials` reached it).
+    """
+    import keras
+
+    class MedianPruning(keras.callbacks.Callback):
+        pruned = False
+
+        def on_epoch_end(self, epoch, logs=None):
+            curva = list(_curves.get(trial, [])) + [float(logs["val_accuracy"])]
+            _curves[trial] = curva
+            if epoch + 1 < prune_after:
+                return
+            outros = [
+                max(c[: epoch + 1]) for t, c in _curves.items() if t != trial and len(c) > epoch
+            ]
+            if len(outros) >= min_trials and max(curva) < np.median(outros):
+                self.pruned = True
+                self.model.stop_training = True
+
+    return MedianPruning()
+
+
+_test_windows = {}
+
+
+def run_trial(config: dict, epochs: int, patience: int, prune_after: int, min_trials: int):
+    """
+    Train one configuration and measure it. Returns a leaderboard row.
+    """
+    import keras
+    from src.benchmarks import latency_stats, time_calls
+    from src.data_helpers import get_data
+    from src.train_lib import build_predictor, train_model
+
+    linha = {k: config[k] for k in ["trial", *SPACE_KEYS]}
+    try:
+        pruner = _pruning_callback(config["trial"], prune_after, min_trials)
+        parada = keras.callbacks.EarlyStopping(
+            monitor="val_accuracy", patience=patience, restore_best_weights=True
+        )
+
+        inicio = time.perf_counter()
+        model, preprocessor, history = train_model(
+            "train_data",
+            f"trial{config['trial']}",
+            stride=config["stride"],
+            workers=1,
+            timesteps=config["timesteps"],
+            lstm_units=config["lstm_units"],
+            dense_units=config["dense_units"],
+            batch_size=config["batch_size"],
+            learning_rate=config["learning_rate"],
+            epochs=epochs,
+            callbacks=[parada, pruner],
+            save=False,
+            verbose=0,
+            report=False,
+            # o espaço de busca é o da LSTM, independente do `arch` do params.yaml
+            arch="lstm",
+        )
+        train_s = time.perf_counter() - inicio
+
+        # acurácia nas gravações de teste, com janelas do tamanho do trial
+        timesteps = config["timesteps"]
+        if timesteps not in _test_windows:
+            _test_windows[timesteps] = get_data("test_data", timesteps=timesteps, stride=timesteps)
+        X_test, y_test = _test_windows[timesteps]
+        predict_proba = build_predictor(model, preprocessor, compiled=True)
+        test_accuracy = float(
+            (np.argmax(predict_proba(X_test), axis=1) == y_test.astype(int)).mean()
+        )
+        latency = latency_stats(time_calls(predict_proba, X_test[:100, np.newaxis]))
+
+        linha.update(
+            status="pruned" if pruner.pruned else "done",
+            epochs=len(history.history["val_accuracy"]),
+            val_accuracy=max(history.history["val_accuracy"]),
+            test_accuracy=test_accuracy,
+            train_s=train_s,
+            latency_ms=latency["p50_ms"],
+        )
+    except Exception as e:
+        linha.update(status="error", error=str(e))
+    return linha
+
+
+def read_leaderboard(file):
+    with open(file, newline="") as f:
+        linhas = list(csv.DictReader(f))
+    return sorted(
+        linhas,
+        key=lambda l: float(l["test_accuracy"]) if l["test_accuracy"] else -1.0,
+        reverse=True,
+    )
+
+
+def run_sweep(sweep_file: str, output: str = "sweep_leaderboard.csv", processes: int = 0):
+    """
+    Run every trial of `sweep_file` in a process pool and write one
+    leaderboard row per finished trial to `output`. Returns the leaderboard
+    sorted by test accuracy.
+    """
+    from src.data_helpers import build_cache, dataset_files
+    from src.train_lib import prepare_training
+
+    config, space = load_sweep(sweep_file)
+    trials = expand_trials(space, config["trials"], config["seed"])
+    processes = processes or config["processes"] or max(1, (os.cpu_count() or 1) // 2)
+    threads = max(1, (os.cpu_count() or 1) // processes)
+
+    # cache das gravações e scalers ajustados antes de abrir os processos:
+    # os trials só carregam o que já está em dataset/.cache
+    with open("config/params.yaml", "r") as f:
+        params = yaml.safe_load(f)
+    build_cache(dataset_files(params))
+    for timesteps, stride in sorted({(t["timesteps"], t["stride"]) for t in trials}):
+        prepare_training("train_data", timesteps, stride)
+
+    print(f"🔎 {len(trials)} trials em {processes} processos ({threads} threads cada)")
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    ctx = multiprocessing.get_context("spawn")
+    with open(output, "w", newline="") as f, ctx.Manager() as manager:
+        writer = csv.DictWriter(f, LEADERBOARD_COLUMNS)
+        writer.writeheader()
+        curves = manager.dict()
+        with ProcessPoolExecutor(
+            processes, mp_context=ctx, initializer=_init_worker, initargs=(threads, curves)
+        ) as pool:
+            futures = [
+                pool.submit(
+                    run_trial,
+                    trial,
+                    config["epochs"],
+                    config["patience"],
+                    config["prune_after"],
+                    config["min_trials_to_prune"],
+                )
+                for trial in trials
+            ]
+            for future in as_completed(futures):
+                linha = future.result()
+                writer.writerow(linha)
+                f.flush()
+                if linha["status"] == "error":
+                    print(f"❌ trial {linha['trial']}: {linha['error']}")
+                else:
+                    print(
+                        f"{'✂️' if linha['status'] == 'pruned' else '✅'} trial {linha['trial']}:"
+                        f" acurácia {linha['test_accuracy']:.4f}, {linha['epochs']} épocas,"
+                        f" {linha['train_s']:.0f}s, {linha['latency_ms']:.2f} ms/janela"
+                    )
+    return read_leaderboard(output)
@@ -0,0 +1,126 @@
+from pathlib import Path
+import time
+import numpy as np
+from src.metrics import METRICS
+
+# mesmo diretório de src/train_lib.py (não importado de lá para não carregar o keras)
+MODEL_FOLDER = Path("models")
+QUANTIZATIONS = ("float32", "float16", "int8")
+
+
+def tflite_path(name: str, quantization: str = "float16"):
+    return MODEL_FOLDER / f"{name}_{quantization}.tflite"
+
+
+def export_tflite(
+    model,
+    preprocessor,
+    name: str,
+    quantization: str = "float16",
+    batch_size: int = 1,
+):
+    """
+    Convert `model` into a single TFLite file that takes raw windows
+    `(batch_size, timesteps, num_features)` and returns class probabilities,
+    with the StandardScaler folded into the graph. The batch size is fixed:
+    the LSTM only lowers to builtin TFLite ops with static shapes.
+
+    `quantization`: `float32`, `float16` (float16 weights) or `int8`
+    (dynamic-range: int8 weights, activations quantized on the fly). Full
+    integer quantization is not offered, the LSTM kernels do not support it.
+    """
+    import keras
+    import tensorflow as tf
+    from src.train_lib import scaler_affine
+
+    if quantization not in QUANTIZATIONS:
+        raise Exception(f"Unknown quantization: {quantization}. Use one of {QUANTIZATIONS}")
+
+    inv_scale, offset = scaler_affine(preprocessor)
+    timesteps = preprocessor.named_steps["reshape3d"].timesteps
+    num_features = preprocessor.named_steps["scaler"].n_features_in_
+
+    # x * inv_scale + offset como primeira camada do grafo exportado
+    entrada = keras.Input((timesteps, num_features), batch_size=batch_size)
+    x = keras.layers.Rescaling(inv_scale, offset)(entrada)
+    wrapper = keras.Model(entrada, model(x, training=False))
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(wrapper)
+    if quantization != "float32":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+
+    filepath = tflite_path(name, quantization)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    filepath.write_bytes(converter.convert())
+    print(f"TFLite model saved to {filepath}")
+    return filepath
+
+
+def _interpreter_class():
+    """
+    Prefer the standalone runtimes (no TensorFlow import), falling back to
+    the interpreter bundled with TensorFlow.
+    """
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+
+            return tf.lite.Interpreter
+    return Interpreter
+
+
+def build_tflite_predictor(filepath, num_threads: int = 1):
+    """
+    Build a `predict_proba(raw (n, timesteps, num_features)) -> (n, n_classes)`
+    function running a model exported by `export_tflite`.
+    """
+    filepath = Path(filepath)
+    if not filepath.is_file():
+        raise FileNotFoundError(f"No TFLite model found at {filepath}")
+
+    interpreter = _interpreter_class()(
+        model_path=str(filepath), num_threads=num_threads
+    )
+    interpreter.allocate_tensors()
+    entrada = interpreter.get_input_details()[0]
+    saida = interpreter.get_output_details()[0]
+    batch_size = int(entrada["shape"][0])
+    buffer = np.zeros(entrada["shape"], dtype=np.float32)
+    print(f"TFLite model loaded from {filepath}")
+    # o scaler está embutido no modelo exportado: só há o estágio do modelo
+    model_time = METRICS.histogram(
+        "stage_seconds", "Latency of each processing stage", stage="model", backend="tflite"
+    )
+
+    def predict_chunk(raw_data):
+        inicio = time.perf_counter()
+        if len(raw_data) == batch_size:
+            interpreter.set_tensor(entrada["index"], raw_data)
+        else:
+            # último lote incompleto: completa com zeros
+            buffer[: len(raw_data)] = raw_data
+            buffer[len(raw_data) :] = 0
+            interpreter.set_tensor(entrada["index"], buffer)
+        interpreter.invoke()
+        proba = interpreter.get_tensor(saida["index"])[: len(raw_data)].copy()
+        model_time.record(time.perf_counter() - inicio)
+        return proba
+
+    def predict_proba(raw_data):
+        raw_data = np.ascontiguousarray(raw_data, dtype=np.float32)
+        if len(raw_data) <= batch_size:
+            return predict_chunk(raw_data)
+        return np.concatenate(
+            [
+                predict_chunk(raw_data[start : start + batch_size])
+                for start in range(0, len(raw_data), batch_size)
+            ]
+        )
+
+    return predict_proba
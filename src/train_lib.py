@@ -1,127 +1,511 @@
 import numpy as np
-import keras
-from keras import layers
-from sklearn.model_selection import train_test_split
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
-from sklearn.base import BaseEstimator, TransformerMixin
-from src.data_helpers import get_data
+import math
 import os
+import time
 from pathlib import Path
-import joblib
-
-MODEL_FOLDER = Path("models")
-
-
-def load_classifier(name: str):
-    return build_classifier(load_model(name), load_preprocessor(name))
+from src.metrics import METRICS
 
+# keras, sklearn e joblib são importados só nas funções que os usam, para
+# que os comandos que não treinam nem carregam o modelo iniciem rápido
 
-# Transformers personalizados para redimensionamento
-class ReshapeTo2D(BaseEstimator, TransformerMixin):
-    def fit(self, X, y=None):
-        return self
-
-    def __sklearn_is_fitted__(self):
-        return True
+MODEL_FOLDER = Path("models")
 
-    def transform(self, X):
-        return X.reshape(-1, X.shape[2])
+# nomes que vivem em módulos pesados, carregados no primeiro acesso (os
+# preprocessadores salvos referenciam src.train_lib.ReshapeTo2D/3D)
+_LAZY_NAMES = {
+    "ReshapeTo2D": "src.preprocessing",
+    "ReshapeTo3D": "src.preprocessing",
+    "WindowSequence": "src.window_sequence",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_NAMES:
+        import importlib
+
+        return getattr(importlib.import_module(_LAZY_NAMES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+BACKENDS = ("keras", "tflite")
+
+
+def load_predictor(
+    name: str,
+    batch_size: int = 256,
+    compiled: bool = False,
+    backend: str = "keras",
+    quantization: str = "float16",
+):
+    """
+    Load the `predict_proba` function of a trained model, either from the
+    Keras file (`backend="keras"`) or from its TFLite export
+    (`backend="tflite"`, see `main.py export`). Feature models
+    (`train --arch gbt`) are detected by name and run without TensorFlow.
+    """
+    if backend not in BACKENDS:
+        raise Exception(f"Unknown backend: {backend}. Use one of {BACKENDS}")
+
+    from src.features import build_feature_predictor, is_feature_model, load_feature_model
+
+    if is_feature_model(name):
+        if backend != "keras":
+            raise Exception(f"{name} is a feature model, it has no {backend} export")
+        return build_feature_predictor(load_feature_model(name))
+    if backend == "tflite":
+        from src.tflite_backend import build_tflite_predictor, tflite_path
+
+        return build_tflite_predictor(tflite_path(name, quantization))
+    return build_predictor(load_model(name), load_preprocessor(name), compiled, batch_size)
+
+
+def load_classifier(
+    name: str, compiled: bool = False, backend: str = "keras", quantization: str = "float16"
+):
+    predict_proba = load_predictor(name, 1, compiled, backend, quantization)
+    return lambda raw_data: np.argmax(predict_proba(raw_data))
+
+
+def load_batch_classifier(
+    name: str,
+    batch_size: int = 256,
+    compiled: bool = False,
+    backend: str = "keras",
+    quantization: str = "float16",
+):
+    predict_proba = load_predictor(name, batch_size, compiled, backend, quantization)
+    return lambda raw_data: np.argmax(predict_proba(raw_data), axis=1)
+
+
+def model_num_features(name: str):
+    """
+    Number of sensor features a saved model expects per sample.
+    """
+    from src.features import is_feature_model, load_feature_model
+
+    if is_feature_model(name):
+        return load_feature_model(name).named_steps["features"].num_features
+    return load_preprocessor(name).named_steps["scaler"].n_features_in_
+
+
+def scaler_affine(preprocessor):
+    """
+    Fold the pipeline's StandardScaler into `x * inv_scale + offset`.
+    """
+    scaler = preprocessor.named_steps["scaler"]
+    mean = np.asarray(scaler.mean_ if scaler.with_mean else 0.0, dtype=np.float32)
+    scale = np.asarray(scaler.scale_ if scaler.with_std else 1.0, dtype=np.float32)
+    # (x - mean) / scale == x * inv_scale + offset
+    inv_scale = (1.0 / scale).astype(np.float32)
+    offset = (-mean * inv_scale).astype(np.float32)
+    return inv_scale, offset
+
+
+def fit_scaler(preprocessing_pipe, dataset, indices, step: int = 1, batch_size: int = 4096):
+    """
+    Fit the pipeline's StandardScaler incrementally (`partial_fit`), one
+    recording at a time and in batches of `batch_size` windows.
+
+    With overlapping windows, `step` skips windows so that every sample is
+    seen about once.
+    """
+    scaler = preprocessing_pipe.named_steps["scaler"]
+    num_features = dataset.window_shape[1]
+    indices = np.sort(indices)
+    recording = np.searchsorted(dataset.offsets, indices, side="right") - 1
+    for r in np.unique(recording):
+        recording_indices = indices[recording == r][::step]
+        for start in range(0, len(recording_indices), batch_size):
+            batch = dataset.take(recording_indices[start : start + batch_size])
+            scaler.partial_fit(batch.reshape(-1, num_features))
+    return preprocessing_pipe
+
+
+# preparações já feitas neste processo: (dataset, timesteps, stride) -> tupla
+_prepared = {}
+
+
+def prepare_training(dataset_name: str, timesteps: int, stride: int, use_cache: bool = True):
+    """
+    Window `dataset_name`, split it into train/test indices and fit the
+    preprocessing pipeline on the train windows. Returns
+    `(dataset, train_idx, test_idx, preprocessing_pipe)`.
+
+    Results are memoized per process, and the fitted pipeline is also kept in
+    the dataset cache, so runs that share `timesteps` and `stride` (e.g.
+    sweep trials) only window and scale the data once.
+    """
+    import hashlib
+    import json
+    import joblib
+    import yaml
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from src.data_helpers import CACHE_FOLDER, dataset_files, get_windows
+    from src.preprocessing import ReshapeTo2D, ReshapeTo3D
 
+    chave = (dataset_name, timesteps, stride)
+    if use_cache and chave in _prepared:
+        return _prepared[chave]
 
-class ReshapeTo3D(BaseEstimator, TransformerMixin):
-    def __init__(self, timesteps, num_features):
-        self.timesteps = timesteps
-        self.num_features = num_features
+    with open("config/params.yaml", "r") as f:
+        params = yaml.safe_load(f)
 
-    def fit(self, X, y=None):
-        return self
+    # Carregar dados (janelas são views das gravações, sem cópia)
+    dataset = get_windows(dataset_name, stride, use_cache, timesteps)
+    num_features = dataset.window_shape[1]
 
-    def __sklearn_is_fitted__(self):
-        return True
+    # Divisão treino/teste (corrigindo vazamento de dados)
+    if stride == timesteps:
+        train_idx, test_idx = train_test_split(
+            np.arange(len(dataset)), test_size=0.2, random_state=42
+        )
+    else:
+        # janelas sobrepostas: separa o final de cada gravação para teste
+        train_idx, test_idx = dataset.split(
+            test_size=0.2, gap=math.ceil(timesteps / stride) - 1
+        )
+
+    # o scaler ajustado depende só dos arquivos, das janelas e dos rótulos
+    descricao = {
+        "files": [
+            (os.path.abspath(f), os.stat(f).st_mtime_ns, os.stat(f).st_size)
+            for f in dataset_files(params, [dataset_name])
+        ],
+        "timesteps": timesteps,
+        "stride": stride,
+        "label_policy": params.get("label_policy", "majority"),
+        "label_threshold": params.get("label_threshold", 0.5),
+        "classes": params["classes"],
+    }
+    scaler_file = CACHE_FOLDER / (
+        "scaler_" + hashlib.sha1(json.dumps(descricao).encode()).hexdigest() + ".pkl"
+    )
+    if use_cache and scaler_file.is_file():
+        preprocessing_pipe = joblib.load(scaler_file)
+    else:
+        # Pipeline de pré-processamento
+        preprocessing_pipe = Pipeline(
+            [
+                ("reshape2d", ReshapeTo2D()),
+                ("scaler", StandardScaler()),
+                ("reshape3d", ReshapeTo3D(timesteps=timesteps, num_features=num_features)),
+            ]
+        )
+        fit_scaler(
+            preprocessing_pipe, dataset, train_idx, step=math.ceil(timesteps / stride)
+        )
+        if use_cache:
+            # escreve e renomeia: vários processos podem ajustar o mesmo scaler
+            os.makedirs(CACHE_FOLDER, exist_ok=True)
+            tmp = scaler_file.with_suffix(f".{os.getpid()}.tmp")
+            joblib.dump(preprocessing_pipe, tmp)
+            os.replace(tmp, scaler_file)
+
+    _prepared[chave] = (dataset, train_idx, test_idx, preprocessing_pipe)
+    return _prepared[chave]
+
+
+# perfis de treino (`main.py train --profile`); o learning rate é escalado
+# com o tamanho do lote a partir de 1e-3 para lotes de 16 (ver `scaled_learning_rate`)
+TRAINING_PROFILES = {
+    # configuração original: lotes pequenos, épocas fixas
+    "baseline": {"batch_size": 16, "epochs": 20, "patience": 0, "reduce_lr": False, "jit_compile": False},
+    # lotes grandes e XLA: menos overhead por passo na CPU
+    "fast": {"batch_size": 128, "epochs": 40, "patience": 5, "reduce_lr": True, "jit_compile": True},
+    # lotes médios, mais épocas e paciência
+    "accurate": {"batch_size": 32, "epochs": 80, "patience": 10, "reduce_lr": True, "jit_compile": True},
+}
+
+
+def scaled_learning_rate(batch_size: int, base_lr: float = 1e-3, base_batch: int = 16):
+    """
+    Square-root scaling of Adam's learning rate with the batch size.
+    """
+    return base_lr * math.sqrt(batch_size / base_batch)
+
+
+def configure_threads(intra_op: int = 0, inter_op: int = 0):
+    """
+    Set TensorFlow's thread pools (0 = TensorFlow's default). Must run
+    before the first TensorFlow operation.
+    """
+    import keras
+
+    if keras.backend.backend() != "tensorflow":
+        return
+    import tensorflow as tf
+
+    if intra_op:
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+    if inter_op:
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+
+
+ARCHITECTURES = ("lstm", "tcn", "sepcnn")
+
+
+def build_model(
+    num_features: int,
+    n_classes: int,
+    lstm_units=(64, 32),
+    dense_units: int = 32,
+    learning_rate: float = 1e-3,
+    jit_compile=False,
+    arch: str = "lstm",
+):
+    """
+    Build the classifier `arch` (see src/architectures.py) for windows with
+    `num_features` features and compile it with Adam.
+    """
+    import keras
+    from src import architectures
+
+    if arch not in ARCHITECTURES:
+        raise Exception(f"Unknown architecture: {arch}. Use one of {ARCHITECTURES}")
+    model = architectures.ARCHITECTURES[arch](
+        num_features, n_classes, lstm_units=lstm_units, dense_units=dense_units
+    )
 
-    def transform(self, X):
-        return X.reshape(-1, self.timesteps, self.num_features)
+    model.compile(
+        optimizer=keras.optimizers.Adam(learning_rate),
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"],
+        jit_compile=jit_compile,
+    )
+    return model
 
 
-def train_model(dataset_name: str, name: str):
+def train_model(
+    dataset_name: str,
+    name: str,
+    stride=None,
+    workers: int = 0,
+    timesteps=None,
+    lstm_units=(64, 32),
+    dense_units: int = 32,
+    batch_size: int = 16,
+    learning_rate: float = 1e-3,
+    epochs: int = 20,
+    callbacks=None,
+    save: bool = True,
+    verbose="auto",
+    patience: int = 0,
+    reduce_lr: bool = False,
+    jit_compile=False,
+    report: bool = True,
+    arch=None,
+    threads: int = 0,
+):
+    """
+    Train a classifier (`arch`, default from params.yaml or "lstm") on
+    `dataset_name` and save it as `name`.
+    Returns `(model, preprocessing_pipe, history)`; with `arch="gbt"` the
+    feature model is trained instead (see `src.features.train_feature_model`)
+    and the Keras-only arguments are ignored.
+
+    `patience` > 0 stops after that many epochs without improving
+    val_accuracy (keeping the best weights); `reduce_lr` halves the learning
+    rate when val_loss plateaus; `report` prints epoch time and windows/s.
+    `threads` > 0 limits TensorFlow's intra-op pool (OpenMP with gbt).
+    """
     import yaml
 
     with open("config/params.yaml", "r") as f:
         params = yaml.safe_load(f)
 
-    # Carregar dados
-    data, classes = get_data(dataset_name)
+    timesteps = timesteps or params["timesteps"]
+    if not stride:
+        stride = params.get("stride", timesteps)
+    arch = arch or params.get("arch", "lstm")
+    if arch == "gbt":
+        from src.features import train_feature_model
 
-    num_features = data.shape[2]
-    timesteps = params["timesteps"]
-    n_classes = len(params["classes"])+1
+        return train_feature_model(dataset_name, name, stride, timesteps, save, threads=threads)
 
-    # Divisão treino/teste (corrigindo vazamento de dados)
-    X_train, X_test, y_train, y_test = train_test_split(
-        data, classes, test_size=0.2, random_state=42
-    )
+    # só depois do desvio para gbt: importa o TensorFlow
+    configure_threads(threads, 1 if threads else 0)
+    import keras
+    from src.window_sequence import WindowSequence
 
-    # Pipeline de pré-processamento
-    preprocessing_pipe = Pipeline(
-        [
-            ("reshape2d", ReshapeTo2D()),
-            ("scaler", StandardScaler()),
-            ("reshape3d", ReshapeTo3D(timesteps=timesteps, num_features=num_features)),
-        ]
+    dataset, train_idx, test_idx, preprocessing_pipe = prepare_training(
+        dataset_name, timesteps, stride
     )
-
-    # Aplicar pré-processamento
-    X_train_preprocessed = preprocessing_pipe.fit_transform(X_train)
-    X_test_preprocessed = preprocessing_pipe.transform(X_test)
-
-    # Converter labels para one-hot encoding
-    y_train_cat = keras.utils.to_categorical(y_train, n_classes)
-    y_test_cat = keras.utils.to_categorical(y_test, n_classes)
-
-    # Construir modelo LSTM
-    model = keras.Sequential(
-        [
-            layers.LSTM(
-                64, return_sequences=True, input_shape=(None, num_features)
-            ),
-            layers.LSTM(32),
-            layers.Dense(32, activation="relu"),
-            layers.Dense(n_classes, activation="softmax"),
-        ]
+    num_features = dataset.window_shape[1]
+    n_classes = len(params["classes"]) + 1
+
+    # Lotes normalizados sob demanda, preparados em paralelo
+    workers = workers or os.cpu_count() or 1
+    train_seq = WindowSequence(
+        dataset,
+        train_idx,
+        preprocessing_pipe,
+        batch_size=batch_size,
+        workers=workers,
+        max_queue_size=4 * workers,
+    )
+    test_seq = WindowSequence(
+        dataset,
+        test_idx,
+        preprocessing_pipe,
+        batch_size=batch_size,
+        shuffle=False,
+        workers=workers,
     )
 
-    model.compile(
-        optimizer="adam", loss="categorical_crossentropy", metrics=["accuracy"]
+    # Construir modelo
+    model = build_model(
+        num_features, n_classes, lstm_units, dense_units, learning_rate, jit_compile, arch
     )
 
+    callbacks = list(callbacks or [])
+    if patience:
+        callbacks.append(
+            keras.callbacks.EarlyStopping(
+                monitor="val_accuracy", patience=patience, restore_best_weights=True
+            )
+        )
+    if reduce_lr:
+        callbacks.append(
+            keras.callbacks.ReduceLROnPlateau(
+                monitor="val_loss", factor=0.5, patience=max(2, patience // 2), min_lr=1e-5
+            )
+        )
+    if report:
+        from src.callbacks import ThroughputReport
+
+        callbacks.append(ThroughputReport(len(train_idx)))
+
     # Treinar modelo
-    model.fit(
-        X_train_preprocessed,
-        y_train_cat,
-        validation_data=(X_test_preprocessed, y_test_cat),
-        epochs=20,
-        batch_size=16,
+    history = model.fit(
+        train_seq,
+        validation_data=test_seq,
+        epochs=epochs,
+        callbacks=callbacks,
+        verbose=verbose,
     )
 
     # Salvar componentes
-    save_model(model, name)
-    save_preprocessor(preprocessing_pipe, name)
+    if save:
+        save_model(model, name)
+        save_preprocessor(preprocessing_pipe, name)
+
+    return model, preprocessing_pipe, history
+
+
+def build_predictor(model, preprocessor, compiled: bool = False, batch_size: int = 256):
+    """
+    Build a function that maps raw windows `(n, timesteps, num_features)`
+    into class probabilities `(n, n_classes)`, running the model in batches
+    of at most `batch_size` windows.
+
+    With `compiled=True` the scaler is folded into a fused NumPy op over a
+    preallocated buffer and the model is called through a traced function,
+    skipping the per-call overhead of `Pipeline.transform` and `model.predict`.
+    """
+    backend = "compiled" if compiled else "keras"
+    stage = "Latency of each processing stage"
+    preprocess_time = METRICS.histogram("stage_seconds", stage, stage="preprocess", backend=backend)
+    model_time = METRICS.histogram("stage_seconds", stage, stage="model", backend=backend)
+
+    if not compiled:
+
+        def predict_proba(raw_data):
+            inicio = time.perf_counter()
+            processed_data = preprocessor.transform(raw_data)
+            meio = time.perf_counter()
+            proba = model.predict(processed_data, batch_size=batch_size, verbose=0)
+            preprocess_time.record(meio - inicio)
+            model_time.record(time.perf_counter() - meio)
+            return proba
+
+        return predict_proba
+
+    import keras
+
+    inv_scale, offset = scaler_affine(preprocessor)
+    forward = _traced_forward(model, preprocessor.named_steps["scaler"].n_features_in_)
+    buffers = {}
+
+    def predict_chunk(raw_data):
+        buffer = buffers.get(raw_data.shape)
+        if buffer is None:
+            buffer = buffers[raw_data.shape] = np.empty(raw_data.shape, np.float32)
+        inicio = time.perf_counter()
+        np.multiply(raw_data, inv_scale, out=buffer, casting="unsafe")
+        np.add(buffer, offset, out=buffer)
+        meio = time.perf_counter()
+        proba = keras.ops.convert_to_numpy(forward(buffer))
+        preprocess_time.record(meio - inicio)
+        model_time.record(time.perf_counter() - meio)
+        return proba
+
+    def predict_proba(raw_data):
+        raw_data = np.asarray(raw_data)
+        if len(raw_data) <= batch_size:
+            return predict_chunk(raw_data)
+        return np.concatenate(
+            [
+                predict_chunk(raw_data[start : start + batch_size])
+                for start in range(0, len(raw_data), batch_size)
+            ]
+        )
+
+    return predict_proba
+
+
+def _traced_forward(model, num_features: int):
+    """
+    Wrap `model(x, training=False)` in a `tf.function` with a fixed input
+    signature (no retracing per batch size or window length). Falls back to
+    the direct call on non-TensorFlow backends.
+    """
+    import keras
+
+    if keras.backend.backend() != "tensorflow":
+        return lambda x: model(x, training=False)
+
+    import tensorflow as tf
+
+    @tf.function(
+        input_signature=[tf.TensorSpec((None, None, num_features), tf.float32)],
+        reduce_retracing=True,
+    )
+    def forward(x):
+        return model(x, training=False)
 
-    return build_classifier(model, preprocessing_pipe)
+    return forward
 
 
-def build_classifier(model, preprocessor):
+def build_classifier(model, preprocessor, compiled: bool = False):
+    predict_proba = build_predictor(model, preprocessor, compiled)
+
     def classify_gesture(raw_data):
-        processed_data = preprocessor.transform(raw_data)
-        
-        return np.argmax(model.predict(processed_data, verbose = 0))
+        return np.argmax(predict_proba(raw_data))
 
     return classify_gesture
 
 
+def build_batch_classifier(
+    model, preprocessor, batch_size: int = 256, compiled: bool = False
+):
+    predict_proba = build_predictor(model, preprocessor, compiled, batch_size)
+
+    def classify_batch(raw_data):
+        """
+        Classify `(n, timesteps, num_features)` windows and return the `n`
+        predicted class ids.
+        """
+        return np.argmax(predict_proba(raw_data), axis=1)
+
+    return classify_batch
+
+
 # Save / Load preprocessor
 def save_preprocessor(preprocessor, name):
+    import joblib
+
     filepath = MODEL_FOLDER / f"preprocessing_pipe_{name}.pkl"
     os.makedirs(MODEL_FOLDER, exist_ok=True)
     joblib.dump(preprocessor, filepath, compress=9)
@@ -129,6 +513,7 @@ def save_preprocessor(preprocessor, name):
 
 
 def load_preprocessor(name):
+    import joblib
     from sklearn.utils.validation import check_is_fitted
 
     preprocessor = joblib.load(MODEL_FOLDER / f"preprocessing_pipe_{name}.pkl")
@@ -145,6 +530,8 @@ def save_model(model, name):
 
 
 def load_model(name):
+    import keras
+
     filepath = MODEL_FOLDER / f"{name}.keras"
     if not filepath.is_file():
         raise FileNotFoundError(f"No model file found at {filepath}")
@@ -3,15 +3,132 @@ from collections import deque
 import matplotlib.patches as patches
 from matplotlib.widgets import SpanSelector
 import numpy as np
+import threading
+import time
+
+
+# canais na ordem das capturas: (nome, cor, estilo)
+CANAIS = [
+    ("AX1", "blue", "-"),
+    ("AY1", "green", "-"),
+    ("AZ1", "red", "-"),
+    ("GX1", "purple", "-"),
+    ("GY1", "orange", "-"),
+    ("GZ1", "cyan", "-"),
+    ("AX2", "navy", "--"),
+    ("AY2", "darkgreen", "--"),
+    ("AZ2", "darkred", "--"),
+    ("GX2", "indigo", "--"),
+    ("GY2", "darkorange", "--"),
+    ("GZ2", "teal", "--"),
+]
+ACCEL = [0, 1, 2, 6, 7, 8]
+GYRO = [3, 4, 5, 9, 10, 11]
+
+
+def decimar(x, y, max_pontos: int):
+    """
+    Min/max envelope of `y (n, canais)` with at most `max_pontos` points per
+    channel: each bucket of samples becomes its minimum and its maximum, so
+    peaks stay visible at any input rate.
+    """
+    passo = len(x) // max(1, max_pontos // 2)
+    if passo <= 1:
+        return x, y
+    m = len(x) // passo * passo
+    xb = x[len(x) - m :].reshape(-1, passo)
+    yb = y[len(y) - m :].reshape(-1, passo, y.shape[1])
+    x = np.stack([xb[:, 0], xb[:, -1]], axis=1).ravel()
+    y = np.stack([yb.min(axis=1), yb.max(axis=1)], axis=1).reshape(-1, y.shape[1])
+    return x, y
+
+
+class MinMaxPyramid:
+    """
+    Level-of-detail pyramid of a recording. Level 0 is the data itself
+    (possibly memory-mapped); level k keeps, for every block of `fator**k`
+    samples, the start time and the per-channel min and max. `consulta`
+    returns a time range at about `pixels` points per channel, reading only
+    that slice of the coarsest level that still has enough detail.
+    """
 
-
-def visualizar_dataframe(df, janela_tempo=None):
+    def __init__(self, tempo, dados, fator: int = 8, min_amostras: int = 4096):
+        self.fator = fator
+        self.niveis = [(tempo, dados, dados)]
+        t, lo, hi = tempo, dados, dados
+        while len(t) > min_amostras:
+            m = len(t) // fator * fator
+            canais = lo.shape[1]
+            tb = [t[:m:fator]]
+            lob = [np.min(lo[:m].reshape(-1, fator, canais), axis=1)]
+            hib = [np.max(hi[:m].reshape(-1, fator, canais), axis=1)]
+            if m < len(t):
+                # bloco final incompleto
+                tb.append(t[m : m + 1])
+                lob.append(np.min(lo[m:], axis=0, keepdims=True))
+                hib.append(np.max(hi[m:], axis=0, keepdims=True))
+            t = np.concatenate(tb)
+            lo = np.concatenate(lob).astype(np.float32)
+            hi = np.concatenate(hib).astype(np.float32)
+            self.niveis.append((t, lo, hi))
+
+    def consulta(self, xmin: float, xmax: float, pixels: int):
+        """
+        `(t, lo, hi)` for the samples between `xmin` and `xmax`: the raw
+        samples (`lo is hi`) when there are at most `2 * pixels` of them,
+        otherwise ~`pixels` blocks with their start time, minimum and maximum.
+        """
+        tempo = self.niveis[0][0]
+        i, j = np.searchsorted(tempo, [xmin, xmax])
+        # um ponto além de cada borda, para a linha chegar até o limite
+        i, j = max(0, i - 1), min(len(tempo), j + 1)
+        if j - i <= 2 * pixels:
+            dados = np.asarray(self.niveis[0][1][i:j])
+            return np.asarray(tempo[i:j]), dados, dados
+
+        nivel = 0
+        while nivel + 1 < len(self.niveis) and (j - i) // self.fator ** (nivel + 1) >= pixels:
+            nivel += 1
+        escala = self.fator**nivel
+        t, lo, hi = self.niveis[nivel]
+        i, j = i // escala, -(-j // escala)
+        t, lo, hi = np.asarray(t[i:j]), np.asarray(lo[i:j]), np.asarray(hi[i:j])
+
+        # reduz os blocos restantes para ~`pixels` pontos
+        passo = len(t) // pixels
+        if passo > 1:
+            m = len(t) // passo * passo
+            canais = lo.shape[1]
+            t = t[:m:passo]
+            lo = lo[:m].reshape(-1, passo, canais).min(axis=1)
+            hi = hi[:m].reshape(-1, passo, canais).max(axis=1)
+        return t, lo, hi
+
+
+def faixas_movimento(tempo, movimento):
     """
-    Visualiza dados de um DataFrame com histórico completo.
+    `(início, duração)` of every run of `movimento == 1`, found with one
+    vectorized diff.
+    """
+    mov = np.asarray(movimento) > 0.5
+    bordas = np.flatnonzero(np.diff(mov.astype(np.int8))) + 1
+    inicios = bordas[mov[bordas]]
+    fins = bordas[~mov[bordas]]
+    if len(mov) and mov[0]:
+        inicios = np.concatenate([[0], inicios])
+    if len(mov) and mov[-1]:
+        fins = np.concatenate([fins, [len(mov) - 1]])
+    return [(tempo[a], tempo[b] - tempo[a]) for a, b in zip(inicios, fins)]
+
+
+def visualizar_dados(dados, janela_tempo=None):
+    """
+    Visualiza uma gravação `(n, 14)` (timestamp, 12 canais, em_movimento),
+    que pode ser um array mapeado em memória.
+
+    As linhas são desenhadas a partir de uma MinMaxPyramid: a cada mudança
+    do zoom só o trecho visível é redesenhado, com ~1 ponto por pixel.
 
-    Parâmetros:
-    df - DataFrame com colunas: timestamp, ax1, ay1, az1, gx1, gy1, gz1,
-                               ax2, ay2, az2, gx2, gy2, gz2, em_movimento
     janela_tempo - opcional: tempo total a ser mostrado no eixo X (segundos)
     """
 
@@ -19,63 +136,56 @@ def visualizar_dataframe(df, janela_tempo=None):
     fig.suptitle("Visualização Completa dos Dados", fontsize=18)
 
     # Configura tempo relativo
-    tempo = df["timestamp"] - df["timestamp"].iloc[0]
-
-    # Plota dados de aceleração
-    ax_accel.plot(tempo, df["ax1"], label="AX1", color="blue", alpha=0.7)
-    ax_accel.plot(tempo, df["ay1"], label="AY1", color="green", alpha=0.7)
-    ax_accel.plot(tempo, df["az1"], label="AZ1", color="red", alpha=0.7)
-    ax_accel.plot(
-        tempo, df["ax2"], label="AX2", color="navy", linestyle="--", alpha=0.7
-    )
-    ax_accel.plot(
-        tempo, df["ay2"], label="AY2", color="darkgreen", linestyle="--", alpha=0.7
-    )
-    ax_accel.plot(
-        tempo, df["az2"], label="AZ2", color="darkred", linestyle="--", alpha=0.7
-    )
+    tempo = dados[:, 0] - dados[0, 0]
+    piramide = MinMaxPyramid(tempo, dados[:, 1:13])
+
+    # cada canal: linha (amostras) e faixa min/máx (trechos resumidos),
+    # a faixa é um polígono só, bem mais barato que o zigue-zague min/máx
+    linhas = []
+    for ax, canais in ((ax_accel, ACCEL), (ax_gyro, GYRO)):
+        for j in canais:
+            nome, cor, estilo = CANAIS[j]
+            (linha,) = ax.plot([], [], label=nome, color=cor, linestyle=estilo, alpha=0.7)
+            faixa = ax.fill_between([], [], [], color=cor, alpha=0.5, linewidth=0.8)
+            linhas.append((j, linha, faixa))
+        ax.legend(loc="upper right", ncol=3)
+        ax.grid(True)
     ax_accel.set_ylabel("Aceleração (g)")
-    ax_accel.legend(loc="upper right", ncol=3)
-    ax_accel.grid(True)
-
-    # Plota dados giroscópio
-    ax_gyro.plot(tempo, df["gx1"], label="GX1", color="purple", alpha=0.7)
-    ax_gyro.plot(tempo, df["gy1"], label="GY1", color="orange", alpha=0.7)
-    ax_gyro.plot(tempo, df["gz1"], label="GZ1", color="cyan", alpha=0.7)
-    ax_gyro.plot(
-        tempo, df["gx2"], label="GX2", color="indigo", linestyle="--", alpha=0.7
-    )
-    ax_gyro.plot(
-        tempo, df["gy2"], label="GY2", color="darkorange", linestyle="--", alpha=0.7
-    )
-    ax_gyro.plot(tempo, df["gz2"], label="GZ2", color="teal", linestyle="--", alpha=0.7)
     ax_gyro.set_xlabel("Tempo (s)")
     ax_gyro.set_ylabel("Vel. Angular (°/s)")
-    ax_gyro.legend(loc="upper right", ncol=3)
-    ax_gyro.grid(True)
-
-    # Adiciona regiões de movimento
-    def add_movement_spans(axes):
-        mov = df["em_movimento"].to_numpy()
-        changes = np.where(np.diff(mov.astype(int)))[0] + 1
-        segments = np.split(df.index, changes)
-
-        for seg in segments:
-            if len(seg) == 0:
-                continue
-            start = tempo.iloc[seg[0]]
-            end = tempo.iloc[seg[-1]]
-            if mov[seg[0]] == 1:
-                axes.axvspan(start, end, color="red", alpha=0.15)
-
-    add_movement_spans(ax_accel)
-    add_movement_spans(ax_gyro)
-
-    # Configura limites do eixo X
+
+    # Adiciona regiões de movimento (uma coleção por eixo)
+    faixas = faixas_movimento(tempo, dados[:, 13])
+    for ax in (ax_accel, ax_gyro):
+        ax.broken_barh(
+            faixas, (0, 1), transform=ax.get_xaxis_transform(), color="red", alpha=0.15
+        )
+
+    # Redesenha só o trecho visível na resolução da tela
+    def atualizar_detalhe(ax):
+        xmin, xmax = ax.get_xlim()
+        t, lo, hi = piramide.consulta(xmin, xmax, max(100, int(ax.bbox.width)))
+        resumido = lo is not hi
+        for j, linha, faixa in linhas:
+            if resumido:
+                faixa.set_data(t, lo[:, j], hi[:, j])
+            else:
+                linha.set_data(t, lo[:, j])
+            faixa.set_visible(resumido)
+            linha.set_visible(not resumido)
+
+    ax_accel.callbacks.connect("xlim_changed", atualizar_detalhe)
+
+    # Configura limites
+    _, lo, hi = piramide.niveis[-1]
+    for ax, canais in ((ax_accel, ACCEL), (ax_gyro, GYRO)):
+        baixo, alto = float(np.min(lo[:, canais])), float(np.max(hi[:, canais]))
+        margem = 0.05 * (alto - baixo) or 1.0
+        ax.set_ylim(baixo - margem, alto + margem)
     if janela_tempo:
         ax_accel.set_xlim(0, janela_tempo)
     else:
-        ax_accel.set_xlim(tempo.min(), tempo.max())
+        ax_accel.set_xlim(tempo[0], tempo[-1])
 
     # Adiciona zoom interativo
     def onselect(xmin, xmax):
@@ -91,96 +201,288 @@ def visualizar_dataframe(df, janela_tempo=None):
     )
 
     plt.tight_layout(rect=[0, 0.03, 1, 0.95])  # type: ignore
+    # largura final dos eixos conhecida: redesenha na resolução certa
+    atualizar_detalhe(ax_accel)
     plt.show()
 
     return fig, (ax_accel, ax_gyro)
 
 
-def visualizar_realtime(janela_tempo=2, freq=50):
-    fig, ax = plt.subplots(figsize=(16, 6))
-    fig.suptitle("Visualização em Tempo Real - Dados do MPU6050", fontsize=18)
-    plt.ion()
-    plt.show()
+def visualizar_dataframe(df, janela_tempo=None):
+    """
+    Visualiza dados de um DataFrame com histórico completo.
+
+    Parâmetros:
+    df - DataFrame com colunas: timestamp, ax1, ay1, az1, gx1, gy1, gz1,
+                               ax2, ay2, az2, gx2, gy2, gz2, em_movimento
+    janela_tempo - opcional: tempo total a ser mostrado no eixo X (segundos)
+    """
+    from src.recorder import CSV_HEADER
 
-    buffer_size = int(janela_tempo * freq)
-    buffers = {
-        "tempo": deque(maxlen=buffer_size),
-        "ax1": deque(maxlen=buffer_size),
-        "gx1": deque(maxlen=buffer_size),
-        "ax2": deque(maxlen=buffer_size),
-        "gx2": deque(maxlen=buffer_size),
-        "em_movimento": deque(maxlen=buffer_size),
-    }
+    return visualizar_dados(df[CSV_HEADER].to_numpy(np.float64), janela_tempo)
 
-    linhas = {}
-    cores = {"ax1": "blue", "gx1": "green", "ax2": "orange", "gx2": "purple"}
 
-    for chave in ["ax1", "gx1", "ax2", "gx2"]:
-        (linha,) = ax.plot([], [], label=chave, color=cores[chave])
-        linhas[chave] = linha
+class RealtimePlotter:
+    """
+    Real-time plot of the 12 channels and of the movement regions.
+
+    `push` only copies samples into NumPy ring buffers (safe to call from
+    the acquisition thread); `draw_frame` redraws at its own rate, restoring
+    the cached background and drawing only the lines and the movement
+    rectangles (blitting). The X axis is fixed at `[-janela_tempo, 0]`
+    seconds relative to the last sample, so the background never changes;
+    the Y limits only grow, with a full redraw, when the data leaves them.
+
+    The buffers start with room for `janela_tempo * freq` samples and
+    double whenever they hold less than `janela_tempo` seconds, so the
+    window is complete at any sample rate.
+    """
 
-    ax.set_xlabel("Tempo (s)")
-    ax.set_ylabel("Valor")
-    ax.legend()
+    MAX_CAPACIDADE = 1 << 20
 
-    plt.tight_layout(rect=[0, 0.03, 1, 0.95])  # type: ignore
+    def __init__(
+        self,
+        janela_tempo: float = 2.0,
+        freq: float = 100.0,
+        fps: float = 30.0,
+        max_pontos: int = 1000,
+        blit: bool = True,
+        fig=None,
+    ):
+        self.janela_tempo = janela_tempo
+        self.fps = fps
+        self.max_pontos = max_pontos
+        self.blit = blit
+
+        capacidade = max(2, int(janela_tempo * freq))
+        self._tempo = np.zeros(capacidade, np.float64)
+        self._dados = np.zeros((capacidade, len(CANAIS)), np.float32)
+        self._escritas = 0
+        self._lock = threading.Lock()
+        # regiões de movimento [início, fim] (fim None enquanto em andamento)
+        self._spans = deque()
+        self._mov = 0
+
+        if fig is None:
+            fig = plt.figure(figsize=(16, 10))
+        self.fig = fig
+        self.ax_accel, self.ax_gyro = fig.subplots(2, 1, sharex=True)
+        fig.suptitle("Visualização em Tempo Real - Dados do MPU6050", fontsize=18)
+
+        self.linhas = []
+        for ax, canais in ((self.ax_accel, ACCEL), (self.ax_gyro, GYRO)):
+            for j in canais:
+                nome, cor, estilo = CANAIS[j]
+                (linha,) = ax.plot(
+                    [], [], label=nome, color=cor, linestyle=estilo, alpha=0.7, animated=blit
+                )
+                self.linhas.append((j, ax, linha))
+            ax.legend(loc="upper right", ncol=3)
+            ax.grid(True)
+        self.ax_accel.set_ylabel("Aceleração (g)")
+        self.ax_gyro.set_ylabel("Vel. Angular (°/s)")
+        self.ax_gyro.set_xlabel("Tempo (s)")
+        self.ax_gyro.set_xlim(-janela_tempo, 0)
+        self.ax_accel.set_ylim(-2.2, 2.2)
+        self.ax_gyro.set_ylim(-260, 260)
+
+        # retângulos reaproveitados entre quadros, um par (accel, gyro) por região
+        self._retangulos = []
+
+        self._background = None
+        self._ultimo_quadro = 0.0
+        self.frames = 0
+        self.fig.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, event):
+        self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+
+    def push(self, timestamps, amostras, em_movimento=0):
+        """
+        Add samples `(n, 12)` taken at `timestamps` (seconds). `em_movimento`
+        is one flag for the block or one per sample.
+        """
+        timestamps = np.atleast_1d(np.asarray(timestamps, np.float64))
+        amostras = np.asarray(amostras, np.float32).reshape(len(timestamps), -1)
+        mov = np.broadcast_to(np.asarray(em_movimento, int), timestamps.shape)
+
+        capacidade = len(self._tempo)
+        with self._lock:
+            # só as últimas `capacidade` amostras cabem no buffer
+            n = min(len(timestamps), capacidade)
+            inicio = self._escritas % capacidade
+            idx = (inicio + np.arange(len(timestamps) - n, len(timestamps))) % capacidade
+            self._tempo[idx] = timestamps[-n:]
+            self._dados[idx] = amostras[-n:]
+            self._escritas += len(timestamps)
+            if self._escritas >= capacidade and capacidade < self.MAX_CAPACIDADE:
+                # a amostra mais antiga ainda está dentro da janela: taxa maior
+                # que `freq`, dobra o buffer
+                if self._tempo[self._escritas % capacidade] > timestamps[-1] - self.janela_tempo:
+                    self._crescer(2 * capacidade)
+
+            # transições de movimento do bloco (poucas), sem percorrer as amostras
+            anterior = np.concatenate([[self._mov], mov])
+            for i in np.flatnonzero(np.diff(anterior)):
+                if mov[i]:
+                    self._spans.append([timestamps[i], None])
+                elif self._spans:
+                    self._spans[-1][1] = timestamps[i]
+            self._mov = int(mov[-1])
+
+    def _crescer(self, capacidade: int):
+        # chamado com o lock: reordena do mais antigo ao mais novo
+        i = self._escritas % len(self._tempo)
+        n = len(self._tempo)
+        tempo = np.zeros(capacidade, np.float64)
+        dados = np.zeros((capacidade, self._dados.shape[1]), np.float32)
+        tempo[:n] = np.concatenate([self._tempo[i:], self._tempo[:i]])
+        dados[:n] = np.concatenate([self._dados[i:], self._dados[:i]])
+        self._tempo, self._dados = tempo, dados
+        self._escritas = n
+
+    def _snapshot(self):
+        capacidade = len(self._tempo)
+        with self._lock:
+            if self._escritas < capacidade:
+                tempo = self._tempo[: self._escritas].copy()
+                dados = self._dados[: self._escritas].copy()
+            else:
+                i = self._escritas % capacidade
+                tempo = np.concatenate([self._tempo[i:], self._tempo[:i]])
+                dados = np.concatenate([self._dados[i:], self._dados[:i]])
+            if len(tempo):
+                # descarta regiões que já saíram da janela
+                while self._spans and self._spans[0][1] is not None and (
+                    self._spans[0][1] < tempo[-1] - self.janela_tempo
+                ):
+                    self._spans.popleft()
+            spans = [(ini, fim) for ini, fim in self._spans]
+        return tempo, dados, spans
+
+    def _ajusta_limites(self, dados):
+        """
+        Grow the Y limits when the data leaves them. Returns True when the
+        background has to be redrawn.
+        """
+        mudou = False
+        for ax, canais in ((self.ax_accel, ACCEL), (self.ax_gyro, GYRO)):
+            baixo, alto = ax.get_ylim()
+            minimo, maximo = dados[:, canais].min(), dados[:, canais].max()
+            if minimo < baixo or maximo > alto:
+                margem = 0.1 * (max(alto, maximo) - min(baixo, minimo))
+                ax.set_ylim(min(baixo, minimo - margem), max(alto, maximo + margem))
+                mudou = True
+        return mudou
+
+    def _retangulo(self, k):
+        while len(self._retangulos) <= k:
+            par = []
+            for ax in (self.ax_accel, self.ax_gyro):
+                r = patches.Rectangle(
+                    (0, 0),
+                    0,
+                    1,
+                    transform=ax.get_xaxis_transform(),
+                    color="red",
+                    alpha=0.15,
+                    animated=self.blit,
+                    visible=False,
+                )
+                ax.add_patch(r)
+                par.append(r)
+            self._retangulos.append(par)
+        return self._retangulos[k]
+
+    def draw_frame(self):
+        """
+        Draw the current window. Returns False when there is nothing to draw.
+        """
+        tempo, dados, spans = self._snapshot()
+        if not len(tempo):
+            return False
+
+        agora = tempo[-1]
+        x, y = decimar(tempo - agora, dados, self.max_pontos)
+        canvas = self.fig.canvas
+
+        for j, _, linha in self.linhas:
+            linha.set_data(x, y[:, j])
+        for k, (ini, fim) in enumerate(spans):
+            fim = agora if fim is None else fim
+            for r in self._retangulo(k):
+                r.set_x(max(ini - agora, -self.janela_tempo))
+                r.set_width(fim - max(ini, agora - self.janela_tempo))
+                r.set_visible(True)
+        for par in self._retangulos[len(spans) :]:
+            for r in par:
+                r.set_visible(False)
+
+        if self._ajusta_limites(y) or not self.blit or self._background is None:
+            canvas.draw()
+        if self.blit:
+            canvas.restore_region(self._background)
+            for par in self._retangulos[: len(spans)]:
+                for r in par:
+                    r.axes.draw_artist(r)
+            for _, ax, linha in self.linhas:
+                ax.draw_artist(linha)
+            canvas.blit(self.fig.bbox)
+
+        self.frames += 1
+        self._ultimo_quadro = time.monotonic()
+        return True
+
+    def poll(self):
+        """
+        Draw a frame if `1 / fps` seconds passed since the last one and
+        process GUI events. For loops that drive the plot themselves.
+        """
+        if time.monotonic() - self._ultimo_quadro >= 1.0 / self.fps:
+            self.draw_frame()
+        self.fig.canvas.flush_events()
+
+    def show(self):
+        """
+        Open the window and redraw `fps` times per second until it is closed
+        (blocks; run it in the main thread and `push` from another one).
+        """
+        timer = self.fig.canvas.new_timer(interval=int(1000 / self.fps))
+        timer.add_callback(self.draw_frame)
+        timer.start()
+        plt.show()
+        timer.stop()
+
+
+def visualizar_realtime(janela_tempo=2, freq=50, fps=30):
+    """
+    Sample-by-sample interface over RealtimePlotter: returns
+    `(atualizar, parada)`, where `atualizar(timestamp, ax1, ..., gz2, em_mov)`
+    adds one sample and redraws at most `fps` times per second.
+    """
+    plotter = RealtimePlotter(janela_tempo, freq, fps)
+    plt.ion()
+    plt.show()
 
-    tempo_inicial = [None]
     parada = {"sair": False}
 
     def on_key(event):
         if event.key in ["escape", "q"]:
             print("Encerrando visualização...")
             parada["sair"] = True
-            plt.close(fig)
+            plt.close(plotter.fig)
 
-    fig.canvas.mpl_connect("key_press_event", on_key)
-
-    spans = []
+    plotter.fig.canvas.mpl_connect("key_press_event", on_key)
 
     def atualizar(
         timestamp, ax1, ay1, az1, gx1, gy1, gz1, ax2, ay2, az2, gx2, gy2, gz2, em_mov
     ):
         if parada["sair"]:
             return
-
-        if tempo_inicial[0] is None:
-            tempo_inicial[0] = timestamp
-        tempo_relativo = timestamp - tempo_inicial[0]
-
-        buffers["tempo"].append(tempo_relativo)
-        buffers["ax1"].append(ax1)
-        buffers["gx1"].append(gx1)
-        buffers["ax2"].append(ax2)
-        buffers["gx2"].append(gx2)
-        buffers["em_movimento"].append(em_mov)
-
-        # Atualiza as linhas
-        for chave in ["ax1", "gx1", "ax2", "gx2"]:
-            linhas[chave].set_data(buffers["tempo"], buffers[chave])
-
-        ax.relim()
-        ax.autoscale_view()
-
-        # Atualiza as faixas de movimento
-        for span in spans:
-            span.remove()
-        spans.clear()
-
-        tempo = list(buffers["tempo"])
-        mov = list(buffers["em_movimento"])
-        start = None
-        for i in range(len(mov)):
-            if mov[i] == 1 and start is None:
-                start = tempo[i]
-            elif mov[i] == 0 and start is not None:
-                spans.append(ax.axvspan(start, tempo[i], color="red", alpha=0.15))
-                start = None
-        if start is not None:
-            spans.append(ax.axvspan(start, tempo[-1], color="red", alpha=0.15))
-
-        fig.canvas.draw_idle()
-        fig.canvas.flush_events()
+        plotter.push(
+            timestamp, [ax1, ay1, az1, gx1, gy1, gz1, ax2, ay2, az2, gx2, gy2, gz2], em_mov
+        )
+        plotter.poll()
 
     return atualizar, parada
 
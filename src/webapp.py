@@ -1,69 +1,145 @@
-from flask import Flask, render_template
-from flask_socketio import SocketIO
+from flask import Flask, Response, jsonify, render_template, request
+from flask_socketio import SocketIO, join_room
+import os
+import threading
 import time
-import serial
-from src.train_lib import load_classifier
-import numpy as np
-import yaml
+import queue
 
-app = Flask(__name__, template_folder="flask", static_folder="flask/static")
-socketio = SocketIO(app)
+# registry (train_lib), pipeline, broadcast, metrics, sources e pyserial são
+# importados em `start_server`/`serial_thread`, para o import deste módulo
+# (e `web --help`) continuar rápido
+
+ASYNC_MODES = ("threading", "eventlet", "gevent")
+
+# relativo à raiz do repositório, não a src/
+FLASK_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "flask")
+app = Flask(
+    __name__,
+    template_folder=FLASK_DIR,
+    static_folder=os.path.join(FLASK_DIR, "static"),
+)
+# inicializado em `start_server`, com o modo assíncrono escolhido
+socketio = SocketIO()
 thread = None
+# estado por dispositivo, enviado aos navegadores a cada quadro (StateBroadcaster)
+broadcaster = None
+# amostras e probabilidades para o painel de sensores, /dashboard (SensorBroadcaster)
+sensores = None
 
 RUNNING = False
+# nome dos dispositivos (portas) monitorados; cada um é uma sala do Socket.IO
+DEVICES = []
 
-with open("config/params.yaml", "r") as f:
-    params = yaml.safe_load(f)
-classes = ["none"] + params["classes"]
+# nomes das classes, lidos de config/params.yaml em `start_server`
+classes = []
+# modelos pré-carregados; o ativo classifica as janelas de todos os dispositivos
+# (ModelRegistry, criado em `run_webapp`)
+registry = None
 
 
-def serial_thread(porta_serial: str, baudrate: int, timesteps: int, model_name: str):
+def serial_thread(
+    portas: list[str],
+    baudrate: int,
+    timesteps: int,
+    model_name: str,
+    hop: int = 10,
+    votes: int = 3,
+    refractory: int = 100,
+    protocol: str = "text",
+    preload: list[str] = [],
+    speed: float = 1.0,
+    loop: bool = False,
+):
     global RUNNING
     global classes
 
+    import serial
+    from concurrent.futures import ThreadPoolExecutor
+    from src.pipeline import build_pipeline
+    from src.sources import is_replay, open_source
+
     RUNNING = True
 
-    try:
-        ser = serial.Serial(porta_serial, baudrate, timeout=1)
-        time.sleep(2)
-        print(f"📡 Conectado à {porta_serial}")
-    except serial.SerialException:
-        print("⚠️ Erro ao abrir a porta serial!")
+    # carrega e aquece o modelo em segundo plano enquanto as portas conectam
+    executor = ThreadPoolExecutor(max_workers=1)
+    carregamento = executor.submit(registry.activate, model_name)
+    # a tarefa já enviada continua; a thread do executor termina com ela
+    executor.shutdown(wait=False)
+
+    sources = {}
+    for porta_serial in portas:
+        try:
+            sources[porta_serial] = open_source(porta_serial, baudrate, protocol, speed, loop)
+            print(f"📡 Conectado à {porta_serial}")
+        except serial.SerialException:
+            print(f"⚠️ Erro ao abrir a porta serial {porta_serial}!")
+        except FileNotFoundError as e:
+            print(f"⚠️ {e}")
+    if not sources:
+        carregamento.cancel()
         return
+    if not all(is_replay(porta) for porta in sources):
+        # o ESP32 reinicia ao abrir a porta
+        time.sleep(2)
 
-    classify_gesture = load_classifier(model_name)
+    try:
+        carregamento.result()
+    except Exception as e:
+        print(f"⚠️ Erro ao carregar o modelo {model_name}: {e}")
+        for ser in sources.values():
+            ser.close()
+        return
+    # demais modelos, para troca sem reiniciar a leitura (ver /models)
+    threading.Thread(
+        target=registry.preload,
+        args=([nome for nome in preload if nome != model_name],),
+        daemon=True,
+    ).start()
+    pipeline = build_pipeline(
+        sources,
+        registry.predict_batch,
+        protocol,
+        timesteps,
+        hop,
+        votes,
+        refractory,
+        monitor=sensores,
+    ).start()
 
-    data = []
+    # leitura e inferência rodam em threads próprias; aqui só publicamos
+    # (o envio aos navegadores é feito pelo broadcaster)
+    descartadas = {nome: 0 for nome in sources}
     try:
         while RUNNING:
-            linha = ser.readline().decode("utf-8").strip()
-
-            if not linha:
-                continue
-
             try:
-                dados_float = [float(valor) for valor in linha.split(",")]
-                if len(dados_float) != 12:
-                    continue
-
-                data.append(dados_float)
+                dispositivo, deteccao = pipeline.results.get(timeout=0.5)
+                broadcaster.publish(dispositivo, classes[deteccao.class_id])
+            except queue.Empty:
+                pass
 
-                if len(data) == timesteps:
-                    prediction = classify_gesture(
-                        np.expand_dims(np.array(data), axis=0)
+            for stream in pipeline.streams:
+                if stream.ring.dropped > descartadas[stream.name]:
+                    print(
+                        f"⚠️ {stream.name}: {stream.ring.dropped - descartadas[stream.name]} amostras descartadas!"
                     )
-                    if prediction > 0:
-                        socketio.emit("movimento", classes[prediction])
-                    data = []
+                    descartadas[stream.name] = stream.ring.dropped
 
-            except ValueError:
-                print("⚠️ Dado inválido!")
-                continue
+            if all(getattr(ser, "exhausted", False) for ser in sources.values()) and all(
+                len(stream.ring) == 0 for stream in pipeline.streams
+            ):
+                print("📼 Reprodução concluída.")
+                break
     except KeyboardInterrupt:
         pass
 
+    pipeline.stop()
+    # detecções do último lote (fim de uma reprodução)
+    while not pipeline.results.empty():
+        dispositivo, deteccao = pipeline.results.get()
+        broadcaster.publish(dispositivo, classes[deteccao.class_id])
     print("🛑 Leitura serial encerrada.")
-    ser.close()
+    for ser in sources.values():
+        ser.close()
 
 
 @socketio.on("connect")
@@ -71,15 +147,194 @@ def connect():
     print("🌐 CONNECTED")
 
 
+@socketio.on("join")
+def join(dispositivo):
+    """
+    Inscreve o cliente na sala de um dispositivo (padrão: o primeiro).
+    """
+    if dispositivo not in DEVICES:
+        dispositivo = DEVICES[0] if DEVICES else ""
+    join_room(dispositivo)
+    broadcaster.subscribe(request.sid, dispositivo)  # type: ignore
+
+
+@socketio.on("join_dashboard")
+def join_dashboard(dispositivo):
+    """
+    Inscreve o cliente nos quadros de sensores de um dispositivo.
+    """
+    if dispositivo not in DEVICES:
+        dispositivo = DEVICES[0] if DEVICES else ""
+    sensores.subscribe(request.sid, dispositivo)  # type: ignore
+
+
+@socketio.on("disconnect")
+def disconnect(*_):
+    broadcaster.unsubscribe(request.sid)  # type: ignore
+    sensores.unsubscribe(request.sid)  # type: ignore
+
+
 @app.route("/")
 def index():
     global classes
-    return render_template("index.html", classes=classes)
+    return render_template("index.html", classes=classes, devices=DEVICES)
+
+
+@app.route("/dashboard")
+def dashboard():
+    return render_template(
+        "dashboard.html",
+        classes=classes,
+        devices=DEVICES,
+        interval=sensores.interval if sensores is not None else None,
+    )
 
 
-def run_webapp(porta_serial: str, baudrate: int, timesteps: int, model_name: str):
+@app.route("/models", methods=["GET"])
+def models():
+    """
+    Modelos carregados, tempos de carga/aquecimento e o modelo ativo.
+    """
+    return jsonify(registry.describe() if registry is not None else {})
+
+
+@app.route("/models/active", methods=["POST"])
+def activate_model():
+    """
+    Troca o modelo ativo ({"name": ...}) sem reiniciar a leitura serial.
+    """
+    from src.registry import available_models
+
+    nome = (request.get_json(silent=True) or {}).get("name")
+    if registry is None:
+        return jsonify(success=False, error="Servidor não iniciado"), 503
+    if nome not in available_models():
+        return jsonify(success=False, error=f"Modelo desconhecido: {nome}"), 404
+    try:
+        registry.activate(nome)
+    except Exception as e:
+        return jsonify(success=False, error=str(e)), 400
+    return jsonify(success=True, **registry.describe())
+
+
+@app.route("/metrics")
+def metrics():
+    """
+    Métricas de latência, vazão e filas no formato de texto do Prometheus.
+    """
+    from src.metrics import METRICS
+
+    return Response(METRICS.render(), mimetype="text/plain; version=0.0.4")
+
+
+def start_server(
+    async_mode: str = "threading",
+    frame_rate: float = 30.0,
+    sensor_interval: float = 0.05,
+    metrics_interval: float = 0,
+):
+    """
+    Initialize the Socket.IO server and start the broadcaster loops (and the
+    metrics summary every `metrics_interval` seconds, when positive).
+    """
     global RUNNING
+    global broadcaster
+    global sensores
+
+    import yaml
+    from src.broadcast import SensorBroadcaster, StateBroadcaster
+    from src.metrics import METRICS
+
+    if async_mode not in ASYNC_MODES:
+        raise Exception(f"Unknown async mode: {async_mode}. Use one of {ASYNC_MODES}")
+
+    if broadcaster is None:
+        broadcaster = StateBroadcaster(
+            lambda payload, sid, callback: socketio.emit(
+                "estado", payload, to=sid, callback=callback
+            )
+        )
+        sensores = SensorBroadcaster(
+            lambda payload, sid, callback: socketio.emit(
+                "sensores", payload, to=sid, callback=callback
+            )
+        )
+
+    with open("config/params.yaml", "r") as f:
+        params = yaml.safe_load(f)
+    classes[:] = ["none"] + params["classes"]
+
+    socketio.init_app(app, async_mode=async_mode)
+    broadcaster.interval = 1 / frame_rate
+    RUNNING = True
+    socketio.start_background_task(broadcaster.run, lambda: RUNNING, socketio.sleep)
+    sensores.interval = sensor_interval
+    socketio.start_background_task(sensores.run, lambda: RUNNING, socketio.sleep)
+    if metrics_interval > 0:
+        socketio.start_background_task(
+            METRICS.log_loop, metrics_interval, lambda: RUNNING, socketio.sleep
+        )
+
+
+def run_webapp(
+    portas: list[str],
+    baudrate: int,
+    timesteps: int,
+    model_name: str,
+    hop: int = 10,
+    votes: int = 3,
+    refractory: int = 100,
+    compiled: bool = True,
+    protocol: str = "text",
+    async_mode: str = "threading",
+    frame_rate: float = 30.0,
+    backend: str = "keras",
+    quantization: str = "float16",
+    preload=None,
+    sensor_interval: float = 0.05,
+    metrics_interval: float = 0,
+    speed: float = 1.0,
+    loop: bool = False,
+):
+    """
+    `portas`: serial ports or replayed captures (see `open_source`).
+    `preload`: models loaded and warmed up at start, besides `model_name`
+    (None = every model in `models/`). `sensor_interval`: seconds between
+    sensor frames sent to /dashboard clients. `metrics_interval`: seconds
+    between metrics summaries printed to the console (0 = only /metrics).
+    `speed` and `loop`: replay speed (0 = as fast as possible) and whether
+    replays restart at the end.
+    """
+    global RUNNING
+    global registry
+
+    from src.registry import ModelRegistry, available_models
 
-    thread = socketio.start_background_task(target=serial_thread, args=(porta_serial, baudrate, timesteps, model_name))  # type: ignore
+    DEVICES[:] = portas
+    registry = ModelRegistry(
+        timesteps, compiled=compiled, backend=backend, quantization=quantization
+    )
+    if preload is None:
+        preload = available_models()
+    start_server(async_mode, frame_rate, sensor_interval, metrics_interval)
+    # thread do sistema (e não green thread): a leitura serial é bloqueante
+    thread = threading.Thread(
+        target=serial_thread,
+        args=(
+            portas,
+            baudrate,
+            timesteps,
+            model_name,
+            hop,
+            votes,
+            refractory,
+            protocol,
+            preload,
+            speed,
+            loop,
+        ),
+        daemon=True,
+    )
+    thread.start()
     socketio.run(app)
     RUNNING = False
@@ -0,0 +1,48 @@
+import math
+import keras
+import numpy as np
+from src.train_lib import scaler_affine
+
+
+class WindowSequence(keras.utils.PyDataset):
+    """
+    Feed the windows at `indices` of a WindowedDataset to `model.fit` in
+    batches, copying and normalizing only one batch at a time. Batches are
+    prepared ahead of time by `workers` threads. Labels are sparse class ids.
+    """
+
+    def __init__(
+        self,
+        dataset,
+        indices,
+        preprocessor,
+        batch_size: int = 16,
+        shuffle: bool = True,
+        seed: int = 42,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.dataset = dataset
+        self.indices = np.array(indices)
+        self.inv_scale, self.offset = scaler_affine(preprocessor)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+        if shuffle:
+            self.rng.shuffle(self.indices)
+
+    def __len__(self):
+        return math.ceil(len(self.indices) / self.batch_size)
+
+    def __getitem__(self, index):
+        batch = self.indices[index * self.batch_size : (index + 1) * self.batch_size]
+        # ordena para ler cada gravação de forma sequencial
+        batch = np.sort(batch)
+        X = self.dataset.take(batch)
+        np.multiply(X, self.inv_scale, out=X)
+        np.add(X, self.offset, out=X)
+        return X, self.dataset.classes[batch].astype(np.int32)
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.rng.shuffle(self.indices)
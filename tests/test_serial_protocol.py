@@ -0,0 +1,82 @@
+import numpy as np
+from src.serial_protocol import (
+    FRAME_SIZE,
+    SYNC,
+    BinaryParser,
+    TextParser,
+    crc16,
+    encode_frames,
+    encode_text,
+)
+
+
+def _samples(n, seed=0):
+    # valores já quantizados como no firmware, para comparar sem tolerância
+    rng = np.random.default_rng(seed)
+    samples = rng.uniform(-1.5, 1.5, (n, 12)).astype(np.float32)
+    return BinaryParser().feed(encode_frames(samples))[1]
+
+
+def _crc(data: bytes):
+    return int(crc16(np.frombuffer(data, np.uint8)[np.newaxis])[0]).to_bytes(2, "little")
+
+
+def test_crc16_ccitt_false_check_value():
+    # valor de verificação padrão do CRC-16/CCITT-FALSE
+    assert _crc(b"123456789") == (0x29B1).to_bytes(2, "little")
+
+
+def test_frames_roundtrip():
+    samples = _samples(50)
+    timestamps, decoded = BinaryParser().feed(encode_frames(samples))
+    np.testing.assert_array_equal(decoded, samples)
+    assert len(timestamps) == 50
+
+
+def test_resync_after_garbage_and_corrupted_frame():
+    samples = _samples(20)
+    payload = bytearray(encode_frames(samples))
+    # um byte corrompido no frame 5 e lixo (com um sync falso) antes do frame 10
+    payload[5 * FRAME_SIZE + 12] ^= 0xFF
+    payload[10 * FRAME_SIZE : 10 * FRAME_SIZE] = b"\x01\x02" + SYNC + b"\x03" * 7
+
+    parser = BinaryParser()
+    _, decoded = parser.feed(bytes(payload))
+
+    np.testing.assert_array_equal(decoded, np.delete(samples, 5, axis=0))
+    assert parser.crc_errors == 2
+    assert parser.lost_frames == 1
+
+
+def test_frames_split_across_reads():
+    samples = _samples(30)
+    payload = encode_frames(samples)
+    parser = BinaryParser()
+    partes = [parser.feed(payload[i : i + 7])[1] for i in range(0, len(payload), 7)]
+    np.testing.assert_array_equal(np.concatenate(partes), samples)
+    assert parser.crc_errors == 0 and parser.lost_frames == 0
+
+
+def test_valid_false_sync_inside_a_frame_keeps_the_next_frame():
+    # frame A com A5 5A nos valores (offset 20) e frame B escolhido para que
+    # o "frame" que começa no offset 20 de A também tenha CRC válido
+    a = bytearray(encode_frames(np.zeros((1, 12)), start_seq=0))
+    b = bytearray(encode_frames(np.zeros((1, 12)), start_seq=1))
+    a[20:22] = SYNC
+    a[32:34] = _crc(bytes(a[2:32]))
+    falso = bytes(a[20:]) + bytes(b[:20])
+    b[18:20] = _crc(falso[2:32])
+    b[32:34] = _crc(bytes(b[2:32]))
+
+    parser = BinaryParser()
+    _, decoded = parser.feed(bytes(a + b))
+    assert len(decoded) == 2
+    assert parser.crc_errors == 0 and parser.lost_frames == 0
+
+
+def test_text_parser_skips_malformed_lines():
+    linhas = [encode_text(np.full(12, 0.5)), b"1,2,3\n", encode_text(np.full(12, -0.25))]
+    parser = TextParser()
+    _, decoded = parser.feed(b"".join(linhas))
+    assert decoded.shape == (2, 12)
+    assert parser.parse_errors == 1
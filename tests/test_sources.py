@@ -0,0 +1,66 @@
+import os
+import numpy as np
+import pytest
+from src.recorder import CSV_HEADER
+from src.serial_protocol import make_parser, read_available
+from src.sources import open_source
+
+N_AMOSTRAS = 300
+
+
+@pytest.fixture
+def captura(tmp_path, monkeypatch):
+    # caminhos relativos (dataset/, cache) dentro de tmp_path
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("dataset")
+    rng = np.random.default_rng(0)
+    dados = np.column_stack(
+        [
+            1.7e9 + np.arange(N_AMOSTRAS) / 100,
+            np.round(rng.uniform(-1.5, 1.5, (N_AMOSTRAS, 12)), 2),
+            (np.arange(N_AMOSTRAS) // 50) % 2,
+        ]
+    )
+    np.savetxt("dataset/captura.csv", dados, delimiter=",", header=",".join(CSV_HEADER), comments="")
+    return "dataset/captura.csv", dados
+
+
+# quantização do protocolo binário: 1/131 °/s no giroscópio
+ATOL = 0.01
+TRANSPORTS = ["replay"] + (["pty"] if os.name == "posix" else [])
+
+
+@pytest.mark.parametrize("transport", TRANSPORTS)
+@pytest.mark.parametrize("protocol", ["text", "binary"])
+def test_replay_streams_every_sample(captura, transport, protocol):
+    file, dados = captura
+    ser = open_source(f"{transport}:{file}", protocol=protocol, speed=0, timeout=0.1)
+    parser = make_parser(protocol)
+    partes = []
+    try:
+        while not ser.exhausted:
+            partes.append(parser.feed(read_available(ser))[1])
+    finally:
+        ser.close()
+
+    amostras = np.concatenate(partes)
+    assert len(amostras) == N_AMOSTRAS
+    assert parser.dropped == 0
+    np.testing.assert_allclose(amostras, dados[:, 1:13], atol=ATOL)
+
+
+def test_captura_records_a_replayed_capture(captura):
+    from src.data_helpers import load_csv_recording
+    from src.mpu_read_serial import leitura_serial
+
+    file, dados = captura
+    leitura_serial("regravada", f"replay:{file}", 115200, "binary", "none", None, 0)
+
+    gravada = load_csv_recording("dataset/regravada.csv")
+    assert len(gravada) == N_AMOSTRAS
+    np.testing.assert_allclose(gravada[:, 1:13], dados[:, 1:13], atol=ATOL)
+
+
+def test_missing_capture_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        open_source(f"replay:{tmp_path / 'nada.csv'}")
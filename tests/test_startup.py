@@ -0,0 +1,19 @@
+import os
+from pathlib import Path
+import pytest
+from src.benchmarks import STARTUP_BUDGETS, bench_startup
+
+# máquinas de CI mais lentas: STARTUP_BUDGET_SCALE=2 dobra os orçamentos
+ESCALA = float(os.environ.get("STARTUP_BUDGET_SCALE", "1.0"))
+
+
+@pytest.mark.parametrize("label", list(STARTUP_BUDGETS))
+def test_import_time_within_budget(label, monkeypatch):
+    # os comandos usam caminhos relativos à raiz do repositório
+    monkeypatch.chdir(Path(__file__).resolve().parents[1])
+    result = bench_startup({label: STARTUP_BUDGETS[label]}, ESCALA)[label]
+    assert result["error"] is None, f"{label}: {result['error']}"
+    lentos = ", ".join(f"{modulo} {tempo:.3f}s" for tempo, modulo in result["slowest"])
+    assert result["ok"], (
+        f"{label}: {result['import_s']:.3f}s > {result['budget_s']:.1f}s ({lentos})"
+    )
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+from src.streaming import RingBuffer, StreamingClassifier
+
+
+def test_ring_buffer_accepts_sample_or_block():
+    buffer = RingBuffer(5, 12)
+    buffer.extend(np.ones(12))
+    buffer.extend(np.ones((3, 12)))
+    assert buffer.count == 4
+
+
+@pytest.mark.parametrize("shape", [(12,), (4, 12), (4, 2, 6)])
+def test_push_rejects_wrong_width(shape):
+    # 12 colunas num modelo de 6 features não podem virar amostras extras
+    engine = StreamingClassifier(lambda x: x, timesteps=10, num_features=6)
+    with pytest.raises(ValueError, match="6 features"):
+        engine.push(np.zeros(shape))
+    assert engine.buffer.count == 0